@@ -2,3 +2,8 @@
 # pylint: disable=all
 
 next_action  # unused function (next_action/__init__.py:17)
+unblocked_tasks  # unused function (next_action/todotxt/__init__.py:17)
+_.priority_at_least  # unused method (next_action/todotxt/task.py:119)
+_.is_due  # unused method (next_action/todotxt/task.py:150)
+_.is_future  # unused method (next_action/todotxt/task.py:155)
+_.is_overdue  # unused method (next_action/todotxt/task.py:166)
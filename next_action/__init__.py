@@ -1,9 +1,15 @@
 """Main Next-action package."""
 
+import os
+import sys
+from typing import cast
+
 from .arguments import parse_arguments
 from .pick_action import next_actions
-from .output import render_next_action, render_arguments, open_urls
-from .todotxt import read_todotxt_files
+from .planner import Plan
+from .output import dependency_cycles, unknown_task_ids, write_next_action, render_arguments, render_plan, \
+    render_statistics, open_urls
+from .todotxt import default_cache, read_todotxt_files, Prefilter, TaskGraph, TaskStatistics
 
 
 __title__ = "next-action"
@@ -21,14 +27,37 @@ def next_action() -> None:
     5) open their urls if requested by the user.
     """
     parser, namespace = parse_arguments(__version__)
+    # Listing arguments, showing statistics, and explaining the plan need all tasks, so don't prefilter the tasks then
+    needs_all_tasks = namespace.list_arguments or namespace.stats or namespace.explain
+    prefilter = None if needs_all_tasks else Prefilter(namespace)
     try:
-        tasks = read_todotxt_files(namespace.file)
+        # Prefiltering the lines is cheaper than getting all tasks from the cache, so only use the cache if needed
+        tasks = read_todotxt_files(namespace.file, None if prefilter else default_cache(), prefilter)
     except OSError as reason:
         parser.error(f"can't open file: {reason}")
     if namespace.list_arguments:
         print(render_arguments(namespace.list_arguments, tasks))
+    elif namespace.stats:
+        graph = cast(TaskGraph, tasks.dependency_graph)
+        print(render_statistics(TaskStatistics(graph.tasks, table=graph.table), namespace))
     else:
-        actions = next_actions(tasks, namespace)
-        print(render_next_action(actions, tasks, namespace))
+        if namespace.assume_done:
+            tasks = cast(TaskGraph, tasks.dependency_graph).assume_done(namespace.assume_done)
+        for warning in unknown_task_ids(namespace, tasks) + dependency_cycles(tasks):
+            print(f"{parser.prog}: warning: {warning}", file=sys.stderr)
+        plan = Plan(tasks, namespace)
+        actions = next_actions(tasks, namespace, plan)
+        if not actions and prefilter:
+            # Warning about unknown contexts and projects when there's nothing to do needs all tasks
+            tasks = read_todotxt_files(namespace.file, default_cache())
+        if namespace.explain:
+            print(render_plan(plan), file=sys.stderr)
+        try:
+            write_next_action(actions, tasks, namespace, sys.stdout)
+        except BrokenPipeError:
+            # The reader of the output, e.g. head, has stopped reading. Point standard output at devnull so Python
+            # doesn't fail again when flushing standard output at exit.
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            sys.exit(1)
         if namespace.open_urls:
             open_urls(actions)
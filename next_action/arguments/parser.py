@@ -15,11 +15,14 @@ from pygments.styles import get_all_styles
 from .config import read_config_file, write_config_file, validate_config_file
 
 
-ARGUMENTS = ("@", "+", "-@", "-+", "-a", "--all", "-b", "--blocked", "-c", "--config-file", "-d", "--due",
-             "-f", "--file", "-g", "--groupby", "-h", "--help", "-n", "--number", "-o", "--overdue",
-             "-p", "--priority", "-r", "--reference", "-s", "--style", "-u", "--open-urls", "-V", "--version")
+ARGUMENTS = ("@", "+", "-@", "-+", "-a", "--all", "--assume-done", "-b", "--blocked", "-c", "--config-file", "-d",
+             "--depth", "--due", "--explain", "-f", "--file", "-g", "--groupby", "-h", "--help", "-n", "--number", "-o",
+             "--output", "--overdue", "--per-group", "-p", "--priority", "--rank", "-r", "--reference", "-s", "--style",
+             "--stats", "-u", "--open-urls", "-V", "--version")
 REFERENCE_CHOICES = ("always", "never", "multiple")
 GROUPBY_CHOICES = ("context", "duedate", "priority", "project", "source")
+RANK_CHOICES = ("priority", "impact")
+OUTPUT_CHOICES = ("text", "jsonl")
 
 
 class NextActionArgumentParser(argparse.ArgumentParser):
@@ -28,9 +31,11 @@ class NextActionArgumentParser(argparse.ArgumentParser):
     def __init__(self, version: str = "?") -> None:
         """Initialize the parser."""
         super().__init__(
-            usage=textwrap.fill("next-action [-h] [-V] [-c [<config.cfg>] | -w] [-f <todo.txt> ...] [-b] [-g "
-                                "[<group>]] [-l] [-r <ref>] [-s [<style>]] [-a | -n <number>] [-d [<due date>] | -o] "
-                                "[-p [<priority>]] [-u] [--] [<context|project> ...]",
+            usage=textwrap.fill("next-action [-h] [-V] [-c [<config.cfg>] | -w] [-f <todo.txt> ...] [--assume-done "
+                                "<id> ...] [-b] [--depth <depth>] [-g [<group>]] [-l] [-r <ref>] [-s [<style>]] "
+                                "[--output <format>] [--stats] [-a | -n <number>] [--rank <rank>] [--per-group] "
+                                "[-d [<due date>] | -o] [-p [<priority>]] [-u] [--explain] [--] "
+                                "[<context|project> ...]",
                                 width=shutil.get_terminal_size().columns - len("usage: ")),
             description="Show the next action in your todo.txt. The next action is selected from the tasks in the "
                         "todo.txt file based on task properties such as priority, due date, and creation date. Limit "
@@ -70,6 +75,10 @@ class NextActionArgumentParser(argparse.ArgumentParser):
             "-f", "--file", action="append", metavar="<todo.txt>", default=self.__default_filenames[:], type=str,
             help="filename of todo.txt file to read; can be '-' to read from standard input; argument can be "
                  "repeated to read tasks from multiple todo.txt files (default: ~/todo.txt)")
+        input_group.add_argument(
+            "--assume-done", action="append", metavar="<id>", default=[], type=str,
+            help="assume the task with the id is done, i.e. show the next actions as they would be after completing "
+                 "the task; argument can be repeated to assume multiple tasks are done")
 
     def add_output_options(self) -> None:
         """Add the output/styling options to the parser."""
@@ -77,6 +86,9 @@ class NextActionArgumentParser(argparse.ArgumentParser):
         output_group.add_argument(
             "-b", "--blocked", help="show the tasks blocked by the next action, if any (default: %(default)s)",
             action="store_true")
+        output_group.add_argument(
+            "--depth", metavar="<depth>", type=number_type, default=None,
+            help="maximum depth of the blocked tasks to show with --blocked (default: no maximum)")
         output_group.add_argument(
             "-g", "--groupby", choices=GROUPBY_CHOICES, default=None, nargs="?", metavar="<group>",
             help=f"group the next actions; available groups: {', '.join(GROUPBY_CHOICES)} (default: %(default)s)")
@@ -91,9 +103,21 @@ class NextActionArgumentParser(argparse.ArgumentParser):
         output_group.add_argument(
             "-s", "--style", metavar="<style>", choices=styles, default=None, nargs="?",
             help=f"colorize the output; available styles: {', '.join(styles)} (default: %(default)s)")
+        output_group.add_argument(
+            "--output", choices=OUTPUT_CHOICES, default="text", metavar="<format>",
+            help=f"output format; available formats: {', '.join(OUTPUT_CHOICES)}; jsonl shows a JSON object with the "
+                 "properties of the next action per line (default: %(default)s)")
+        output_group.add_argument(
+            "--stats", action="store_true",
+            help="show the number of tasks per status, due date, priority, context, and project instead of the next "
+                 "actions (default: %(default)s)")
         output_group.add_argument(
             "-u", "--open-urls", help="open the urls in the next actions, if any (default: %(default)s)",
             action="store_true")
+        output_group.add_argument(
+            "--explain", action="store_true",
+            help="show on standard error how the next actions were selected: the filters in the order they were "
+                 "applied and the number of tasks each filter examined (default: %(default)s)")
 
     def add_number_options(self) -> None:
         """Add the number options to the parser."""
@@ -105,6 +129,13 @@ class NextActionArgumentParser(argparse.ArgumentParser):
         number.add_argument(
             "-n", "--number", metavar="<number>", type=number_type, default=1,
             help="number of next actions to show (default: %(default)s)")
+        number_group.add_argument(
+            "--rank", choices=RANK_CHOICES, default="priority", metavar="<rank>",
+            help=f"rank the next actions; available rankings: {', '.join(RANK_CHOICES)}; impact ranks next actions "
+                 "that block more tasks, directly or indirectly, first (default: %(default)s)")
+        number_group.add_argument(
+            "--per-group", action="store_true",
+            help="show the number of next actions for each group when grouping next actions (default: %(default)s)")
 
     def add_filter_arguments(self) -> None:
         """Add the filter arguments to the parser."""
@@ -149,6 +180,7 @@ class NextActionArgumentParser(argparse.ArgumentParser):
         self.validate_arguments(namespace)
         if getattr(namespace, "config_file", self.get_default("config_file")) is not None:
             self.process_config_file(namespace)
+        self.validate_dependent_arguments(namespace)
         self.fix_filenames(namespace)
         if namespace.write_config_file:
             write_config_file(namespace)
@@ -175,6 +207,13 @@ class NextActionArgumentParser(argparse.ArgumentParser):
             if value in namespace.excluded_projects:
                 self.error(f"+{value} is both included and excluded")
 
+    def validate_dependent_arguments(self, namespace: argparse.Namespace) -> None:
+        """Validate arguments that need other arguments, which may have been configured in the configuration file."""
+        if namespace.per_group and not namespace.groupby:
+            self.error("argument --per-group: not allowed without argument -g/--groupby")
+        if namespace.depth and not namespace.blocked:
+            self.error("argument --depth: not allowed without argument -b/--blocked")
+
     def process_config_file(self, namespace: argparse.Namespace) -> None:
         """Process the configuration file."""
         config_filename = namespace.config_file
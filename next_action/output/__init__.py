@@ -1,61 +1,86 @@
 """Package for formatting output."""
 
 import argparse
-from typing import Iterable, List
+import datetime
+import itertools
+import json
+from typing import Any, Counter, Dict, Iterable, Iterator, List, Set, TextIO, Tuple
 
 from pygments.styles import get_all_styles
 
 from .. import todotxt, arguments
+from ..planner import Plan
 from .color import colorize
+from .record import json_line
 from .reference import reference
 from .url import open_urls
-from .warning import invalid_arguments
+from .warning import dependency_cycles, invalid_arguments, unknown_task_ids
+
+
+WRITE_BATCH_SIZE = 1000  # The number of rendered tasks written to the output stream at once
 
 
 def render_blocked_tasks(task: todotxt.Task, namespace: argparse.Namespace, level: int = 0) -> str:
-    """Render the tasks blocked by the task, if any."""
-    rendered_blocked_tasks = ""
-    if namespace.blocked:
-        blocked_tasks = task.blocked_tasks()
-        if blocked_tasks:
-            rendered_blocked_tasks += "\n" + level * "  " + "blocks:"
-            for blocked_task in blocked_tasks:
-                rendered_blocked_tasks += "\n" + render_task(blocked_task, namespace, level + 1)
-    return rendered_blocked_tasks
+    """Render the tasks blocked by the task, once per next action and up to the maximum depth, if any."""
+    if not namespace.blocked:
+        return ""
+    expanded: Set[todotxt.Task] = set()
+    lines = []
+    stack = [(task, level, False)]  # The task itself has already been rendered
+    while stack:
+        current_task, current_level, render_line = stack.pop()
+        if render_line:
+            lines.append(render_task_line(current_task, namespace, current_level))
+        blocked_tasks = current_task.blocked_tasks()
+        if not blocked_tasks:
+            continue
+        blocks = current_level * "  " + "blocks:"
+        if current_task in expanded:
+            lines.append(f"{blocks} see {reference(current_task, namespace)} above")
+        elif namespace.depth and current_level - level >= namespace.depth:
+            lines.append(f"{blocks} ...")
+        else:
+            expanded.add(current_task)
+            lines.append(blocks)
+            stack.extend((blocked_task, current_level + 1, True) for blocked_task in reversed(blocked_tasks))
+    return "".join("\n" + line for line in lines)
+
+
+def render_task_line(task: todotxt.Task, namespace: argparse.Namespace, level: int = 0) -> str:
+    """Render one task, without the tasks it blocks."""
+    indent = (level - 1) * "  " + "- " if level else ""
+    return indent + colorize(reference(task, namespace), namespace)
 
 
 def render_task(task: todotxt.Task, namespace: argparse.Namespace, level: int = 0) -> str:
-    """Render one task."""
-    indent = (level - 1) * "  " + "- " if level else ""
-    rendered_task = colorize(reference(task, namespace), namespace)
-    rendered_blocked_tasks = render_blocked_tasks(task, namespace, level)
-    return indent + rendered_task + rendered_blocked_tasks
+    """Render one task and the tasks it blocks."""
+    return render_task_line(task, namespace, level) + render_blocked_tasks(task, namespace, level)
 
 
-def render_tasks(tasks: todotxt.Tasks, namespace: argparse.Namespace) -> str:
-    """Render the tasks using the options in the namespace."""
-    return "\n".join(render_task(task, namespace) for task in tasks)
+def generate_tasks(tasks: todotxt.Tasks, namespace: argparse.Namespace) -> Iterator[str]:
+    """Generate the rendered tasks using the options in the namespace, one task and the tasks it blocks at a time."""
+    for task in tasks:
+        yield render_task(task, namespace)
+
 
+def group_tasks(tasks: todotxt.Tasks, namespace: argparse.Namespace) -> Dict[Any, List[todotxt.Task]]:
+    """Return the tasks grouped using the options in the namespace, with the groups ordered by their first task."""
+    groups = getattr(tasks, "groups", None)
+    if groups is None:
+        groups = {}
+        for task in tasks:
+            for group in task.groups(namespace.groupby):
+                groups.setdefault(group, []).append(task)
+    return groups
 
-def render_grouped_tasks(tasks: todotxt.Tasks, namespace: argparse.Namespace) -> str:
-    """Render the tasks grouped using the options in the namespace."""
-    get_groups = dict(
-        project=lambda task: task.projects() or [None],
-        context=lambda task: task.contexts() or [None],
-        priority=lambda task: [task.priority() or None],
-        duedate=lambda task: [task.due_date() or None],
-        source=lambda task: [task.filename])[namespace.groupby]
+
+def generate_grouped_tasks(tasks: todotxt.Tasks, namespace: argparse.Namespace) -> Iterator[str]:
+    """Generate the rendered groups and tasks using the options in the namespace."""
     no_group_label = f"No {namespace.groupby}".replace("duedate", "due date")
-    groups: List[str] = []
-    for task in tasks:
-        for group in sorted(get_groups(task)):
-            if group not in groups:
-                groups.append(group)
-    lines = []
-    for group in groups:
-        lines.append(f"{group or no_group_label}:")
-        lines.extend(render_task(task, namespace, level=1) for task in tasks if group in get_groups(task))
-    return "\n".join(lines)
+    for group, grouped_tasks in group_tasks(tasks, namespace).items():
+        yield f"{group or no_group_label}:"
+        for task in grouped_tasks:
+            yield render_task(task, namespace, 1)
 
 
 def render_nothing_todo(tasks: todotxt.Tasks, namespace: argparse.Namespace):
@@ -64,12 +89,74 @@ def render_nothing_todo(tasks: todotxt.Tasks, namespace: argparse.Namespace):
     return "Nothing to do!" + (warning if warning else " 😴")
 
 
-def render_next_action(next_actions: todotxt.Tasks, tasks: todotxt.Tasks, namespace: argparse.Namespace) -> str:
-    """Render the next action(s) or, if there are none, tell the user there's nothing to do."""
-    if next_actions:
-        render = render_grouped_tasks if namespace.groupby else render_tasks
-        return render(next_actions, namespace)
-    return render_nothing_todo(tasks, namespace)
+def generate_json_lines(tasks: todotxt.Tasks, namespace: argparse.Namespace) -> Iterator[str]:
+    """Generate a JSON record per next action, or per next action per group if the next actions are grouped."""
+    if not namespace.groupby:
+        for task in tasks:
+            yield json_line(task)
+        return
+    for group, grouped_tasks in group_tasks(tasks, namespace).items():
+        group = group.isoformat() if isinstance(group, datetime.date) else group
+        for task in grouped_tasks:
+            yield json_line(task, group=group)
+
+
+def generate_next_action(next_actions: todotxt.Tasks, tasks: todotxt.Tasks,
+                         namespace: argparse.Namespace) -> Iterator[str]:
+    """Generate the rendered next action(s) or, if there are none, tell the user there's nothing to do."""
+    if namespace.output == "jsonl":
+        yield from generate_json_lines(next_actions, namespace)
+    elif next_actions:
+        generate = generate_grouped_tasks if namespace.groupby else generate_tasks
+        yield from generate(next_actions, namespace)
+    else:
+        yield render_nothing_todo(tasks, namespace)
+
+
+def write_next_action(next_actions: todotxt.Tasks, tasks: todotxt.Tasks, namespace: argparse.Namespace,
+                      stream: TextIO) -> None:
+    """Write the next action(s) to the stream in batches, while they are being rendered."""
+    rendered = generate_next_action(next_actions, tasks, namespace)
+    while True:
+        batch = list(itertools.islice(rendered, WRITE_BATCH_SIZE))
+        if not batch:
+            break
+        stream.write("\n".join(batch))
+        stream.write("\n")
+        stream.flush()
+
+
+def render_statistics(statistics: todotxt.TaskStatistics, namespace: argparse.Namespace) -> str:
+    """Render the statistics of the tasks, as text or as one JSON object."""
+    priorities = [(priority or "no priority", statistics.priorities[priority])
+                  for priority in sorted(statistics.priorities, key=lambda priority: priority or "ZZZ")]
+    sections = {
+        "status": [(status, statistics.status[status]) for status in ("unblocked", "blocked")],
+        "due": [(bucket, statistics.due[bucket]) for bucket in todotxt.DUE_BUCKETS], "priorities": priorities,
+        "contexts": [(f"@{context}", count) for context, count in most_common(statistics.contexts)],
+        "projects": [(f"+{project}", count) for project, count in most_common(statistics.projects)]}
+    if namespace.output == "jsonl":
+        return json.dumps({"total": statistics.total, **{name: dict(counts) for name, counts in sections.items()}},
+                          ensure_ascii=False)
+    lines = [f"Tasks: {statistics.total}"]
+    for name, counts in sections.items():
+        lines.append(f"{name.capitalize()}: {', '.join(f'{count} {label}' for label, count in counts) or 'none'}")
+    return "\n".join(lines)
+
+
+def most_common(counter: Counter[str]) -> List[Tuple[str, int]]:
+    """Return the items and their counts, most common first and then by item."""
+    return sorted(counter.items(), key=lambda item: (-item[1], item[0]))
+
+
+def render_plan(plan: Plan) -> str:
+    """Render the executed plan: the filters in the order they were applied and the number of tasks examined."""
+    width = max(len(step.description) for step in plan.steps)
+    lines = [f"Plan for {len(plan.tasks)} tasks:"]
+    for number, step in enumerate(plan.steps, start=1):
+        lines.append(f"{number:>2}. {step.description:<{width}}  {step.method:<5}  estimated: {step.estimate}, "
+                     f"examined: {step.examined}, remaining: {step.remaining}")
+    return "\n".join(lines)
 
 
 def render_arguments(argument_type: str, tasks: todotxt.Tasks) -> str:
@@ -0,0 +1,28 @@
+"""Machine-readable records of the next actions."""
+
+import datetime
+import json
+from typing import Any, Dict, Optional
+
+from .. import todotxt
+
+
+def iso_date(date: Optional[datetime.date]) -> Optional[str]:
+    """Return the date in ISO format, if any."""
+    return date.isoformat() if date else None
+
+
+def task_record(task: todotxt.Task) -> Dict[str, Any]:
+    """Return the record of the task, with its inherited priority and due date and the tasks it blocks."""
+    return {
+        "text": task.text, "priority": task.priority(), "due_date": iso_date(task.due_date()),
+        "creation_date": iso_date(task.creation_date()), "threshold_date": iso_date(task.threshold_date()),
+        "contexts": sorted(task.contexts()), "projects": sorted(task.projects()), "id": task.task_id() or None,
+        "filename": task.filename, "line_number": task.line_number, "urls": task.urls(),
+        "blocks": [{"id": blocked_task.task_id() or None, "filename": blocked_task.filename,
+                    "line_number": blocked_task.line_number} for blocked_task in task.blocked_tasks()]}
+
+
+def json_line(task: todotxt.Task, **fields: Any) -> str:
+    """Return the record of the task, with the extra fields, as one line of JSON."""
+    return json.dumps({**task_record(task), **fields}, ensure_ascii=False)
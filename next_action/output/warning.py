@@ -1,6 +1,7 @@
 """Module for warning messages."""
 
 import argparse
+from typing import List
 
 from .. import todotxt
 
@@ -17,3 +18,16 @@ def invalid_arguments(namespace: argparse.Namespace, tasks: todotxt.Tasks) -> st
         plural = "s" if len(unknown_projects) > 1 else ""
         error_messages.append(f"unknown project{plural}: {', '.join(sorted(unknown_projects))}")
     return f" (warning: {'; '.join(error_messages)})" if error_messages else ""
+
+
+def dependency_cycles(tasks: todotxt.Tasks) -> List[str]:
+    """Return a warning for each group of tasks that block each other, if any."""
+    return [f"tasks block each other: {'; '.join(task.text for task in cycle)}" for cycle in tasks.dependency_cycles]
+
+
+def unknown_task_ids(namespace: argparse.Namespace, tasks: todotxt.Tasks) -> List[str]:
+    """Check whether the task ids of the tasks assumed to be done actually exist in the task file."""
+    task_ids = tasks.dependency_graph.node_by_id if tasks.dependency_graph else {}
+    unknown_ids = [task_id for task_id in namespace.assume_done if task_id not in task_ids]
+    plural = "s" if len(unknown_ids) > 1 else ""
+    return [f"unknown task id{plural}: {', '.join(unknown_ids)}"] if unknown_ids else []
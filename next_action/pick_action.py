@@ -1,49 +1,80 @@
 """Algorithm for deciding the next action(s)."""
 
 import argparse
-import datetime
-
-from typing import Tuple
+import heapq
+import sys
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, TypeVar, Union
 
 from . import todotxt
+from .planner import Plan
+
+
+Item = TypeVar("Item")
+Key = Union[int, Tuple[int, int]]
+
+
+def select(items: Iterable[Item], number: int,
+           key: Callable[[Item], Key] = todotxt.Task.sort_key) -> List[Item]:  # type: ignore[assignment]
+    """Return the first number of tasks, ordered by sort key, without sorting all tasks if only a few are needed."""
+    if number == 1:
+        first = min(items, key=key, default=None)
+        return [] if first is None else [first]
+    if number == sys.maxsize:  # The user wants to see all next actions
+        return sorted(items, key=key)
+    return heapq.nsmallest(number, items, key=key)
+
+
+def select_per_group(items: Iterable[Item], number: int, groups: Callable[[Item], List[Any]],
+                     key: Callable[[Item], Key]) -> Dict[Any, List[Item]]:
+    """Return the first number of tasks of each group, ordered by sort key, in one pass over the tasks."""
+    heaps: Dict[Any, List[Tuple[Key, int, Item]]] = {}
+    for position, item in enumerate(items):
+        item_key = key(item)
+        negated_key: Key = -item_key if isinstance(item_key, int) else (-item_key[0], -item_key[1])
+        entry: Tuple[Key, int, Item] = (negated_key, -position, item)
+        for group in groups(item):
+            heap = heaps.setdefault(group, [])
+            if len(heap) < number:
+                heapq.heappush(heap, entry)
+            elif entry[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, entry)
+    selected = {group: sorted(heap, key=lambda entry: entry[:2], reverse=True) for group, heap in heaps.items()}
+    # Groups with the same first item are ordered like the groups of that item
+    ordered = sorted(selected, reverse=True,
+                     key=lambda group: (selected[group][0][:2], -groups(selected[group][0][2]).index(group)))
+    return {group: [item for _, _, item in selected[group]] for group in ordered}
+
+
+def next_actions(tasks: Sequence[todotxt.Task], arguments: argparse.Namespace,
+                 plan: Optional[Plan] = None) -> todotxt.Tasks:
+    """Return the next action(s) from the collection of tasks, ranked and, optionally, per group."""
+    groupby = getattr(arguments, "groupby", "")
+    per_group = bool(groupby and getattr(arguments, "per_group", False))
+    plan = plan or Plan(tasks, arguments)
+    candidates = plan.tasks
+    if plan.vectorized and not per_group and getattr(arguments, "rank", "priority") == "priority":
+        # Rank the rows of large task tables by their sort key with NumPy
+        rows = plan.vectorized.select(plan.execute_bitset(), arguments.number)  # pragma: no cover-behave
+        return todotxt.Tasks(candidates[row] for row in rows)  # pragma: no cover-behave
+    # Filter and rank the rows of the task table and only look up the tasks of the selected rows
+    rows, table = plan.execute_rows(), plan.table
+    key = row_key(candidates, rows, arguments)
+    if per_group:
+        groups = select_per_group(rows, arguments.number, lambda row: table.groups(row, groupby), key)
+        return grouped_tasks({group: [candidates[row] for row in group_rows] for group, group_rows in groups.items()})
+    # Select the first tasks by rank, e.g. by priority, due date and creation date, from the tasks that pass the filters
+    return todotxt.Tasks(candidates[row] for row in select(rows, arguments.number, key=key))
+
+
+def row_key(tasks: todotxt.Tasks, rows: Sequence[int], arguments: argparse.Namespace) -> Callable[[int], Key]:
+    """Return the function that gives the key to rank the rows of the task table by."""
+    sort_keys = tasks.task_table().sort_keys()
+    if getattr(arguments, "rank", "priority") == "impact":
+        counts = todotxt.unblock_counts(tasks[row] for row in rows)
+        return lambda row: (-counts[tasks[row]], sort_keys[row])
+    return sort_keys.__getitem__
 
 
-def sort_key(task: todotxt.Task) -> Tuple[str, datetime.date, datetime.date, int]:
-    """Return the sort key for a task."""
-    return (task.priority() or "ZZZ", task.due_date() or datetime.date.max, task.creation_date() or datetime.date.max,
-            -len(task.projects()))
-
-
-def next_actions(tasks: todotxt.Tasks, arguments: argparse.Namespace) -> todotxt.Tasks:
-    """Return the next action(s) from the collection of tasks."""
-    contexts = arguments.contexts
-    projects = arguments.projects
-    excluded_contexts = arguments.excluded_contexts
-    excluded_projects = arguments.excluded_projects
-
-    # First, get the potential next actions by filtering out hidden tasks and tasks with a future creation date
-    # or threshold date
-    eligible_tasks = filter(lambda task: not task.is_future() and not task.is_hidden(), tasks)
-    # Then, exclude tasks that have an excluded context
-    if excluded_contexts:
-        eligible_tasks = filter(lambda task: not excluded_contexts & task.contexts(), eligible_tasks)
-    # And, tasks that have an excluded project
-    if excluded_projects:
-        eligible_tasks = filter(lambda task: not excluded_projects & task.projects(), eligible_tasks)
-    # Then, select the tasks that belong to all given contexts, if any
-    if contexts:
-        eligible_tasks = filter(lambda task: contexts <= task.contexts(), eligible_tasks)
-    # Next, select the tasks that belong to at least one of the given projects, if any
-    if projects:
-        eligible_tasks = filter(lambda task: projects & task.projects(), eligible_tasks)
-    # If the user only wants to see overdue tasks, filter out non-overdue tasks
-    if arguments.overdue:
-        eligible_tasks = filter(lambda task: task.is_overdue(), eligible_tasks)
-    # If the user only wants to see tasks due before a due date, filter out non-due tasks
-    if arguments.due:
-        eligible_tasks = filter(lambda task: task.is_due(arguments.due), eligible_tasks)
-    # If the user specified a minimum priority, filter out tasks with a lower priority or no priority
-    if arguments.priority:
-        eligible_tasks = filter(lambda task: task.priority_at_least(arguments.priority), eligible_tasks)
-    # Finally, sort by priority, due date and creation date
-    return todotxt.Tasks(sorted(eligible_tasks, key=sort_key)[:arguments.number])
+def grouped_tasks(groups: Dict[Any, List[todotxt.Task]]) -> todotxt.Tasks:
+    """Return the tasks of the groups, with the groups."""
+    return todotxt.Tasks(dict.fromkeys(task for tasks in groups.values() for task in tasks), groups=groups)
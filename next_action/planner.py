@@ -0,0 +1,211 @@
+"""Planner that decides in which order to apply the filters that select the candidates for the next action(s)."""
+
+import argparse
+import datetime
+import functools
+import operator
+from typing import Callable, Hashable, List, Optional, Sequence, Tuple
+
+from . import todotxt
+from .todotxt.index import bitset, positions
+from .todotxt.table import encode_priority, NO_ORDINAL
+from .todotxt.vectorized import vectorized_table, Mask, VectorizedTable
+
+
+Predicate = Callable[[int], bool]  # Predicate on the rows of the task table
+MaskFunction = Callable[[VectorizedTable], Mask]  # Vectorized version of a predicate
+
+
+def popcount(bits: int) -> int:
+    """Return the number of bits set in the bitset."""
+    return bin(bits).count("1")
+
+
+def all_of(predicates: Sequence[Predicate]) -> Predicate:
+    """Return the predicate that holds if all predicates hold, evaluated in order."""
+    def predicate(row: int) -> bool:
+        """Return whether all predicates hold for the row."""
+        for each_predicate in predicates:
+            if not each_predicate(row):
+                return False
+        return True
+    return predicate
+
+
+class Step:  # pylint: disable=too-few-public-methods,too-many-instance-attributes,too-many-arguments
+    """One filter of a plan, executed with the bitset of the filter or by scanning the candidates."""
+
+    def __init__(self, description: str, estimate: int, create_bitset: Callable[[], int], predicate: Predicate,
+                 key: Tuple[Hashable, ...], *, indexed: bool, mask: Optional[MaskFunction] = None) -> None:
+        """Initialise the step with its description, estimated number of matching tasks, and ways to execute it."""
+        self.description = description
+        self.estimate = estimate
+        self.create_bitset = create_bitset
+        self.predicate = predicate
+        self.key = key  # The key of the bitset of the step in the task index
+        self.indexed = indexed  # Whether the bitset is available without evaluating the predicate for all tasks
+        self.mask = mask  # The vectorized predicate, if any
+        self.method = ""  # How the step was executed: "index", "scan", or "skip" if there were no candidates left
+        self.examined = 0  # The number of candidates before the step
+        self.remaining = 0  # The number of candidates after the step
+
+    def execute(self, candidates: int, nr_rows: int) -> int:
+        """Return the candidates that pass the filter and record how the step was executed."""
+        self.examined = popcount(candidates)
+        if not candidates:
+            self.method = "skip"
+        elif self.indexed or self.examined == nr_rows:
+            # Scanning all tasks costs as much as creating the bitset, so create the bitset and have it cached
+            self.method = "index"
+            candidates &= self.create_bitset()
+        else:
+            self.method = "scan"
+            predicate = self.predicate
+            candidates = bitset((row for row in positions(candidates) if predicate(row)), nr_rows)
+        self.remaining = popcount(candidates)
+        return candidates
+
+
+class Plan:  # pylint: disable=too-few-public-methods
+    """Plan for filtering the tasks, with the cheap indexed steps first and the expensive steps fused into one."""
+
+    def __init__(self, tasks: Sequence[todotxt.Task], arguments: argparse.Namespace) -> None:
+        """Create the plan for the filters in the arguments."""
+        self.tasks = tasks if isinstance(tasks, todotxt.Tasks) else todotxt.Tasks(tasks)
+        self.table = self.tasks.task_table()
+        self.index = self.tasks.task_index()
+        self.vectorized = vectorized_table(self.table)  # None if the table is small or NumPy is not installed
+        self.today = datetime.date.today()
+        steps = sorted(self.__steps(arguments), key=lambda step: (not step.indexed, step.estimate))
+        self.steps = [step for step in steps if step.indexed]
+        # The steps that aren't indexed include the steps for hidden and future tasks, so there's always a step to fuse
+        self.steps.append(self.__fuse([step for step in steps if not step.indexed]))
+
+    def execute(self) -> List[todotxt.Task]:  # pragma: no cover-behave
+        """Execute the plan and return the tasks that pass all filters, in order."""
+        return [self.tasks[row] for row in self.execute_rows()]
+
+    def execute_rows(self) -> List[int]:
+        """Execute the plan and return the rows of the task table that pass all filters, in order."""
+        return positions(self.execute_bitset())
+
+    def execute_bitset(self) -> int:
+        """Execute the plan and return the bitset of the rows of the task table that pass all filters."""
+        candidates = self.index.all_tasks()
+        for step in self.steps:
+            candidates = step.execute(candidates, len(self.table))
+        return candidates
+
+    def __fuse(self, steps: Sequence[Step]) -> Step:
+        """Fuse the steps into one step that evaluates the predicates of all steps, in order, in one pass."""
+        nr_tasks = len(self.tasks)
+        estimate = nr_tasks
+        for step in steps:
+            estimate = estimate * step.estimate // max(nr_tasks, 1)  # Assume the filters are independent
+        predicate = all_of([step.predicate for step in steps])
+        key = ("all_of", tuple(step.key for step in steps))
+        description = " and ".join(step.description for step in steps)
+        if self.vectorized:  # pragma: no cover-behave
+            # Evaluating the masks for all rows is cheaper than evaluating the predicate for the remaining candidates
+            masks = [step.mask for step in steps if step.mask]
+            create_bitset = functools.partial(self.__vectorized_bitset, self.vectorized, masks, key)
+            return Step(description, estimate, create_bitset, predicate, key, indexed=True)
+        return Step(description, estimate, lambda: self.index.where(key, predicate), predicate, key,
+                    indexed=self.index.has_bitset(key))
+
+    def __vectorized_bitset(self, vectorized: VectorizedTable, masks: List[MaskFunction],
+                            key: Tuple[Hashable, ...]) -> int:  # pragma: no cover-behave
+        """Return the bitset of the rows in all masks, creating it with NumPy if it isn't cached yet."""
+        return self.index.cached(key, lambda: vectorized.bitset(functools.reduce(
+            operator.and_, (mask(vectorized) for mask in masks))))
+
+    def __steps(self, arguments: argparse.Namespace) -> List[Step]:
+        """Return the steps for the filters in the arguments, in the order of the arguments."""
+        # The potential next actions are the tasks that are not hidden and have no future creation or threshold date
+        steps = [self.__not_hidden_step(), self.__not_future_step()]
+        steps.extend(self.__context_step(context, excluded=True) for context in sorted(arguments.excluded_contexts))
+        steps.extend(self.__project_step([project], excluded=True) for project in sorted(arguments.excluded_projects))
+        steps.extend(self.__context_step(context) for context in sorted(arguments.contexts))
+        if arguments.projects:
+            steps.append(self.__project_step(sorted(arguments.projects)))
+        if arguments.overdue:
+            steps.append(self.__overdue_step())
+        if arguments.due:
+            steps.append(self.__due_step(arguments.due))
+        if arguments.priority:
+            steps.append(self.__priority_step(arguments.priority))
+        return steps
+
+    def __indexed_step(self, description: str, estimate: int, create_bitset: Callable[[], int], predicate: Predicate,
+                       *key: Hashable) -> Step:  # pylint: disable=too-many-arguments
+        """Return a step whose bitset is created from the index, without evaluating the predicate for all tasks."""
+        return Step(description, estimate, create_bitset, predicate, key, indexed=True)
+
+    def __scanned_step(self, description: str, estimate: int, predicate: Predicate, mask: MaskFunction,
+                       *key: Hashable) -> Step:  # pylint: disable=too-many-arguments
+        """Return a step that needs to evaluate the predicate or the mask for each task. The plan fuses these steps."""
+        return Step(description, estimate, lambda: self.index.where(key, predicate), predicate, key, indexed=False,
+                    mask=mask)
+
+    def __not_hidden_step(self) -> Step:
+        """Return the step that filters out hidden tasks."""
+        hidden = self.table.hidden
+        return self.__scanned_step("not hidden", len(self.tasks) - self.index.hidden_count(),
+                                   lambda row: not hidden[row], VectorizedTable.not_hidden, "not_hidden")
+
+    def __not_future_step(self) -> Step:
+        """Return the step that filters out future tasks, i.e. tasks with a creation or threshold date after today."""
+        today = self.today.toordinal()
+        creation_dates, threshold_dates = self.table.creation_dates, self.table.threshold_dates
+        return self.__scanned_step("not future", len(self.tasks) - self.index.future_count(self.today),
+                                   lambda row: (creation_dates[row] or threshold_dates[row]) <= today,
+                                   lambda vectorized: vectorized.not_future(self.today), "not_future", self.today)
+
+    def __context_step(self, context: str, excluded: bool = False) -> Step:
+        """Return the step that selects the tasks that have, or if excluded don't have, the context."""
+        count, contexts = self.index.context_count(context), self.table.contexts
+        if excluded:
+            return self.__indexed_step(f"not @{context}", len(self.tasks) - count, lambda: ~self.index.context(context),
+                                       lambda row: context not in contexts.names(row), "not_context", context)
+        return self.__indexed_step(f"@{context}", count, lambda: self.index.context(context),
+                                   lambda row: context in contexts.names(row), "context", context)
+
+    def __project_step(self, projects: List[str], excluded: bool = False) -> Step:
+        """Return the step that selects the tasks that belong to at least one, or if excluded none, of the projects."""
+        count = min(len(self.tasks), sum(self.index.project_count(project) for project in projects))
+        project_set, project_names = frozenset(projects), self.table.projects
+
+        def project_bitsets() -> int:
+            """Return the bitset of the tasks that belong to at least one of the projects."""
+            return functools.reduce(operator.or_, (self.index.project(project) for project in projects))
+
+        if excluded:
+            return self.__indexed_step(f"not +{projects[0]}", len(self.tasks) - count, lambda: ~project_bitsets(),
+                                       lambda row: project_set.isdisjoint(project_names.names(row)), "not_projects",
+                                       project_set)
+        return self.__indexed_step(" or ".join(f"+{project}" for project in projects), count, project_bitsets,
+                                   lambda row: not project_set.isdisjoint(project_names.names(row)), "projects",
+                                   project_set)
+
+    def __overdue_step(self) -> Step:
+        """Return the step that selects the overdue tasks."""
+        today, due_dates = self.today.toordinal(), self.table.due_dates
+        return self.__scanned_step("overdue", self.index.overdue_count(self.today),
+                                   lambda row: NO_ORDINAL < due_dates[row] < today,
+                                   lambda vectorized: vectorized.overdue(self.today), "overdue", self.today)
+
+    def __due_step(self, due_date: datetime.date) -> Step:
+        """Return the step that selects the tasks due on or before the due date."""
+        description = "has due date" if due_date == datetime.date.max else f"due on or before {due_date.isoformat()}"
+        due_ordinal, due_dates = due_date.toordinal(), self.table.due_dates
+        return self.__scanned_step(description, self.index.due_count(due_date),
+                                   lambda row: NO_ORDINAL < due_dates[row] <= due_ordinal,
+                                   lambda vectorized: vectorized.due(due_date), "due", due_date)
+
+    def __priority_step(self, min_priority: str) -> Step:
+        """Return the step that selects the tasks that have at least the minimum priority."""
+        min_priority_code, priorities = encode_priority(min_priority), self.table.priorities
+        return self.__scanned_step(f"priority {min_priority} or higher", self.index.priority_count(min_priority),
+                                   lambda row: priorities[row] <= min_priority_code,
+                                   lambda vectorized: vectorized.priority_at_least(min_priority), "priority_at_least",
+                                   min_priority)
@@ -1,39 +1,82 @@
 """Package for dealing with the todo.txt format."""
 
-import fileinput
 import os
-from typing import cast, List, Sequence
+import sys
+from typing import List, NamedTuple, Optional, Sequence, Tuple
 
-from .task import Task
+from .cache import default_cache, ParseCache
+from .graph import unblock_counts, DependencyGraph, TaskGraph
+from .prefilter import Prefilter
+from .statistics import DUE_BUCKETS, TaskStatistics
+from .table import TaskTable
+from .task import uncompleted_task_texts, Task
 from .tasks import Tasks
+from .tokenizer import tokenize, Tokens
 
 
-def uncompleted_task_on(line: str) -> bool:
-    """Return whether there's an uncompleted task on the line."""
-    return bool(line.strip() and not line.startswith("x "))
-
-
-def unblocked_tasks(tasks: Sequence[Task]) -> Sequence[Task]:
-    """Set the blocked status of the tasks and return only the unblocked tasks."""
-    task_by_id = {task.task_id(): task for task in tasks if task.task_id()}
-    for task in tasks:
-        for parent_id in task.parent_ids():
-            parent_task = task_by_id.get(parent_id)
-            if parent_task:
-                parent_task.set_is_blocked()
-                task.add_blocked_task(parent_task)
-        for child_id in task.child_ids():
-            child_task = task_by_id.get(child_id)
-            if child_task:
-                task.set_is_blocked()
-                child_task.add_blocked_task(task)
-    return [task for task in tasks if not task.is_blocked()]
-
-
-def read_todotxt_files(filenames: List[str]) -> Tasks:
-    """Read tasks from the Todo.txt files."""
-    filenames = [os.path.expanduser(filename) for filename in filenames]
-    with cast(fileinput.FileInput, fileinput.input(filenames)) as todotxt_file:
-        tasks = [Task(line.strip(), todotxt_file.filename(), index + 1) for index, line in enumerate(todotxt_file)
-                 if uncompleted_task_on(line)]
-    return Tasks(unblocked_tasks(tasks))
+class UncompletedTasks(NamedTuple):
+    """The uncompleted tasks of a todo.txt file, with their line numbers, texts, and tokens if cached."""
+
+    name: str
+    line_count: int
+    line_numbers: List[int]
+    texts: List[str]
+    tokens: Sequence[Optional[Tokens]]
+
+
+def unblocked_tasks(tasks: Sequence[Task]) -> Tasks:  # pragma: no cover-behave
+    """Link the tasks and return the unblocked tasks, with the cycles of tasks that block each other."""
+    return TaskGraph(tasks).link()
+
+
+def read_todotxt_files(filenames: List[str], cache: Optional[ParseCache] = None,
+                       prefilter: Optional[Prefilter] = None) -> Tasks:
+    """Read tasks from the Todo.txt files, using the parse cache and the prefilter, if any."""
+    # Create the tasks and their table first, so the texts and tokens of all lines are released before linking
+    return TaskGraph(*create_tasks(filenames, cache, prefilter)).link()
+
+
+def create_tasks(filenames: List[str], cache: Optional[ParseCache],
+                 prefilter: Optional[Prefilter]) -> Tuple[List[Task], TaskTable]:
+    """Create the tasks in the Todo.txt files that pass the prefilter, if any, and the table of the tasks."""
+    texts: List[str] = []
+    names: List[str] = []
+    line_numbers: List[int] = []
+    tokens: List[Optional[Tokens]] = []
+    line_count = 0
+    for filename in [os.path.expanduser(filename) for filename in filenames]:
+        uncompleted = read_uncompleted_tasks(filename, cache)
+        texts.extend(uncompleted.texts)
+        names.extend([uncompleted.name] * len(uncompleted.texts))
+        line_numbers.extend(line_count + line_number for line_number in uncompleted.line_numbers)
+        tokens.extend(uncompleted.tokens)
+        line_count += uncompleted.line_count
+    rows = prefilter.select(texts, tokens) if prefilter else range(len(texts))
+    # Put the tokens in the table, so the tasks needn't keep them. Tasks tokenize their text again when rendered
+    table = TaskTable()
+    tasks = []
+    for row in rows:
+        task = Task(texts[row], names[row], line_numbers[row])
+        table.append(tokens[row] or tokenize(texts[row]), task.file_index, task.line_number)
+        tasks.append(task)
+    return tasks, table
+
+
+def read_uncompleted_tasks(filename: str, cache: Optional[ParseCache]) -> UncompletedTasks:
+    """Return the uncompleted tasks of the Todo.txt file. Only tasks read from the parse cache have tokens."""
+    parsed = cache.read(filename) if cache else None
+    if parsed:
+        return UncompletedTasks(filename, parsed.line_count, parsed.line_numbers, parsed.texts, parsed.tokens)
+    name, lines = read_todotxt_file(filename)
+    texts = uncompleted_task_texts(lines)
+    line_numbers = [index + 1 for index, text in enumerate(texts) if text]
+    texts = [text for text in texts if text]
+    return UncompletedTasks(name, len(lines), line_numbers, texts, [None] * len(texts))
+
+
+def read_todotxt_file(filename: str) -> Tuple[str, List[bytes]]:
+    """Return the name and the undecoded lines of the Todo.txt file, or of standard input if the filename is -."""
+    if filename == "-":
+        return "<stdin>", sys.stdin.buffer.read().splitlines()
+    with open(filename, "rb") as todotxt_file:
+        return filename, todotxt_file.read().splitlines()
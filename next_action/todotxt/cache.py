@@ -0,0 +1,255 @@
+"""Persistent cache of parsed todo.txt files, so lines that haven't changed needn't be tokenized again."""
+
+import bisect
+import hashlib
+import os
+import pickle  # nosec: only entries in a directory and in files owned by the user and private to them are loaded
+import stat
+import tempfile
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from .task import uncompleted_task_texts
+from .tokenizer import tokenize, Tokens
+
+
+CACHE_VERSION = 3  # Increase when the tokenizer or the format of the cache entries changes
+MAX_CACHE_SIZE = 256 * 1024 * 1024  # Maximum total size of the cache entries in bytes
+BLOCK_SIZE = 64 * 1024  # Size of the blocks of the todo.txt files that are compared to find the changed lines
+ENTRY_SUFFIX = ".pickle"
+NO_FOLLOW = getattr(os, "O_NOFOLLOW", 0)  # Don't follow symbolic links when opening cache entries, if supported
+
+
+def default_cache_directory() -> str:
+    """Return the next-action directory in the user cache directory."""
+    return os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "next-action")
+
+
+def is_private(status: os.stat_result) -> bool:
+    """Return whether the file or directory is owned by the user and can't be written by others."""
+    owned_by_user = status.st_uid == os.getuid() if hasattr(os, "getuid") else True
+    return owned_by_user and not status.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+
+class ParsedFile(NamedTuple):
+    """The uncompleted tasks of a todo.txt file, with their line numbers, byte offsets, and tokens."""
+
+    line_count: int
+    line_numbers: List[int]
+    offsets: List[int]
+    texts: List[str]
+    tokens: List[Tokens]
+
+
+def parse(content: bytes) -> ParsedFile:
+    """Parse the content of a todo.txt file, or a part of it that consists of whole lines."""
+    # Split the lines and get the task texts like read_todotxt_files() does, so they are the same without cache
+    line_numbers, offsets, texts = [], [], []
+    offset = 0
+    lines = content.splitlines(keepends=True)
+    for index, (line, text) in enumerate(zip(lines, uncompleted_task_texts(lines))):
+        if text:
+            line_numbers.append(index + 1)
+            offsets.append(offset)
+            texts.append(text)
+        offset += len(line)
+    return ParsedFile(len(lines), line_numbers, offsets, texts, [tokenize(text) for text in texts])
+
+
+def reparse(entry: Dict[str, Any], content: bytes, start: int, end: int, previous_end: int) -> Dict[str, Any]:
+    """Parse the lines from start to end of the content that replace the lines from start to previous end."""
+    changed = parse(content[start:end])
+    line_count, lines_before = count_lines(content, 0, len(content)), count_lines(content, 0, start)
+    line_shift, offset_shift = line_count - entry["line_count"], end - previous_end
+    before = bisect.bisect_left(entry["offsets"], start)
+    after = bisect.bisect_left(entry["offsets"], previous_end)
+
+    def splice(previous: List[Any], replacement: List[Any], shift: int = 0) -> List[Any]:
+        """Replace the previous tasks on the changed lines and shift the values of the tasks after the changed lines."""
+        return previous[:before] + replacement + \
+            ([value + shift for value in previous[after:]] if shift else previous[after:])
+
+    return {
+        "line_count": line_count,
+        "line_numbers": splice(
+            entry["line_numbers"], [lines_before + number for number in changed.line_numbers], line_shift),
+        "offsets": splice(entry["offsets"], [start + offset for offset in changed.offsets], offset_shift),
+        "texts": splice(entry["texts"], changed.texts),
+        "tokens": [splice(*columns) for columns in zip(entry["tokens"], token_columns(changed.tokens))]}
+
+
+def token_columns(tokens: List[Tokens]) -> List[List[Any]]:
+    """Return the tokens in columns, one column per field, because columns are faster to pickle and unpickle."""
+    return [list(column) for column in zip(*tokens)] if tokens else [[] for _ in Tokens._fields]
+
+
+def count_lines(content: bytes, start: int, end: int) -> int:
+    """Return the number of lines from start to end, with the same line endings as bytes.splitlines()."""
+    line_endings = content.count(b"\n", start, end) + content.count(b"\r", start, end) - \
+        content.count(b"\r\n", start, end)
+    return line_endings + (0 if start == end or content[end - 1] in b"\r\n" else 1)
+
+
+def block_digests(content: bytes, from_end: bool = False) -> List[bytes]:
+    """Return the digests of the blocks of the content, counting the blocks from the start or from the end."""
+    return [block_digest(content, index, from_end, BLOCK_SIZE) for index in range(-(-len(content) // BLOCK_SIZE))]
+
+
+def block_digest(content: bytes, index: int, from_end: bool, size: int) -> bytes:
+    """Return the digest of the first size bytes of the block with the index, counting from the start or the end."""
+    view = memoryview(content)
+    if from_end:
+        end = len(content) - index * BLOCK_SIZE
+        return hashlib.sha256(view[max(end - size, 0):end]).digest()
+    return hashlib.sha256(view[index * BLOCK_SIZE:min(index * BLOCK_SIZE + size, len(content))]).digest()
+
+
+def common_length(previous_digests: List[bytes], previous_size: int, content: bytes, digests: List[bytes],
+                  from_end: bool = False) -> int:
+    """Return the length of the common start or end of the previous content and the content, in whole blocks."""
+    for index, previous_digest in enumerate(previous_digests):
+        common = index * BLOCK_SIZE
+        size = min(previous_size - common, BLOCK_SIZE)
+        if common + size > len(content):
+            return common
+        digest = digests[index] if size == BLOCK_SIZE else block_digest(content, index, from_end, size)
+        if digest != previous_digest:
+            return common
+    return previous_size
+
+
+class ParseCache:  # pylint: disable=too-few-public-methods
+    """Cache of parsed todo.txt files, with one entry per file in the cache directory."""
+
+    def __init__(self, directory: str = "", max_size: int = MAX_CACHE_SIZE) -> None:
+        """Initialise the cache with its directory and the maximum size of the entries in bytes."""
+        self.directory = directory or default_cache_directory()
+        self.max_size = max_size
+
+    def read(self, filename: str) -> Optional[ParsedFile]:
+        """Return the parsed file, from the cache if the file hasn't changed, or None if the file can't be cached."""
+        try:
+            if not stat.S_ISREG(os.stat(filename).st_mode):
+                return None
+        except OSError:
+            return None
+        path = os.path.abspath(filename)
+        entry_path = os.path.join(self.directory, hashlib.sha256(os.fsencode(path)).hexdigest() + ENTRY_SUFFIX)
+        if not self.__is_private_directory():
+            return None
+        entry = self.__load(entry_path)
+        with open(filename, "rb") as todotxt_file:
+            identity = file_identity(path, os.fstat(todotxt_file.fileno()))
+            if entry and entry["identity"] == identity:
+                self.__touch(entry_path)
+                return parsed_file(entry)
+            content = todotxt_file.read()
+            # Stat the file again after reading it, so a change while reading invalidates the entry the next time
+            identity = file_identity(path, os.fstat(todotxt_file.fileno()))
+        head, tail = block_digests(content), block_digests(content, from_end=True)
+        if entry:
+            fields = self.__reparse(entry, content, head, tail)
+            parsed = parsed_file(fields)
+        else:
+            parsed = parse(content)
+            fields = dict(parsed._asdict(), tokens=token_columns(parsed.tokens))
+        self.__store(entry_path, dict(
+            fields, version=CACHE_VERSION, identity=identity, size=len(content), head=head, tail=tail))
+        return parsed
+
+    @staticmethod
+    def __reparse(entry: Dict[str, Any], content: bytes, head: List[bytes], tail: List[bytes]) -> Dict[str, Any]:
+        """Parse the lines of the content that changed since the entry was stored."""
+        previous_size = entry["size"]
+        common_start = common_length(entry["head"], previous_size, content, head)
+        common_end = min(common_length(entry["tail"], previous_size, content, tail, from_end=True),
+                         min(previous_size, len(content)) - common_start)
+        # Extend the changed bytes to whole lines. Only use line endings that the content and the previous content have
+        # in common, so the changed lines start and end at the same line endings in both.
+        start = content.rfind(b"\n", 0, common_start) + 1
+        end = content.find(b"\n", len(content) - common_end) + 1 or len(content)
+        return reparse(entry, content, start, end, previous_size - (len(content) - end))
+
+    def __is_private_directory(self) -> bool:
+        """Return whether the cache directory is private to the user, or doesn't exist yet."""
+        try:
+            status = os.lstat(self.directory)
+        except (FileNotFoundError, NotADirectoryError):
+            return True  # The directory is created with private permissions when the first entry is stored
+        except OSError:  # pragma: no cover-behave
+            return False
+        return stat.S_ISDIR(status.st_mode) and is_private(status)
+
+    @staticmethod
+    def __load(entry_path: str) -> Optional[Dict[str, Any]]:
+        """Load the cache entry, if it exists, is private to the user, and was written by this version of the cache."""
+        try:
+            with open(entry_path, "rb", opener=lambda path, flags: os.open(path, flags | NO_FOLLOW)) as entry_file:
+                status = os.fstat(entry_file.fileno())
+                if not (stat.S_ISREG(status.st_mode) and is_private(status)):
+                    return None
+                entry = pickle.load(entry_file)  # nosec: see import
+        except Exception:  # pylint: disable=broad-except
+            return None  # Missing, corrupt, and incompatible entries are all cache misses
+        return entry if isinstance(entry, dict) and entry.get("version") == CACHE_VERSION else None
+
+    @staticmethod
+    def __touch(entry_path: str) -> None:
+        """Mark the entry as used, for the least recently used eviction."""
+        try:
+            os.utime(entry_path)
+        except OSError:  # pragma: no cover-behave
+            pass  # Another process may have evicted the entry
+
+    def __store(self, entry_path: str, entry: Dict[str, Any]) -> None:
+        """Store the entry atomically and evict the least recently used entries if the cache is too large."""
+        temporary_path = ""
+        try:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=self.directory, suffix=".tmp", delete=False) as temporary_file:
+                temporary_path = temporary_file.name
+                pickle.dump(entry, temporary_file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary_path, entry_path)
+        except OSError:  # pragma: no cover-behave
+            if temporary_path and os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            return
+        self.__evict()
+
+    def __evict(self) -> None:
+        """Remove the least recently used entries until the entries together don't exceed the maximum size."""
+        entries: List[Tuple[float, int, str]] = []
+        with os.scandir(self.directory) as directory_entries:
+            cache_entries = [entry for entry in directory_entries if entry.name.endswith(ENTRY_SUFFIX)]
+        for cache_entry in cache_entries:
+            try:
+                status = cache_entry.stat()
+            except OSError:  # pragma: no cover-behave
+                continue  # Another process has evicted the entry
+            entries.append((status.st_mtime, status.st_size, cache_entry.path))
+        total_size = sum(size for _, size, _ in entries)
+        if total_size <= self.max_size:
+            return
+        for _, size, path in sorted(entries):  # pragma: no cover-behave
+            try:
+                os.remove(path)
+            except OSError:
+                pass  # Another process has evicted the entry
+            total_size -= size
+            if total_size <= self.max_size:
+                break
+
+
+def default_cache() -> Optional[ParseCache]:
+    """Return the cache in the default cache directory, or None if the user disabled the cache."""
+    return None if os.environ.get("NEXT_ACTION_NO_CACHE") else ParseCache()
+
+
+def file_identity(path: str, status: os.stat_result) -> Tuple[str, int, int, int]:
+    """Return the path, size, modification time, and inode of the file."""
+    return path, status.st_size, status.st_mtime_ns, status.st_ino
+
+
+def parsed_file(entry: Dict[str, Any]) -> ParsedFile:
+    """Return the parsed file stored in the cache entry, with the tokens in columns. See token_columns()."""
+    return ParsedFile(entry["line_count"], entry["line_numbers"], entry["offsets"], entry["texts"],
+                      list(map(Tokens._make, zip(*entry["tokens"]))))
@@ -0,0 +1,275 @@
+"""Graph of the tasks that block each other."""
+
+import array
+import bisect
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, TypeVar
+
+from .index import positions
+from .table import decode_date, decode_priority, NO_ORDINAL, TaskTable
+from .task import NO_PRIORITY, Task
+from .tasks import Tasks
+
+
+Value = TypeVar("Value")
+
+
+class DependencyGraph:
+    """Directed graph with an edge from each task to each task it blocks."""
+
+    def __init__(self, edges: Dict[int, List[int]]) -> None:
+        """Create the graph from the edges, i.e. for each node the nodes it blocks."""
+        self.edges = edges
+        self.components = self.__strongly_connected_components()
+        self.__blockers: Optional[Dict[int, List[int]]] = None
+
+    def blockers(self) -> Dict[int, List[int]]:
+        """Return for each blocked node the nodes that block it, i.e. the edges reversed."""
+        if self.__blockers is None:
+            self.__blockers = {}
+            for node, blocked_nodes in self.edges.items():
+                for blocked_node in blocked_nodes:
+                    self.__blockers.setdefault(blocked_node, []).append(node)
+        return self.__blockers
+
+    def blocking(self, nodes: Iterable[int]) -> Set[int]:
+        """Return the nodes that block the nodes, directly or indirectly."""
+        blockers = self.blockers()
+        blocking: Set[int] = set()
+        stack = list(nodes)
+        while stack:
+            for blocker in blockers.get(stack.pop(), []):
+                if blocker not in blocking:
+                    blocking.add(blocker)
+                    stack.append(blocker)
+        return blocking
+
+    def cycles(self) -> List[List[int]]:
+        """Return the cycles of nodes that block each other, each cycle sorted and the cycles ordered by first node."""
+        return sorted(sorted(component) for component in self.components
+                      if len(component) > 1 or component[0] in self.edges.get(component[0], []))
+
+    def reachable_counts(self) -> Dict[int, int]:
+        """Return for each node in the graph the number of other nodes it blocks, directly or indirectly."""
+        # Components blocked by more than one component are shared: each component counts the nodes only it reaches and
+        # keeps a bitset of the shared components it reaches, so only overlapping bitsets need to be inspected
+        blocked_components, nr_blockers = self.__blocked_components()
+        regions: List[int] = []  # The number of nodes each component reaches, not counting shared components
+        sizes: List[int] = []  # The size of the region of each shared component, by bit
+        bits: Dict[int, int] = {}  # The bit of each shared component
+        shared: Dict[int, Tuple[int, int]] = {}  # The shared components reached, until all blockers have used them
+        pending = nr_blockers[:]
+        counts: Dict[int, int] = {}
+        for index, component in enumerate(self.components):
+            region, reached, size = len(component), 0, 0
+            for blocked in blocked_components[index]:
+                if nr_blockers[blocked] > 1:
+                    if blocked not in bits:
+                        bits[blocked] = len(sizes)
+                        sizes.append(regions[blocked])
+                    reached, size = union(reached, size, 1 << bits[blocked], regions[blocked], sizes)
+                else:
+                    region += regions[blocked]
+                reached, size = union(reached, size, *shared[blocked], sizes)
+                pending[blocked] -= 1
+                if not pending[blocked]:
+                    del shared[blocked]
+            regions.append(region)
+            if nr_blockers[index]:
+                shared[index] = (reached, size)
+            counts.update(dict.fromkeys(component, region - 1 + size))
+        return counts
+
+    def __blocked_components(self) -> Tuple[List[Set[int]], List[int]]:
+        """Return for each component the other components it blocks and the number of components that block it."""
+        component_of = {node: index for index, component in enumerate(self.components) for node in component}
+        blocked_components = [{component_of[blocked_node] for node in component
+                               for blocked_node in self.edges.get(node, [])} - {index}
+                              for index, component in enumerate(self.components)]
+        nr_blockers = [0] * len(self.components)
+        for blocked_by_component in blocked_components:
+            for blocked in blocked_by_component:
+                nr_blockers[blocked] += 1
+        return blocked_components, nr_blockers
+
+    def inherit(self, value: Callable[[int], Optional[Value]]) -> Dict[int, Optional[Value]]:
+        """Return for each node the lowest of its own value and the values of the nodes it blocks, if any."""
+        inherited: Dict[int, Optional[Value]] = {}
+        for component in self.components:
+            members = set(component)
+            values = [value(node) for node in component]
+            values.extend(inherited[blocked_node] for node in component for blocked_node in self.edges.get(node, [])
+                          if blocked_node not in members)
+            lowest = min((value for value in values if value is not None), default=None)  # type: ignore[type-var]
+            for node in component:
+                inherited[node] = lowest
+        return inherited
+
+    def __strongly_connected_components(self) -> List[List[int]]:
+        """Return the strongly connected components of the nodes, in reverse topological order."""
+        # Tarjan's algorithm, with an explicit stack so long chains of dependencies don't hit the recursion limit
+        index: Dict[int, int] = {}  # The order in which the nodes were visited
+        lowlink: Dict[int, int] = {}  # The lowest index of the nodes on the stack reachable from the node
+        stack: List[int] = []
+        on_stack: Set[int] = set()
+        components: List[List[int]] = []
+        for root in self.edges:
+            if root in index:
+                continue
+            index[root] = lowlink[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            work: List[Tuple[int, Iterator[int]]] = [(root, iter(self.edges[root]))]
+            while work:
+                node, blocked_nodes = work[-1]
+                for blocked_node in blocked_nodes:
+                    if blocked_node not in index:
+                        # Visit the blocked node before continuing with the remaining nodes blocked by this node
+                        index[blocked_node] = lowlink[blocked_node] = len(index)
+                        stack.append(blocked_node)
+                        on_stack.add(blocked_node)
+                        work.append((blocked_node, iter(self.edges.get(blocked_node, []))))
+                        break
+                    if blocked_node in on_stack:
+                        lowlink[node] = min(lowlink[node], index[blocked_node])
+                else:
+                    work.pop()
+                    if work:
+                        caller = work[-1][0]
+                        lowlink[caller] = min(lowlink[caller], lowlink[node])
+                    if lowlink[node] == index[node]:
+                        components.append(self.__pop_component(node, stack, on_stack))
+        return components
+
+    @staticmethod
+    def __pop_component(root: int, stack: List[int], on_stack: Set[int]) -> List[int]:
+        """Pop the nodes of the component with the root from the stack."""
+        component: List[int] = []
+        while not component or component[-1] != root:
+            component.append(stack.pop())
+            on_stack.discard(component[-1])
+        return component
+
+
+class TaskGraph(DependencyGraph):
+    """Dependency graph of tasks."""
+
+    def __init__(self, tasks: Sequence[Task], table: Optional[TaskTable] = None) -> None:
+        """Create the graph of the tasks, with their table if given. If tasks have the same id, the last gets the id."""
+        self.tasks = tasks
+        self.table = TaskTable(tasks) if table is None else table
+        self.node_by_id = {task_id: node for node, task_id in self.table.task_ids.items()}
+        edges: Dict[int, List[int]] = {}
+        for node, (child_ids, parent_ids) in self.table.links.items():
+            for parent_id in parent_ids:
+                parent_node = self.node_by_id.get(parent_id)
+                if parent_node is not None:
+                    edges.setdefault(node, []).append(parent_node)
+            for child_id in child_ids:
+                child_node = self.node_by_id.get(child_id)
+                if child_node is not None:
+                    edges.setdefault(child_node, []).append(node)
+        super().__init__(edges)
+        self.__cycles = self.cycles()
+        self.__unblocked_nodes = array.array("i")  # The nodes of the unblocked tasks, once linked
+        self.__unblocked: List[Task] = []  # The unblocked tasks, once linked
+
+    def link(self) -> Tasks:
+        """Link the tasks and return the unblocked tasks, with the cycles of tasks that block each other."""
+        tasks = self.tasks
+        for node, blocked_nodes in self.edges.items():
+            for blocked_node in blocked_nodes:
+                tasks[blocked_node].set_is_blocked()
+                tasks[node].add_blocked_task(tasks[blocked_node])
+        nodes = {node: tasks[node] for component in self.components for node in component}
+        self.__set_inherited(self, self.table, nodes)
+        self.__unblocked_nodes = array.array("i", [node for node, task in enumerate(tasks) if not task.is_blocked()])
+        self.__unblocked = [tasks[node] for node in self.__unblocked_nodes]
+        return self.__tasks(self.__unblocked, self.__unblocked_nodes, self.table, {}, self.__cycles)
+
+    def assume_done(self, task_ids: Iterable[str]) -> Tasks:
+        """Return the unblocked tasks as they would be if the tasks with the ids were done. Unknown ids are ignored."""
+        done = {self.node_by_id[task_id] for task_id in task_ids if task_id in self.node_by_id}
+        affected = self.blocking(done) | {node for done_node in done for node in self.edges.get(done_node, [])}
+        copies = {node: self.tasks[node].copy() for node in affected - done}
+        edges = {node: [blocked_node for blocked_node in self.edges.get(node, []) if blocked_node not in done]
+                 for node in copies}
+        blockers = self.blockers()
+        for node, task in copies.items():
+            if any(blocker not in done for blocker in blockers.get(node, [])):
+                task.set_is_blocked()
+            for blocked_node in edges[node]:
+                task.add_blocked_task(copies.get(blocked_node, self.tasks[blocked_node]))
+        table = self.table.copy()
+        self.__set_inherited(DependencyGraph(edges), table, copies)
+        return self.__unblocked_tasks(copies, done, table, self.__remaining_cycles(done))
+
+    def __remaining_cycles(self, done: Set[int]) -> List[List[int]]:
+        """Return the cycles as they would be without the done nodes. Only the cycles with done nodes can change."""
+        cycles = []
+        for cycle in self.__cycles:
+            if done.isdisjoint(cycle):
+                cycles.append(cycle)
+            else:
+                remaining = set(cycle) - done
+                cycles.extend(DependencyGraph({node: [blocked_node for blocked_node in self.edges[node]
+                                                      if blocked_node in remaining] for node in remaining}).cycles())
+        return sorted(cycles)
+
+    def __set_inherited(self, graph: DependencyGraph, table: TaskTable, tasks: Dict[int, Task]) -> None:
+        """Set the priority and due date the tasks inherit, also in the table. Other tasks keep their linked values."""
+        priorities = graph.inherit(lambda node: self.table.priority_code(node, own=node in tasks))
+        due_dates = graph.inherit(lambda node: self.table.due_ordinal(node, own=node in tasks))
+        for node, task in tasks.items():
+            priority_code, due_ordinal = priorities[node], due_dates[node] or NO_ORDINAL
+            priority_code = NO_PRIORITY if priority_code is None else priority_code
+            task.set_inherited(decode_priority(priority_code), decode_date(due_ordinal))
+            table.set_inherited(node, priority_code, due_ordinal)
+
+    def __unblocked_tasks(self, copies: Dict[int, Task], done: Set[int], table: TaskTable,
+                          cycles: List[List[int]]) -> Tasks:
+        """Return the unblocked tasks that are not done, using the copies instead of the linked tasks."""
+        nodes = self.__unblocked_nodes[:]
+        tasks = self.__unblocked[:]
+        for node in sorted(done | copies.keys(), reverse=True):
+            index = bisect.bisect_left(nodes, node)
+            was_unblocked = index < len(nodes) and nodes[index] == node
+            task = copies.get(node)
+            if task is None or task.is_blocked():
+                if was_unblocked:
+                    del tasks[index], nodes[index]
+            elif was_unblocked:
+                tasks[index] = task
+            else:
+                tasks.insert(index, task)
+                nodes.insert(index, node)
+        return self.__tasks(tasks, nodes, table, copies, cycles)
+
+    def __tasks(self, tasks: List[Task], nodes: Sequence[int], table: TaskTable, copies: Dict[int, Task],
+                cycles: List[List[int]]) -> Tasks:  # pylint: disable=too-many-arguments
+        """Return the collection of the tasks of the nodes, with their table and the cycles of tasks."""
+        cycles_of_tasks = [[copies.get(node, self.tasks[node]) for node in cycle] for cycle in cycles]
+        return Tasks(tasks, dependency_cycles=cycles_of_tasks, dependency_graph=self, table=table.subset(nodes))
+
+
+def union(bits: int, size: int, other_bits: int, other_size: int, sizes: List[int]) -> Tuple[int, int]:
+    """Return the union of the bitsets of shared components and the total size of the regions of the components."""
+    overlap = bits & other_bits
+    if overlap:
+        other_size -= sum(sizes[position] for position in positions(overlap))
+    return bits | other_bits, size + other_size
+
+
+def unblock_counts(tasks: Iterable[Task]) -> Dict[Task, int]:
+    """Return for each task the number of tasks it blocks, directly or indirectly, following the linked tasks."""
+    stack = list(dict.fromkeys(tasks))
+    nodes = {task: node for node, task in enumerate(stack)}
+    edges: Dict[int, List[int]] = {}
+    while stack:
+        task = stack.pop()
+        for blocked_task in task.blocked_tasks():
+            if blocked_task not in nodes:
+                nodes[blocked_task] = len(nodes)
+                stack.append(blocked_task)
+            edges.setdefault(nodes[task], []).append(nodes[blocked_task])
+    counts = DependencyGraph(edges).reachable_counts()
+    return {task: counts.get(node, 0) for task, node in nodes.items()}
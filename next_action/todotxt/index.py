@@ -0,0 +1,103 @@
+"""Index of the properties of a collection of tasks, for filtering tasks with bitwise operations."""
+
+import collections
+import datetime
+from typing import Callable, Counter, Dict, Hashable, Iterable, List, Tuple
+
+from .table import encode_priority, NO_ORDINAL, TaskTable
+
+
+# For each byte value, the positions of the bits that are set
+BYTE_BITS = [tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256)]
+
+
+def bitset(bit_positions: Iterable[int], size: int) -> int:
+    """Return the bitset with the bits at the positions set."""
+    data = bytearray((size + 7) // 8)
+    for position in bit_positions:
+        data[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(data, "little")
+
+
+def positions(bits: int) -> List[int]:
+    """Return the ordered positions of the bits that are set in the bitset."""
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+    return [offset * 8 + bit for offset, byte in enumerate(data) if byte for bit in BYTE_BITS[byte]]
+
+
+class TaskIndex:
+    """Index of the properties of a collection of tasks, as bitsets with a bit per row of the task table."""
+
+    def __init__(self, table: TaskTable) -> None:
+        """Collect the statistics of the table that the planner uses to estimate the number of matching tasks."""
+        self.__table = table
+        self.__own_priorities: Counter[int] = collections.Counter(table.own_priorities)
+        self.__due_dates: Counter[int] = collections.Counter(table.own_due_dates)
+        start_dates = zip(table.creation_dates, table.threshold_dates)
+        self.__start_dates: Counter[int] = collections.Counter(
+            creation_date or threshold_date for creation_date, threshold_date in start_dates)
+        self.__bitsets: Dict[Tuple[Hashable, ...], int] = {}
+
+    def all_tasks(self) -> int:
+        """Return the bitset of all tasks."""
+        return (1 << len(self.__table)) - 1
+
+    def context(self, context: str) -> int:
+        """Return the bitset of the tasks that have the context."""
+        return self.cached(("context", context), lambda: self.__bitset(self.__table.contexts.rows_with(context)))
+
+    def project(self, project: str) -> int:
+        """Return the bitset of the tasks that belong to the project."""
+        return self.cached(("project", project), lambda: self.__bitset(self.__table.projects.rows_with(project)))
+
+    def where(self, key: Tuple[Hashable, ...], predicate: Callable[[int], bool]) -> int:
+        """Return the bitset of the rows for which the predicate, identified by the key, holds."""
+        return self.cached(key, lambda: self.__bitset(row for row in range(len(self.__table)) if predicate(row)))
+
+    def has_bitset(self, key: Tuple[Hashable, ...]) -> bool:
+        """Return whether the bitset with the key has been created."""
+        return key in self.__bitsets
+
+    def context_count(self, context: str) -> int:
+        """Return the number of tasks that have the context."""
+        return self.__table.contexts.count(context)
+
+    def project_count(self, project: str) -> int:
+        """Return the number of tasks that belong to the project."""
+        return self.__table.projects.count(project)
+
+    def hidden_count(self) -> int:
+        """Return the number of hidden tasks."""
+        return self.__table.hidden.count(1)
+
+    def future_count(self, today: datetime.date) -> int:
+        """Return the number of future tasks as of today."""
+        today_ordinal = today.toordinal()
+        return sum(count for start_date, count in self.__start_dates.items() if start_date > today_ordinal)
+
+    def due_count(self, due_date: datetime.date) -> int:
+        """Return the estimated number of tasks due on or before the due date."""
+        due_ordinal = due_date.toordinal()
+        return sum(count for date, count in self.__due_dates.items() if NO_ORDINAL < date <= due_ordinal)
+
+    def overdue_count(self, today: datetime.date) -> int:
+        """Return the estimated number of overdue tasks as of today."""
+        today_ordinal = today.toordinal()
+        return sum(count for date, count in self.__due_dates.items() if NO_ORDINAL < date < today_ordinal)
+
+    def priority_count(self, min_priority: str) -> int:
+        """Return the estimated number of tasks that have at least the minimum priority."""
+        min_priority_code = encode_priority(min_priority)
+        return sum(count for code, count in self.__own_priorities.items() if code <= min_priority_code)
+
+    def cached(self, key: Tuple[Hashable, ...], create_bitset: Callable[[], int]) -> int:
+        """Return the bitset from the cache, creating it first if necessary."""
+        try:
+            return self.__bitsets[key]
+        except KeyError:
+            created = self.__bitsets[key] = create_bitset()
+            return created
+
+    def __bitset(self, rows: Iterable[int]) -> int:
+        """Return the bitset with the bits of the rows set."""
+        return bitset(rows, len(self.__table))
@@ -0,0 +1,62 @@
+"""Prefilter that rejects lines of todo.txt files that can't contain a next action, before tasks are created."""
+
+import argparse
+import re
+from typing import FrozenSet, List, Optional, Sequence, Set, Tuple
+
+from .tokenizer import find_task_id, tokenize, Tokens
+
+
+# Tags that link tasks to the tasks with the referenced ids. Matches in e.g. URLs are harmless, they only mean the
+# line is tokenized to find out.
+LINK_REG_EXP = re.compile("before:|after:|p:")
+
+
+class Prefilter:
+    """Prefilter that rejects the lines of tasks that can't pass the filters and aren't linked to other tasks."""
+
+    def __init__(self, arguments: argparse.Namespace) -> None:
+        """Initialise the prefilter with the filters in the arguments."""
+        # A substring doesn't prove a task has the token, so excluded contexts and projects are left to the filters
+        self.required: List[Tuple[str, ...]] = [(f"@{context}",) for context in sorted(arguments.contexts)]
+        if arguments.projects:
+            self.required.append(tuple(f"+{project}" for project in sorted(arguments.projects)))
+        if arguments.due or arguments.overdue:
+            self.required.append(("due:",))
+        self.min_priority: Optional[str] = arguments.priority
+        self.task_ids: FrozenSet[str] = frozenset(arguments.assume_done)
+
+    def __bool__(self) -> bool:
+        """Return whether the prefilter rejects any lines."""
+        return bool(self.required or self.min_priority)
+
+    def matches(self, text: str) -> bool:
+        """Return whether the task can pass the filters, not taking the tasks it's linked to into account."""
+        if self.min_priority and not (text[:1] == "(" and text[2:4] == ") " and "A" <= text[1:2] <= self.min_priority):
+            return False
+        for substrings in self.required:
+            for substring in substrings:
+                if substring in text:
+                    break
+            else:
+                return False
+        return True
+
+    def select(self, texts: Sequence[str], tokens: List[Optional[Tokens]]) -> List[int]:
+        """Return the indices of the tasks that can be next actions or are linked to tasks that are kept, in order."""
+        selected: List[int] = []
+        identified: List[Tuple[int, str]] = []  # The rejected lines with an id, kept if the id is referenced
+        referenced_ids: Set[str] = set(self.task_ids)
+        has_link, matches = LINK_REG_EXP.search, self.matches
+        for index, text in enumerate(texts):
+            if has_link(text):
+                line_tokens = tokens[index] = tokens[index] or tokenize(text)
+                referenced_ids.update(line_tokens.child_ids, line_tokens.parent_ids)
+                selected.append(index)
+            elif matches(text):
+                selected.append(index)
+            elif "id:" in text:
+                known_tokens = tokens[index]
+                identified.append((index, known_tokens.task_id if known_tokens else find_task_id(text)))
+        referenced = [index for index, line_task_id in identified if line_task_id in referenced_ids]
+        return sorted(selected + referenced) if referenced else selected
@@ -0,0 +1,45 @@
+"""Statistics of a collection of tasks."""
+
+import collections
+import datetime
+from typing import Counter, Optional, Sequence
+
+from .table import NO_ORDINAL, TaskTable
+from .task import Task
+
+
+DUE_BUCKETS = ("overdue", "today", "this week", "later", "no due date")
+
+
+class TaskStatistics:  # pylint: disable=too-few-public-methods
+    """Number of tasks per status, due date bucket, priority, context, and project."""
+
+    def __init__(self, tasks: Sequence[Task], today: Optional[datetime.date] = None,
+                 table: Optional[TaskTable] = None) -> None:
+        """Count the tasks, using their table if given and today to determine the due date buckets."""
+        today = today or datetime.date.today()
+        today_ordinal, end_of_week = today.toordinal(), today.toordinal() + 6 - today.weekday()
+        table = TaskTable(tasks) if table is None else table
+        self.total = 0
+        self.status: Counter[str] = collections.Counter()
+        self.due: Counter[str] = collections.Counter()
+        self.priorities: Counter[Optional[str]] = collections.Counter()
+        self.contexts: Counter[str] = collections.Counter()
+        self.projects: Counter[str] = collections.Counter()
+        for row, task in enumerate(tasks):
+            if table.hidden[row]:
+                continue
+            self.total += 1
+            self.status["blocked" if task.is_blocked() else "unblocked"] += 1
+            due_ordinal = table.due_dates[row]
+            if due_ordinal == NO_ORDINAL:
+                self.due["no due date"] += 1
+            elif due_ordinal < today_ordinal:
+                self.due["overdue"] += 1
+            elif due_ordinal == today_ordinal:
+                self.due["today"] += 1
+            else:
+                self.due["this week" if due_ordinal <= end_of_week else "later"] += 1
+            self.priorities[table.priority(row)] += 1
+            self.contexts.update(table.contexts.names(row))
+            self.projects.update(table.projects.names(row))
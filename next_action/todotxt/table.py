@@ -0,0 +1,208 @@
+"""Columnar representation of a collection of tasks."""
+
+import array
+import collections
+import copy
+import datetime
+from typing import Any, Counter, Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple
+
+from .task import pack_codes, FILENAMES, NO_DATE, NO_PRIORITY, Task
+from .tokenizer import EMPTY_SET, Tokens
+
+
+NO_ORDINAL = 0  # Dates are stored as ordinals, which start at 1, so 0 means the task has no such date
+
+
+def encode_priority(priority: Optional[str]) -> int:
+    """Return the code of the priority: 0 for A up to 25 for Z, and NO_PRIORITY for no priority."""
+    return ord(priority) - ord("A") if priority else NO_PRIORITY
+
+
+def decode_priority(priority_code: int) -> Optional[str]:
+    """Return the priority with the code."""
+    return None if priority_code == NO_PRIORITY else chr(ord("A") + priority_code)
+
+
+def encode_date(date: Optional[datetime.date]) -> int:
+    """Return the ordinal of the date, or NO_ORDINAL for no date."""
+    return date.toordinal() if date else NO_ORDINAL
+
+
+def decode_date(ordinal: int) -> Optional[datetime.date]:
+    """Return the date with the ordinal."""
+    return datetime.date.fromordinal(ordinal) if ordinal else None
+
+
+class Names:
+    """Column with the names of each row, e.g. the contexts of the tasks, stored as the id of the row's set of names.
+
+    Tasks have few contexts and projects and most tasks share them with other tasks, so each distinct set of names is
+    stored once and each row only needs the id of its set.
+    """
+
+    def __init__(self, sets: Sequence[FrozenSet[str]] = (EMPTY_SET,)) -> None:
+        """Create the empty column with the sets of names, if any. The empty set of names has id 0."""
+        self.sets: List[FrozenSet[str]] = list(sets)
+        self.ids = array.array("i")
+        self.__id_by_set: Dict[FrozenSet[str], int] = {names: set_id for set_id, names in enumerate(self.sets)}
+        self.__counts: Optional[Counter[int]] = None  # The number of rows per set id, once needed
+
+    def append(self, names: FrozenSet[str]) -> None:
+        """Append the names of the next row."""
+        set_id = self.__id_by_set.setdefault(names, len(self.sets))
+        if set_id == len(self.sets):
+            self.sets.append(names)
+        self.ids.append(set_id)
+        self.__counts = None
+
+    def subset(self, rows: Sequence[int]) -> "Names":
+        """Return the column with only the rows. The subset keeps the ids of the sets of names."""
+        names = Names(self.sets)
+        names.ids.extend(map(self.ids.__getitem__, rows))
+        return names
+
+    def names(self, row: int) -> FrozenSet[str]:
+        """Return the names of the row."""
+        return self.sets[self.ids[row]]
+
+    def used_names(self) -> Set[str]:
+        """Return the names of all rows."""
+        return set().union(*(self.sets[set_id] for set_id in self.__set_counts()))
+
+    def count(self, name: str) -> int:
+        """Return the number of rows that have the name."""
+        counts = self.__set_counts()
+        return sum(counts[set_id] for set_id in self.__set_ids(name))
+
+    def rows_with(self, name: str) -> List[int]:
+        """Return the rows that have the name, in order."""
+        set_ids = self.__set_ids(name)
+        return [row for row, set_id in enumerate(self.ids) if set_id in set_ids] if set_ids else []
+
+    def __set_ids(self, name: str) -> Set[int]:
+        """Return the ids of the sets that have the name."""
+        return {set_id for set_id, names in enumerate(self.sets) if name in names}
+
+    def __set_counts(self) -> Counter[int]:
+        """Return the number of rows per set id, counting the rows the first time."""
+        if self.__counts is None:
+            self.__counts = collections.Counter(self.ids)
+        return self.__counts
+
+
+class TaskTable:  # pylint: disable=too-many-instance-attributes
+    """Columnar representation of a collection of tasks, with a row per task.
+
+    Each property of the tasks is stored in a column, so filtering and ranking tasks scans compact arrays instead of
+    task objects and their tokens. Priorities are stored as codes and dates as ordinals, see encode_priority() and
+    encode_date(). The priorities and due_dates columns have the priorities and due dates the tasks inherit from the
+    tasks they block, like Task.priority() and Task.due_date(); the own_priorities and own_due_dates columns have the
+    priorities and due dates of the tasks themselves. Few tasks have ids, so the ids and the ids of the tasks that a
+    task is linked to are stored per row in dictionaries instead of columns.
+    """
+
+    NUMBER_COLUMNS = ("own_priorities", "priorities", "own_due_dates", "due_dates", "creation_dates",
+                      "threshold_dates", "hidden", "file_indices", "line_numbers")
+
+    def __init__(self, tasks: Iterable[Task] = ()) -> None:
+        """Create the table with a row for each task, if any."""
+        self.own_priorities = array.array("b")
+        self.priorities = array.array("b")
+        self.own_due_dates = array.array("i")
+        self.due_dates = array.array("i")
+        self.creation_dates = array.array("i")
+        self.threshold_dates = array.array("i")
+        self.hidden = bytearray()
+        self.file_indices = array.array("i")
+        self.line_numbers = array.array("i")  # 0 if the line number is unknown
+        self.contexts = Names()
+        self.projects = Names()
+        self.task_ids: Dict[int, str] = {}
+        self.links: Dict[int, Tuple[Tuple[str, ...], Tuple[str, ...]]] = {}  # The child ids and parent ids per row
+        for row, task in enumerate(tasks):  # pragma: no cover-behave
+            self.append(task.tokens(), task.file_index, task.line_number)
+            self.set_inherited(row, encode_priority(task.priority()), encode_date(task.due_date()))
+
+    def __len__(self) -> int:
+        """Return the number of rows."""
+        return len(self.hidden)
+
+    def append(self, tokens: Tokens, file_index: int, line_number: Optional[int]) -> None:
+        """Append a row for the task with the tokens."""
+        row = len(self)
+        priority_code, due_ordinal = encode_priority(tokens.priority), encode_date(tokens.due_date)
+        self.own_priorities.append(priority_code)
+        self.priorities.append(priority_code)
+        self.own_due_dates.append(due_ordinal)
+        self.due_dates.append(due_ordinal)
+        self.creation_dates.append(encode_date(tokens.creation_date))
+        self.threshold_dates.append(encode_date(tokens.threshold_date))
+        self.hidden.append(tokens.is_hidden)
+        self.file_indices.append(file_index)
+        self.line_numbers.append(line_number or 0)
+        self.contexts.append(tokens.contexts)
+        self.projects.append(tokens.projects)
+        if tokens.task_id:
+            self.task_ids[row] = tokens.task_id
+        if tokens.child_ids or tokens.parent_ids:
+            self.links[row] = (tokens.child_ids, tokens.parent_ids)
+
+    def subset(self, rows: Sequence[int]) -> "TaskTable":
+        """Return the table with only the rows, in the given order."""
+        table = TaskTable()
+        for name in self.NUMBER_COLUMNS:
+            getattr(table, name).extend(map(getattr(self, name).__getitem__, rows))
+        table.contexts, table.projects = self.contexts.subset(rows), self.projects.subset(rows)
+        linked_rows = self.task_ids.keys() | self.links.keys()
+        if linked_rows:
+            positions = {row: position for position, row in enumerate(rows) if row in linked_rows}
+            table.task_ids = {positions[row]: task_id for row, task_id in self.task_ids.items() if row in positions}
+            table.links = {positions[row]: links for row, links in self.links.items() if row in positions}
+        return table
+
+    def copy(self) -> "TaskTable":
+        """Return a copy of the table that shares all columns except the columns with the inherited values."""
+        table = copy.copy(self)
+        table.priorities, table.due_dates = array.array("b", self.priorities), array.array("i", self.due_dates)
+        return table
+
+    def priority(self, row: int) -> Optional[str]:
+        """Return the priority of the row, possibly inherited from the tasks it blocks."""
+        return decode_priority(self.priorities[row])
+
+    def due_date(self, row: int) -> Optional[datetime.date]:
+        """Return the due date of the row, possibly inherited from the tasks it blocks."""
+        return decode_date(self.due_dates[row])
+
+    def priority_code(self, row: int, own: bool = False) -> Optional[int]:
+        """Return the code of the inherited or own priority of the row, or None if the row has no priority."""
+        priority_code = (self.own_priorities if own else self.priorities)[row]
+        return None if priority_code == NO_PRIORITY else priority_code
+
+    def due_ordinal(self, row: int, own: bool = False) -> Optional[int]:
+        """Return the ordinal of the inherited or own due date of the row, or None if the row has no due date."""
+        return (self.own_due_dates if own else self.due_dates)[row] or None
+
+    def set_inherited(self, row: int, priority_code: int, due_ordinal: int) -> None:
+        """Set the priority and due date the row inherits from the tasks it blocks. See DependencyGraph."""
+        self.priorities[row], self.due_dates[row] = priority_code, due_ordinal
+
+    def used_priorities(self) -> Set[str]:
+        """Return the priorities of the rows, possibly inherited from the tasks they block."""
+        return {chr(ord("A") + priority_code) for priority_code in set(self.priorities) if priority_code != NO_PRIORITY}
+
+    def sort_keys(self) -> array.array:
+        """Return the sort key of each row, the same key as Task.sort_key() returns for the task of the row."""
+        project_sets = self.projects.sets
+        return array.array("q", map(
+            pack_codes, self.priorities, [due_ordinal or NO_DATE for due_ordinal in self.due_dates],
+            [creation_ordinal or NO_DATE for creation_ordinal in self.creation_dates],
+            [len(project_sets[set_id]) for set_id in self.projects.ids]))
+
+    def groups(self, row: int, groupby: str) -> List[Any]:
+        """Return the groups of the row when grouping by context, project, priority, due date, or source."""
+        if groupby in ("context", "project"):
+            return sorted((self.contexts if groupby == "context" else self.projects).names(row)) or [None]
+        group = {"priority": self.priority, "duedate": self.due_date,
+                 "source": lambda row: FILENAMES[self.file_indices[row]]}[groupby](row)
+        return [group or None]
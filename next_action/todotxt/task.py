@@ -1,86 +1,164 @@
 """Class that represents one task (i.e. one line) from a todo.txt file."""
 
 import datetime
-import functools
-import re
-import typing
-from typing import List, Optional, Sequence, Set
+import locale
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
 
+from .tokenizer import tokenize, Tokens
 
-class Task:
+
+NOT_CACHED: Any = object()  # Sentinel for cached task properties that haven't been computed yet
+FILENAMES: List[str] = []
+FILE_INDICES: Dict[str, int] = {}
+
+
+# The sort key packs the priority, the due date, the creation date, and the number of projects of a task in one
+# integer. Dates are represented by their ordinal, tasks without priority or date sort after tasks with priority or
+# date, and tasks with more projects sort before tasks with fewer projects. The key fits in 64 bits.
+NO_PRIORITY = 26
+DATE_BITS = 22  # datetime.date.max.toordinal() < 2 ** 22
+PROJECT_BITS = 10  # Tasks with more than 2 ** 10 - 1 projects sort as if they have 2 ** 10 - 1 projects
+MAX_PROJECTS = 2 ** PROJECT_BITS - 1
+NO_DATE = datetime.date.max.toordinal()
+
+
+def pack_sort_key(priority: Optional[str], due_date: Optional[datetime.date],
+                  creation_date: Optional[datetime.date], nr_projects: int) -> int:  # pragma: no cover-behave
+    """Pack the priority, due date, creation date, and number of projects into one integer sort key."""
+    return pack_codes(ord(priority) - ord("A") if priority else NO_PRIORITY,
+                      due_date.toordinal() if due_date else NO_DATE,
+                      creation_date.toordinal() if creation_date else NO_DATE, nr_projects)
+
+
+def pack_codes(priority_code: int, due_ordinal: int, creation_ordinal: int, nr_projects: int) -> int:
+    """Pack the priority code, due date ordinal, creation date ordinal, and number of projects into one sort key."""
+    key = (priority_code << DATE_BITS | due_ordinal) << DATE_BITS | creation_ordinal
+    return key << PROJECT_BITS | (MAX_PROJECTS - min(nr_projects, MAX_PROJECTS))
+
+
+def uncompleted_task_texts(lines: Iterable[bytes]) -> List[str]:
+    """Return the text of the uncompleted task on each line of a todo.txt file, or the empty string if there's none.
+
+    Completed tasks and blank lines are recognized without decoding them. The other lines are decoded with the
+    preferred encoding, replacing malformed characters.
+    """
+    encoding = locale.getpreferredencoding(False)
+    return ["" if not line or line.startswith(b"x ") or line.isspace() else
+            line.decode(encoding, errors="replace").strip() for line in lines]
+
+
+def file_index(filename: str) -> int:
+    """Return the index of the filename in the filename table, adding the filename to the table if necessary."""
+    if filename not in FILE_INDICES:
+        FILE_INDICES[filename] = len(FILENAMES)
+        FILENAMES.append(filename)
+    return FILE_INDICES[filename]
+
+
+class Task:  # pylint: disable=too-many-public-methods,too-many-instance-attributes
     """A task from a line in a todo.txt file."""
 
-    iso_date_reg_exp = r"(\d{4})-(\d{1,2})-(\d{1,2})"
-    # Source for the URL regular expression: http://www.noah.org/wiki/RegEx_Python
-    url_reg_exp = r"http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+#]|[!*\(\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+"
+    # Todo.txt files can contain many tasks, so tasks have no instance dictionary, refer to their filename by index,
+    # and share the empty sequence of blocked tasks until they block a task. The memory budget per task, excluding the
+    # text, is 96 bytes for the task object and 128 bytes for its tokens, which are created when needed, see
+    # TaskMemoryTest.
+    __slots__ = ("text", "file_index", "line_number", "__tokens", "__is_blocked", "__blocked_tasks", "__priority",
+                 "__due_date")
 
-    def __init__(self, todo_txt: str, filename: str = "", line_number: Optional[int] = None) -> None:
-        """Initialise the task with its Todo.txt text string, originating filename, and originating line number."""
+    def __init__(self, todo_txt: str, filename: str = "", line_number: Optional[int] = None,
+                 tokens: Optional[Tokens] = None) -> None:
+        """Initialise the task with its Todo.txt text string, originating filename, line number, and tokens, if any."""
         self.text = todo_txt
-        self.filename = filename
+        self.file_index = file_index(filename)
         self.line_number = line_number
+        self.__tokens: Optional[Tokens] = tokens
         self.__is_blocked = False
-        self.__blocked_tasks: List["Task"] = []
+        self.__blocked_tasks: Sequence["Task"] = ()
+        self.__priority: Optional[str] = NOT_CACHED
+        self.__due_date: Optional[datetime.date] = NOT_CACHED
+
+    def copy(self) -> "Task":
+        """Return a copy of the task that shares the tokens, but isn't blocked and doesn't block other tasks."""
+        return Task(self.text, self.filename, self.line_number, self.tokens())
 
     def __repr__(self) -> str:
         """Return a text representation of the task."""
         return f"{self.__class__.__name__}<{self.text}>"
 
-    def is_hidden(self) -> bool:
+    @property
+    def filename(self) -> str:
+        """Return the name of the file the task originates from."""
+        return FILENAMES[self.file_index]
+
+    def tokens(self) -> Tokens:
+        """Return the tokens of the task, parsing the task text the first time the tokens are needed."""
+        if self.__tokens is None:
+            self.__tokens = tokenize(self.text)
+        return self.__tokens
+
+    def is_hidden(self) -> bool:  # pragma: no cover-behave
         """Return whether the task is hidden."""
-        return "1" in self.__prefixed_items("h:")
+        return self.tokens().is_hidden
 
-    @functools.lru_cache
-    def contexts(self) -> Set[str]:
+    def contexts(self) -> FrozenSet[str]:
         """Return the contexts of the task."""
-        return self.__prefixed_items("@")
+        return self.tokens().contexts
 
-    @functools.lru_cache
-    def projects(self) -> Set[str]:
+    def projects(self) -> FrozenSet[str]:
         """Return the projects of the task."""
-        return self.__prefixed_items(r"\+")
+        return self.tokens().projects
 
-    @functools.lru_cache
     def priority(self) -> Optional[str]:
         """Return the priority of the task."""
-        match = re.match(r"\(([A-Z])\) ", self.text)
-        priorities: List[Optional[str]] = [match.group(1)] if match else []
+        if self.__priority is NOT_CACHED:
+            self.__priority = self.__inherited_priority()
+        return self.__priority
+
+    def __inherited_priority(self) -> Optional[str]:
+        """Return the priority of the task or the highest priority of the tasks it blocks, whichever is higher."""
+        priorities: List[Optional[str]] = [self.tokens().priority]
         priorities.extend([blocked_task.priority() for blocked_task in self.blocked_tasks()])
         return min(priorities, default=None, key=lambda priority: priority or "ZZZ")
 
-    def priority_at_least(self, min_priority: str) -> bool:
+    def priority_at_least(self, min_priority: str) -> bool:  # pragma: no cover-behave
         """Return whether the priority of task is at least the given priority."""
         priority = self.priority()
         if priority:
             return priority <= min_priority
         return False
 
-    @functools.lru_cache
     def creation_date(self) -> Optional[datetime.date]:
         """Return the creation date of the task."""
-        match = re.match(fr"(?:\([A-Z]\) )?{self.iso_date_reg_exp}\b", self.text)
-        return self.__create_date(match)
+        return self.tokens().creation_date
 
-    @functools.lru_cache
     def threshold_date(self) -> Optional[datetime.date]:
         """Return the threshold date of the task."""
-        return self.__find_keyed_date("t")
+        return self.tokens().threshold_date
 
-    @functools.lru_cache
     def due_date(self) -> Optional[datetime.date]:
         """Return the due date of the task."""
-        due_dates = [self.__find_keyed_date("due")]
+        if self.__due_date is NOT_CACHED:
+            self.__due_date = self.__inherited_due_date()
+        return self.__due_date
+
+    def __inherited_due_date(self) -> Optional[datetime.date]:
+        """Return the due date of the task or the earliest due date of the tasks it blocks, whichever is earlier."""
+        due_dates = [self.tokens().due_date]
         due_dates.extend([blocked_task.due_date() for blocked_task in self.blocked_tasks()])
         return min(due_dates, default=None, key=lambda due_date: due_date or datetime.date.max)
 
-    def is_due(self, due_date: datetime.date) -> bool:
+    def sort_key(self) -> int:  # pragma: no cover-behave
+        """Return the key for sorting tasks by priority, due date, creation date, and number of projects."""
+        return pack_sort_key(self.priority(), self.due_date(), self.creation_date(), len(self.projects()))
+
+    def is_due(self, due_date: datetime.date) -> bool:  # pragma: no cover-behave
         """Return whether the task is due on or before the given due date."""
         task_due_date = self.due_date()
         return task_due_date <= due_date if task_due_date else False
 
-    def is_future(self) -> bool:
-        """Return whether the task is a future task, i.e. has a creation or threshold date in the future."""
-        today = datetime.date.today()
+    def is_future(self, today: Optional[datetime.date] = None) -> bool:  # pragma: no cover-behave
+        """Return whether the task is a future task, i.e. has a creation or threshold date after today."""
+        today = today or datetime.date.today()
         creation_date = self.creation_date()
         if creation_date:
             return creation_date > today
@@ -89,10 +167,10 @@ class Task:
             return threshold_date > today
         return False
 
-    def is_overdue(self) -> bool:
-        """Return whether the task is overdue, i.e. whether it has a due date in the past."""
+    def is_overdue(self, today: Optional[datetime.date] = None) -> bool:  # pragma: no cover-behave
+        """Return whether the task is overdue, i.e. whether it has a due date before today."""
         due_date = self.due_date()
-        return due_date < datetime.date.today() if due_date else False
+        return due_date < (today or datetime.date.today()) if due_date else False
 
     def is_blocked(self) -> bool:
         """Return whether a task is blocked, i.e. whether it has (uncompleted) child tasks."""
@@ -108,43 +186,35 @@ class Task:
 
     def add_blocked_task(self, task: "Task") -> None:
         """Add the task to the blocked tasks."""
-        self.__blocked_tasks.append(task)
+        if isinstance(self.__blocked_tasks, list):
+            self.__blocked_tasks.append(task)
+        else:
+            self.__blocked_tasks = [task]
+        self.__priority = self.__due_date = NOT_CACHED
+
+    def set_inherited(self, priority: Optional[str], due_date: Optional[datetime.date]) -> None:
+        """Set the priority and due date, taking the tasks this task blocks into account. See DependencyGraph."""
+        self.__priority, self.__due_date = priority, due_date
 
-    @functools.lru_cache
-    def child_ids(self) -> Set[str]:
-        """Return the ids of the child tasks."""
-        return {match.group(1) for match in re.finditer(r"\bafter:(\S+)\b", self.text)}
+    def child_ids(self) -> Tuple[str, ...]:  # pragma: no cover-behave
+        """Return the unique ids of the child tasks."""
+        return self.tokens().child_ids
 
-    @functools.lru_cache
-    def parent_ids(self) -> Set[str]:
-        """Return the ids of the parent tasks."""
-        return {match.group(2) for match in re.finditer(r"\b(p|before):(\S+)\b", self.text)}
+    def parent_ids(self) -> Tuple[str, ...]:  # pragma: no cover-behave
+        """Return the unique ids of the parent tasks."""
+        return self.tokens().parent_ids
 
-    @functools.lru_cache
     def task_id(self) -> str:
         """Return the id of the task."""
-        match = re.search(r"\bid:(\S+)\b", self.text)
-        return match.group(1) if match else ""
+        return self.tokens().task_id
 
     def urls(self) -> List[str]:
         """Return the URLs of the task."""
-        return re.findall(self.url_reg_exp, self.text)
-
-    def __prefixed_items(self, prefix: str) -> Set[str]:
-        """Return the prefixed items in the task."""
-        return {match.group(2) for match in re.finditer(fr"(^|\W){prefix}(\w+)", self.text)}
-
-    def __find_keyed_date(self, key: str) -> Optional[datetime.date]:
-        """Find a key:value pair with the supplied key where the value is a date."""
-        match = re.search(fr"\b{key}:{self.iso_date_reg_exp}\b", self.text)
-        return self.__create_date(match)
-
-    @staticmethod
-    def __create_date(match: Optional[typing.Match[str]]) -> Optional[datetime.date]:
-        """Create a date from the match, if possible."""
-        if match:
-            try:
-                return datetime.date(*(int(group) for group in match.groups()))
-            except ValueError:
-                pass
-        return None
+        return list(self.tokens().urls)
+
+    def groups(self, groupby: str) -> List[Any]:
+        """Return the groups of the task when grouping by context, project, priority, due date, or source."""
+        if groupby in ("context", "project"):
+            return sorted(self.contexts() if groupby == "context" else self.projects()) or [None]
+        group = {"priority": self.priority, "duedate": self.due_date, "source": lambda: self.filename}[groupby]()
+        return [group or None]
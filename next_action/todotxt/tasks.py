@@ -1,23 +1,51 @@
 """Collection of Todo.txt tasks."""
 
-from typing import List, Set
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, TYPE_CHECKING
 
+from .index import TaskIndex
+from .table import TaskTable
 from .task import Task
 
+if TYPE_CHECKING:  # pragma: no cover
+    from .graph import TaskGraph
+
 
 class Tasks(List[Task]):
     """Collection of Todo.txt tasks."""
 
     # pylint: disable=not-an-iterable
 
+    def __init__(self, tasks: Iterable[Task] = (), dependency_cycles: Sequence[Sequence[Task]] = (),
+                 dependency_graph: Optional["TaskGraph"] = None, groups: Optional[Dict[Any, List[Task]]] = None,
+                 table: Optional[TaskTable] = None) -> None:  # pylint: disable=too-many-arguments
+        """Initialise the collection with the tasks and, if any, the dependency cycles and graph, groups, and table."""
+        super().__init__(tasks)
+        self.dependency_cycles = dependency_cycles
+        self.dependency_graph = dependency_graph
+        self.groups = groups
+        self.__table = table
+        self.__index: Optional[TaskIndex] = None
+
+    def task_table(self) -> TaskTable:
+        """Return the table of the tasks, with a row per task, in order, creating it from the tasks if necessary."""
+        if self.__table is None:
+            self.__table = TaskTable(self)  # pragma: no cover-behave
+        return self.__table
+
+    def task_index(self) -> TaskIndex:
+        """Return the index of the tasks, building it if necessary."""
+        if self.__index is None:  # pragma: no branch
+            self.__index = TaskIndex(self.task_table())
+        return self.__index
+
     def contexts(self) -> Set[str]:
         """Return the contexts used in the collection of tasks."""
-        return set(context for task in self for context in task.contexts())
+        return self.task_table().contexts.used_names()
 
     def projects(self) -> Set[str]:
         """Return the projects used in the collection of tasks."""
-        return set(project for task in self for project in task.projects())
+        return self.task_table().projects.used_names()
 
     def priorities(self) -> Set[str]:
         """Return the priorities used in the collection of tasks."""
-        return set(str(task.priority()) for task in self if task.priority())
+        return self.task_table().used_priorities()
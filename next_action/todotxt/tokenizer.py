@@ -0,0 +1,132 @@
+"""Tokenizer that parses the text of one task (i.e. one line) from a todo.txt file in a single pass."""
+
+import datetime
+import functools
+import re
+import sys
+from typing import FrozenSet, List, NamedTuple, Optional, Tuple
+
+
+ISO_DATE_REG_EXP = r"(\d{4})-(\d{1,2})-(\d{1,2})"
+
+# The priority and creation date can only occur at the start of the line, so one anchored match suffices.
+HEAD_REG_EXP = re.compile(fr"(?:\(([A-Z])\) )?(?:{ISO_DATE_REG_EXP}\b)?")
+
+# All other tokens can occur anywhere in the line. Each alternative consumes only the first character of the token and
+# captures the rest of the token in a lookahead, so that tokens of one kind never hide tokens of another kind, e.g. the
+# due date in "@due:2018-01-01". Because all alternatives start with a literal character, the regular expression engine
+# can quickly skip positions where no token starts. The negative lookbehinds make sure that the character before the
+# token, if any, is not a word character.
+# Source for the URL regular expression: http://www.noah.org/wiki/RegEx_Python
+BODY_REG_EXP = re.compile(
+    r"@(?<!\w@)(?=(\w+))"  # Group 1: context
+    r"|\+(?<!\w\+)(?=(\w+))"  # Group 2: project
+    r"|h(?<!\wh)(?=:(\w+))"  # Group 3: hidden flag
+    fr"|t(?<!\wt)(?=:{ISO_DATE_REG_EXP}\b)"  # Groups 4-6: threshold date
+    fr"|d(?<!\wd)(?=ue:{ISO_DATE_REG_EXP}\b)"  # Groups 7-9: due date
+    r"|a(?<!\wa)(?=fter:(\S+)\b)"  # Group 10: child id
+    r"|p(?<!\wp)(?=:(\S+)\b)"  # Group 11: parent id
+    r"|b(?<!\wb)(?=efore:(\S+)\b)"  # Group 12: parent id
+    r"|i(?<!\wi)(?=d:(\S+)\b)"  # Group 13: task id
+    r"|h(?=ttp[s]?://((?:[a-zA-Z]|[0-9]|[$-_@.&+#]|[!*\(\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+))")  # Group 14: URL
+
+# The task id only, matching the same id as the task id group of the body regular expression, see find_task_id()
+TASK_ID_REG_EXP = re.compile(r"(?<!\w)id:(\S+)\b")
+
+EMPTY_SET: FrozenSet[str] = frozenset()
+
+
+class Tokens(NamedTuple):
+    """The structured contents of a task."""
+
+    priority: Optional[str]
+    creation_date: Optional[datetime.date]
+    threshold_date: Optional[datetime.date]
+    due_date: Optional[datetime.date]
+    contexts: FrozenSet[str]
+    projects: FrozenSet[str]
+    is_hidden: bool
+    task_id: str
+    child_ids: Tuple[str, ...]
+    parent_ids: Tuple[str, ...]
+    urls: Tuple[str, ...]
+
+
+def tokenize(text: str) -> Tokens:  # pylint: disable=too-many-branches,too-many-locals
+    """Parse the text of a task into its tokens."""
+    head = HEAD_REG_EXP.match(text)  # Always matches, but possibly only the empty string
+    priority = head.group(1) if head else None
+    creation_date = create_date(*head.group(2, 3, 4)) if head and head.group(2) else None
+    threshold_date = due_date = None
+    threshold_date_found = due_date_found = False
+    contexts: List[str] = []
+    projects: List[str] = []
+    hidden_flags: List[str] = []
+    task_id = ""
+    child_ids: List[str] = []
+    parent_ids: List[str] = []
+    urls: List[str] = []
+    # Hidden flags, ids, and URLs can contain other hidden flags, ids, and URLs. Like separate regular expressions do,
+    # skip the ones that overlap with the previous token of the same kind. Note that a hidden flag is only recognized if
+    # the character before it, which would be consumed by a separate regular expression, isn't part of the previous one.
+    hidden_flags_end = -1
+    child_ids_end = parent_ids_end = urls_end = 0
+    for match in BODY_REG_EXP.finditer(text):
+        kind, start = match.lastindex, match.start()
+        if kind == 1:
+            contexts.append(match.group(1))
+        elif kind == 2:
+            projects.append(match.group(2))
+        elif kind == 3 and start > hidden_flags_end:
+            hidden_flags.append(match.group(3))
+            hidden_flags_end = match.end(3)
+        elif kind == 6 and not threshold_date_found:
+            threshold_date, threshold_date_found = create_date(*match.group(4, 5, 6)), True
+        elif kind == 9 and not due_date_found:
+            due_date, due_date_found = create_date(*match.group(7, 8, 9)), True
+        elif kind == 10 and start >= child_ids_end:
+            child_ids.append(match.group(10))
+            child_ids_end = match.end(10)
+        elif kind in (11, 12) and start >= parent_ids_end:
+            parent_ids.append(match.group(kind))
+            parent_ids_end = match.end(kind)
+        elif kind == 13:
+            task_id = task_id or sys.intern(match.group(13))
+        elif kind == 14 and start >= urls_end:
+            urls_end = match.end(14)
+            urls.append(text[start:urls_end])
+    return Tokens(priority, creation_date, threshold_date, due_date, shared_set(contexts), shared_set(projects),
+                  "1" in hidden_flags, task_id, unique_names(child_ids), unique_names(parent_ids), tuple(urls))
+
+
+def find_task_id(text: str) -> str:
+    """Return the id of the task, without parsing the rest of the text."""
+    match = TASK_ID_REG_EXP.search(text)
+    return sys.intern(match.group(1)) if match else ""
+
+
+def unique_names(names: List[str]) -> Tuple[str, ...]:
+    """Return the interned names, without duplicates, in order."""
+    return tuple(dict.fromkeys(sys.intern(name) for name in names))
+
+
+def shared_set(names: List[str]) -> FrozenSet[str]:
+    """Return a frozen set of the interned names, shared with other tasks that have the same names."""
+    if not names:
+        return EMPTY_SET
+    return recurring_set(frozenset(sys.intern(name) for name in names))
+
+
+@functools.lru_cache(maxsize=4096)
+def recurring_set(names: FrozenSet[str]) -> FrozenSet[str]:
+    """Return the set of names. Recurring sets are stored only once, as long as they recur often enough."""
+    return names
+
+
+@functools.lru_cache(maxsize=4096)
+def create_date(year: str, month: str, day: str) -> Optional[datetime.date]:
+    """Create a date from the year, month, and day, if possible. Recurring dates are stored only once."""
+    try:
+        return datetime.date(int(year), int(month), int(day))
+    except ValueError:
+        return None
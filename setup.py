@@ -17,6 +17,7 @@ setup(
     license="Apache License, Version 2.0",
     python_requires=">=3.6",
     install_requires=["python-dateutil", "Cerberus", "PyYAML", "Pygments"],
+    extras_require={"numpy": ["numpy"]},
     packages=find_packages(),
     entry_points={
         "console_scripts": [
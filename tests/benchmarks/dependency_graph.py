@@ -0,0 +1,72 @@
+"""Benchmark linking tasks that block each other and computing the priority and due date they inherit.
+
+Usage: python -m tests.benchmarks.dependency_graph [<number of tasks>]
+
+The benchmark links a deep chain of tasks, each blocking the next, a wide fan-out, one task blocking all other
+tasks, and a shared fan-in, a chain of tasks that each also block a task that another task blocks too, with the
+dependency graph. For comparison, it also computes the inherited priorities by recursing through the blocked tasks,
+which is what Task.priority() does for tasks that were linked without the dependency graph. Finally, it counts the
+tasks each task blocks, directly or indirectly, as used for ranking by impact.
+"""
+
+import sys
+import time
+from typing import Callable, List
+
+from next_action.todotxt import unblock_counts, Task, unblocked_tasks
+
+
+def chain(number_of_tasks: int) -> List[Task]:
+    """Return a chain of tasks, each blocking the next."""
+    tasks = [Task(f"Task {index} id:{index} before:{index + 1}") for index in range(number_of_tasks - 1)]
+    return tasks + [Task(f"(A) Task {number_of_tasks - 1} id:{number_of_tasks - 1} due:2018-01-01")]
+
+
+def fan_out(number_of_tasks: int) -> List[Task]:
+    """Return a task that blocks all other tasks."""
+    tasks = [Task(f"Task {index} id:{index}") for index in range(1, number_of_tasks - 1)]
+    tasks.append(Task(f"(A) Task {number_of_tasks - 1} id:{number_of_tasks - 1}"))
+    return [Task(" ".join(["Blocking"] + [f"before:{index}" for index in range(1, number_of_tasks)]))] + tasks
+
+
+def shared_fan_in(number_of_tasks: int) -> List[Task]:
+    """Return a chain of tasks that each also block a task of their own, which another task blocks too."""
+    tasks = []
+    links = number_of_tasks // 3
+    for index in range(links):
+        next_link = f" before:link{index + 1}" if index + 1 < links else ""
+        tasks.extend([Task(f"Link {index} id:link{index} before:node{index}{next_link}"),
+                      Task(f"(A) Node {index} id:node{index}"), Task(f"Other {index} before:node{index}")])
+    return tasks
+
+
+def recursive_priority(task: Task) -> str:
+    """Return the inherited priority of the task by recursing through the blocked tasks."""
+    priorities = [task.tokens().priority] + [recursive_priority(blocked) for blocked in task.blocked_tasks()]
+    return min(priorities, default="", key=lambda priority: priority or "ZZZ") or ""
+
+
+def timed(label: str, function: Callable[[], str]) -> None:
+    """Run the function and report its duration and result."""
+    start = time.perf_counter()
+    try:
+        result = function()
+    except RecursionError:
+        result = "RecursionError"
+    print(f"{label:<40} {time.perf_counter() - start:6.2f}s  {result}")
+
+
+def main(number_of_tasks: int) -> None:
+    """Create the tasks and run the benchmark."""
+    for name, create_tasks in (("chain", chain), ("fan-out", fan_out), ("shared fan-in", shared_fan_in)):
+        tasks = create_tasks(number_of_tasks)
+        timed(f"Dependency graph, {name} of {number_of_tasks}",
+              lambda: f"priority: {unblocked_tasks(tasks)[0].priority()}")  # pylint: disable=cell-var-from-loop
+        timed(f"Recursion, {name} of {number_of_tasks}",
+              lambda: f"priority: {recursive_priority(tasks[0])}")  # pylint: disable=cell-var-from-loop
+        timed(f"Unblock counts, {name} of {number_of_tasks}",
+              lambda: f"impact: {max(unblock_counts(tasks).values())}")  # pylint: disable=cell-var-from-loop
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
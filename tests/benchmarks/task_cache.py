@@ -0,0 +1,79 @@
+"""Benchmark the cache of the task properties that depend on other tasks, i.e. priority and due date.
+
+Usage: python -m tests.benchmarks.task_cache [<number of tasks>]
+
+The benchmark runs a number of typical queries against a random todo.txt file and reports the cache hit rate of the
+per-task cache, compared with a class-level lru_cache with the default size of 128 entries.
+"""
+
+import datetime
+import functools
+import os
+import sys
+import tempfile
+import time
+from typing import Callable, Dict
+from unittest.mock import patch
+
+from next_action import pick_action, todotxt
+from next_action.todotxt import Task
+
+from ..create_random_todo_txt import create_random_todo_txt
+from ..unittests import fixtures
+
+# The uncached computations are private methods of Task. The benchmark patches them to count the cache misses.
+# pylint: disable=protected-access
+
+
+def queries():
+    """Return the namespaces of the queries to run."""
+    return [fixtures.namespace(**{"number": 1, **arguments}) for arguments in
+            ({}, {"number": sys.maxsize}, {"priority": "C"}, {"due": datetime.date(2018, 6, 1)}, {"overdue": True},
+             {"contexts": {"a"}}, {"projects": {"b"}, "number": 10})]
+
+
+def counting(method: Callable, counts: Dict[str, int], key: str) -> Callable:
+    """Wrap the method so that its calls are counted."""
+    @functools.wraps(method)
+    def counting_method(*args, **kwargs):
+        """Count the call and then call the method."""
+        counts[key] += 1
+        return method(*args, **kwargs)
+    return counting_method
+
+
+def run(filename: str, label: str, priority: Callable, due_date: Callable, counts: Dict[str, int]) -> None:
+    """Run the queries with the given priority and due date methods and report the hit rate."""
+    compute_priority = counting(Task._Task__inherited_priority, counts, "misses")
+    compute_due_date = counting(Task._Task__inherited_due_date, counts, "misses")
+    with patch.object(Task, "_Task__inherited_priority", compute_priority), \
+            patch.object(Task, "_Task__inherited_due_date", compute_due_date), \
+            patch.object(Task, "priority", counting(priority(), counts, "calls")), \
+            patch.object(Task, "due_date", counting(due_date(), counts, "calls")):
+        tasks = todotxt.read_todotxt_files([filename])
+        start = time.perf_counter()
+        for namespace in queries():
+            pick_action.next_actions(tasks, namespace)
+        duration = time.perf_counter() - start
+    hits = counts["calls"] - counts["misses"]
+    print(f"{label:<30} calls: {counts['calls']:>9}, hits: {hits:>9}, misses: {counts['misses']:>9}, "
+          f"hit rate: {hits / counts['calls']:6.1%}, time: {duration:.2f}s")
+
+
+def main(number_of_tasks: int) -> None:
+    """Create the todo.txt file and run the benchmark."""
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "todo.txt")
+        create_random_todo_txt(filename, number_of_tasks)
+        print(f"Running {len(queries())} queries against {number_of_tasks} random tasks")
+        priority, due_date = Task.priority, Task.due_date
+        run(filename, "Per-task cache", lambda: priority, lambda: due_date, {"calls": 0, "misses": 0})
+        # Emulate a class-level lru_cache by caching the uncached computations per (task, method) in a shared cache
+        run(filename, "Class-level lru_cache (128)",
+            lambda: functools.lru_cache(maxsize=128)(lambda task: task._Task__inherited_priority()),
+            lambda: functools.lru_cache(maxsize=128)(lambda task: task._Task__inherited_due_date()),
+            {"calls": 0, "misses": 0})
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -39,11 +39,11 @@ def task_id(index):
     return f" id:task{index}" if random_bool() else ""
 
 
-def create_random_todo_txt():
+def create_random_todo_txt(filename: str = "todo.txt", number_of_tasks: int = 10000):
     """Create a Todo.txt file with random tasks."""
     ids = []
-    with open("todo.txt", "w", encoding="utf-8") as todo_txt:
-        for i in range(10000):
+    with open(filename, "w", encoding="utf-8") as todo_txt:
+        for i in range(number_of_tasks):
             before = after = ""
             if len(ids) > 3:
                 sample = random.sample(ids, 3)
@@ -0,0 +1,31 @@
+Feature: show the next actions as if tasks were done
+
+  Background: a todo.txt with dependencies
+    Given a todo.txt with
+      """
+      Get money before:car before:store
+      Get car id:car before:paint
+      Go to store id:store before:paint
+      Buy paint id:paint
+      Buy primer id:primer
+      Paint walls after:paint after:primer
+      (A) Paint door after:paint
+      """
+
+  Scenario: assume a task is done
+    When the user asks for the next action
+    And the user assumes the task "paint" is done
+    Then Next-action shows the next action "(A) Paint door after:paint"
+
+  Scenario: assume tasks are done
+    When the user asks for all next actions
+    And the user assumes the task "paint" is done
+    And the user assumes the task "primer" is done
+    Then Next-action shows the next action "Paint walls after:paint after:primer"
+    And Next-action does not show the next action "Buy primer id:primer"
+
+  Scenario: assume an unknown task is done
+    When the user asks for the next action
+    And the user assumes the task "unknown" is done
+    Then Next-action shows the next action "Get money before:car before:store"
+    And Next-action warns the user the task id "unknown" is unknown
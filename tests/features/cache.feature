@@ -0,0 +1,102 @@
+Feature: cache the parsed todo.txt files
+
+  Scenario: cache the todo.txt
+    Given a private cache directory
+    And a todo.txt with
+      """
+      Task
+      """
+    When the user asks for the next action
+    Then Next-action shows the next action "Task"
+    And Next-action has cached the todo.txt
+
+  Scenario: read the todo.txt from the cache
+    Given a private cache directory
+    And a todo.txt with
+      """
+      Task
+      """
+    And the user has asked for the next action
+    When the user asks for the next action
+    Then Next-action shows the next action "Task"
+    And Next-action has cached the todo.txt
+
+  Scenario: don't use a cache directory that others can write to
+    Given a cache directory that is writable by others
+    And a todo.txt with
+      """
+      Task
+      """
+    When the user asks for the next action
+    Then Next-action shows the next action "Task"
+    And Next-action has not cached the todo.txt
+
+  Scenario: don't use cache entries that others can write to
+    Given a private cache directory
+    And a todo.txt with
+      """
+      Task
+      """
+    And the user has asked for the next action
+    And the cache entries are writable by others
+    When the user asks for the next action
+    Then Next-action shows the next action "Task"
+    And Next-action has cached the todo.txt
+
+  Scenario: disable the cache
+    Given a private cache directory
+    And the cache is disabled
+    And a todo.txt with
+      """
+      Task
+      """
+    When the user asks for the next action
+    Then Next-action shows the next action "Task"
+    And Next-action has not cached the todo.txt
+
+  Scenario: read a todo.txt with an added task
+    Given a private cache directory
+    And a todo.txt with
+      """
+      (B) Task B
+      """
+    And the user has asked for the next action
+    And the todo.txt is changed to
+      """
+      (B) Task B
+      x Done task
+      (A) Task A
+      """
+    When the user asks for the next action
+    Then Next-action shows the next action "(A) Task A"
+
+  Scenario: read a todo.txt with a changed task
+    Given a private cache directory
+    And a todo.txt with
+      """
+      (B) Task B
+      (C) Task C
+      """
+    And the user has asked for the next action
+    And the todo.txt is changed to
+      """
+      (B) Task B
+      (A) Task C, changed
+      """
+    When the user asks for the next action
+    Then Next-action shows the next action "(A) Task C, changed"
+
+  Scenario: read a todo.txt with a removed task
+    Given a private cache directory
+    And a todo.txt with
+      """
+      (A) Task A
+      (B) Task B
+      """
+    And the user has asked for the next action
+    And the todo.txt is changed to
+      """
+      (B) Task B
+      """
+    When the user asks for the next action
+    Then Next-action shows the next action "(B) Task B"
@@ -11,7 +11,7 @@ Feature: list command line options and arguments for tab completion
 
   Scenario: list all command-line arguments
     When the user asks for the list of all arguments
-    Then Next-action shows the user the list of all arguments: + -+ --all --blocked...
+    Then Next-action shows the user the list of all arguments: + -+ --all --assume-done --blocked...
 
   Scenario: list contexts
     When the user asks for the list of @ arguments
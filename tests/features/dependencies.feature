@@ -103,3 +103,93 @@ Feature: task dependencies
       """
     When the user asks for the next action
     Then Next-action shows the next action "Task after:1"
+
+  Scenario: tasks that block each other
+    Given a todo.txt with
+      """
+      Task 1 id:task1 before:task2
+      Task 2 id:task2 before:task1
+      Task 3
+      """
+    When the user asks for the next action
+    Then Next-action shows the next action "Task 3"
+    And Next-action warns the user that "Task 1 id:task1 before:task2; Task 2 id:task2 before:task1" block each other
+
+  Scenario: tasks that still block each other after assuming one of them is done
+    Given a todo.txt with
+      """
+      Task 1 id:a before:b
+      Task 2 id:b before:a before:c
+      Task 3 id:c before:b
+      Task 4 id:d before:e
+      Task 5 id:e before:d
+      Task 6
+      """
+    When the user asks for the next action
+    And the user assumes the task "a" is done
+    Then Next-action shows the next action "Task 6"
+    And Next-action warns the user that "Task 2 id:b before:a before:c; Task 3 id:c before:b" block each other
+    And Next-action warns the user that "Task 4 id:d before:e; Task 5 id:e before:d" block each other
+
+  Scenario: show blocked tasks up to a maximum depth
+    Given a todo.txt with
+      """
+      Task 1 after:task2
+      Task 2 id:task2 after:task3
+      Task 3 id:task3
+      """
+    When the user asks for the next action
+    And the user asks for the blocked tasks up to depth 1
+    Then Next-action shows the next action "Task 3 id:task3"
+    And Next-action shows the blocked task "Task 2 id:task2 after:task3"
+    And Next-action shows that "Task 2 id:task2 after:task3" blocks more tasks
+
+  Scenario: show a blocked task blocked via two paths once
+    Given a todo.txt with
+      """
+      Task 1 id:task1
+      Task 2 id:task2 after:task1
+      Task 3 id:task3 after:task1
+      Task 4 id:task4 after:task2 after:task3
+      Task 5 after:task4
+      """
+    When the user asks for the next action
+    And the user asks for the blocked tasks
+    Then Next-action shows the blocked task "Task 5 after:task4"
+    And Next-action refers to the blocked tasks of "Task 4 id:task4 after:task2 after:task3" shown above
+
+  Scenario: maximum depth without blocked tasks
+    Given a todo.txt with
+      """
+      Task 1 after:task2
+      Task 2 id:task2
+      """
+    When the user asks for the next action
+    And the user asks for a maximum depth of 1
+    Then Next-action tells the user --depth is not allowed without -b/--blocked
+
+  Scenario: task inherits the priority of a task it blocks that doesn't pass the filters
+    Given a todo.txt with
+      """
+      (A) Visit mom id:visit
+      Call mom @phone before:visit
+      (B) Call dad @phone
+      """
+    When the user asks for the next action at phone
+    Then Next-action shows the next action "Call mom @phone before:visit"
+
+  Scenario: task without priority is kept because it blocks a prioritized task
+    Given a todo.txt with
+      """
+      (A) Task A
+      Task B before:task-c
+      (A) Task C id:task-c
+      Task D before:task-e
+      Task E id:task-e
+      """
+    When the user asks for all next actions with at least priority A
+    Then Next-action shows
+      """
+      (A) Task A
+      Task B before:task-c
+      """
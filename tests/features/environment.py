@@ -3,6 +3,7 @@
 import os
 import shutil
 import subprocess  # nosec
+import tempfile
 
 
 def before_all(context):
@@ -10,22 +11,29 @@ def before_all(context):
     def run_next_action():
         """Run Next-action and return both stderr and stdout."""
         os.environ["BROWSER"] = 'echo %s'
-        result = subprocess.run(context.arguments, stdout=subprocess.PIPE, stderr=subprocess.PIPE, encoding="utf-8")
+        result = subprocess.run(context.arguments, stdout=subprocess.PIPE, stderr=subprocess.PIPE, encoding="utf-8",
+                                input=context.input, env={**os.environ, **context.environment})
         return result.stdout + result.stderr
 
     context.next_action = run_next_action
+    # Keep the parse cache of the todo.txt files created by the scenarios out of the user cache directory
+    context.cache_home = tempfile.mkdtemp()
+    os.environ["XDG_CACHE_HOME"] = context.cache_home
     subprocess.run(["coverage", "erase"])
 
 
 def before_scenario(context, scenario):  # pylint: disable=unused-argument
-    """Set up arguments."""
+    """Set up arguments, standard input, and environment variables."""
     context.files = []
+    context.input = None
+    context.environment = {}
     next_action = shutil.which("next-action")
     context.arguments = ["coverage", "run", "--branch", "--parallel-mode",
                          "--rcfile=.coveragerc-behave", next_action, "--config-file"]
 
 
-def after_all(context):  # pylint: disable=unused-argument
-    """Create coverage report."""
+def after_all(context):
+    """Remove the parse cache and create coverage report."""
+    shutil.rmtree(context.cache_home, ignore_errors=True)
     subprocess.run(["coverage", "combine"])
     subprocess.run(["coverage", "html", "--rcfile", ".coveragerc-behave", "--directory", "build/feature-coverage"])
@@ -0,0 +1,13 @@
+Feature: explain how the next actions were selected
+
+  Scenario: explain the selection of the next action
+    Given a todo.txt with
+      """
+      Task A
+      Task B @home
+      Task C @home h:1
+      """
+    When the user asks for the next action at home
+    And the user asks for an explanation
+    Then Next-action shows the next action "Task B @home"
+    And Next-action explains that it applied the filters "@home" and "not hidden and not future" to 3 tasks
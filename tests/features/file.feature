@@ -45,3 +45,19 @@ Feature: select todo.txt file(s) to read
       """
     When the user asks for the next action from another_todo.txt
     Then Next-action shows the next action "Another task"
+
+  Scenario: read todo.txt from standard input
+    Given a todo.txt on standard input with
+      """
+      A task
+      """
+    When the user asks for the next action read from standard input
+    Then Next-action shows the next action "A task"
+
+  Scenario: read todo.txt from a file that isn't a regular file
+    Given a todo.txt on standard input with
+      """
+      A task
+      """
+    When the user asks for the next action read from /dev/stdin
+    Then Next-action shows the next action "A task"
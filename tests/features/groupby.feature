@@ -84,3 +84,47 @@ Feature: group next actions by context, project, due date or priority
       """
     When the user asks for all next actions ungrouped
     Then Next-action shows the user 2 next actions
+
+  Scenario: next actions per group
+    Given a todo.txt with
+      """
+      (B) Paint @home
+      (A) Clean @home
+      (C) Fix roof @home
+      (B) Write report @work
+      """
+    When the user asks for 1 next action per context
+    Then Next-action shows
+      """
+      home:
+      - (A) Clean @home
+      work:
+      - (B) Write report @work
+      """
+
+  Scenario: next actions per due date
+    Given a todo.txt with
+      """
+      (B) Paint due:2018-01-02
+      (A) Clean due:2018-01-01
+      (C) Fix roof due:2018-01-01
+      Write report
+      """
+    When the user asks for 1 next action per duedate
+    Then Next-action shows
+      """
+      2018-01-01:
+      - (A) Clean due:2018-01-01
+      2018-01-02:
+      - (B) Paint due:2018-01-02
+      No due date:
+      - Write report
+      """
+
+  Scenario: next actions per group without grouping
+    Given a todo.txt with
+      """
+      Task
+      """
+    When the user asks for the next actions per group
+    Then Next-action tells the user --per-group is not allowed without -g/--groupby
@@ -0,0 +1,24 @@
+Feature: show the next actions in a machine-readable format
+
+  Scenario: next actions as JSON Lines
+    Given a todo.txt with
+      """
+      (A) Call mom @phone due:2018-01-01 before:visit
+      Visit mom id:visit
+      """
+    When the user asks for the next action as JSON Lines
+    Then Next-action shows the next action "(A) Call mom @phone due:2018-01-01 before:visit" as JSON
+
+  Scenario: grouped next actions as JSON Lines
+    Given a todo.txt with
+      """
+      (A) Call mom @phone due:2018-01-01
+      """
+    When the user asks for all next actions grouped by due date
+    And the user asks for the next action as JSON Lines
+    Then Next-action shows the next action "(A) Call mom @phone due:2018-01-01" as JSON in the group "2018-01-01"
+
+  Scenario: nothing to do as JSON Lines
+    Given an empty todo.txt
+    When the user asks for the next action as JSON Lines
+    Then Next-action shows nothing
@@ -0,0 +1,36 @@
+Feature: rank the next actions
+
+  Scenario: rank by priority
+    Given a todo.txt with
+      """
+      Buy ingredients before:chop before:boil
+      Chop vegetables id:chop before:cook
+      Boil water id:boil before:cook
+      Cook dinner id:cook
+      (A) Call mom
+      """
+    When the user asks for the next action
+    Then Next-action shows the next action "(A) Call mom"
+
+  Scenario: rank by impact
+    Given a todo.txt with
+      """
+      Buy ingredients before:chop before:boil
+      Chop vegetables id:chop before:cook
+      Boil water id:boil before:cook
+      Cook dinner id:cook
+      (A) Call mom
+      """
+    When the user asks for the next action ranked by impact
+    Then Next-action shows the next action "Buy ingredients before:chop before:boil"
+
+  Scenario: rank by impact with tasks that block each other
+    Given a todo.txt with
+      """
+      (A) Call mom
+      Clean kitchen before:cook
+      Cook dinner id:cook before:dishes
+      Do dishes id:dishes before:cook
+      """
+    When the user asks for the next action ranked by impact
+    Then Next-action shows the next action "Clean kitchen before:cook"
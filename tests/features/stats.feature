@@ -0,0 +1,30 @@
+Feature: show statistics of the tasks
+
+  Background: a todo.txt with different tasks
+    Given a todo.txt with
+      """
+      (A) Call mom @phone due:{yesterday}
+      (B) Pay bills +finance due:{today}
+      Buy paint @store before:paint
+      Paint @home id:paint due:9999-01-01
+      Water plants
+      Hidden task h:1
+      x Done task
+      """
+
+  Scenario: statistics
+    When the user asks for the statistics
+    Then Next-action shows
+      """
+      Tasks: 5
+      Status: 4 unblocked, 1 blocked
+      Due: 1 overdue, 1 today, 0 this week, 2 later, 1 no due date
+      Priorities: 1 A, 1 B, 3 no priority
+      Contexts: 1 @home, 1 @phone, 1 @store
+      Projects: 1 +finance
+      """
+
+  Scenario: statistics as JSON
+    When the user asks for the statistics
+    And the user asks for the next action as JSON Lines
+    Then Next-action shows the statistics of 5 tasks as JSON
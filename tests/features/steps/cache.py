@@ -0,0 +1,79 @@
+"""Steps for the parse cache."""
+
+import os
+import stat
+import tempfile
+
+from asserts import assert_equal, assert_false
+from behave import given, then
+
+
+def cache_directory(context) -> str:
+    """Return the directory of the parse cache of Next-action."""
+    return os.path.join(context.temporary_cache_home.name, "next-action")
+
+
+def cache_entries(context):
+    """Return the paths of the cache entries."""
+    directory = cache_directory(context)
+    if not os.path.exists(directory):
+        return []
+    return [os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(".pickle")]
+
+
+@given("a private cache directory")
+def private_cache_directory(context):
+    """Use a temporary cache directory, so the cache entries of the scenario can be inspected."""
+    context.temporary_cache_home = tempfile.TemporaryDirectory()
+    context.environment["XDG_CACHE_HOME"] = context.temporary_cache_home.name
+
+
+@given("a cache directory that is writable by others")
+def shared_cache_directory(context):
+    """Create a temporary cache directory that others can write to."""
+    context.execute_steps("given a private cache directory")
+    os.mkdir(cache_directory(context))
+    os.chmod(cache_directory(context), 0o777)  # nosec
+
+
+@given("the cache entries are writable by others")
+def shared_cache_entries(context):
+    """Make the cache entries writable by others."""
+    for entry in cache_entries(context):
+        os.chmod(entry, 0o666)  # nosec
+
+
+@given("the cache is disabled")
+def disabled_cache(context):
+    """Disable the cache."""
+    context.environment["NEXT_ACTION_NO_CACHE"] = "1"
+
+
+@given("the user has asked for the next action")
+def next_action_asked(context):
+    """Run Next-action, so its cache contains the todo.txt."""
+    context.next_action()
+
+
+@given("the todo.txt is changed to")
+def change_todotxt(context):
+    """Replace the contents of the todo.txt file."""
+    todotxt_file = context.files[-1]
+    todotxt_file.seek(0)
+    todotxt_file.truncate()
+    todotxt_file.write(context.text)
+    todotxt_file.flush()
+
+
+@then("Next-action has cached the todo.txt")
+def cached(context):
+    """Check that the cache has one private entry."""
+    entries = cache_entries(context)
+    assert_equal(1, len(entries))
+    assert_false(os.stat(entries[0]).st_mode & (stat.S_IWGRP | stat.S_IWOTH))
+
+
+@then("Next-action has not cached the todo.txt")
+def not_cached(context):
+    """Check that the cache has no entries."""
+    assert_equal([], cache_entries(context))
@@ -2,6 +2,8 @@
 
 import argparse
 import datetime
+import json
+import subprocess  # nosec
 import tempfile
 
 from asserts import assert_equal, assert_in, assert_regex, assert_not_in, assert_true
@@ -48,7 +50,15 @@ def unreadable_todotxt(context):
 def todotxt(context):
     """Add the contents to the temporary todo.txt file."""
     context.execute_steps("given an empty todo.txt")
-    context.files[-1].write(context.text.format(tomorrow=tomorrow(), yesterday=yesterday()))
+    context.files[-1].write(context.text.format(today=today(), tomorrow=tomorrow(), yesterday=yesterday()))
+    context.files[-1].seek(0)
+
+
+@given("a todo.txt with {number} tasks")
+def todotxt_with_tasks(context, number):
+    """Add the number of tasks to the temporary todo.txt file."""
+    context.execute_steps("given an empty todo.txt")
+    context.files[-1].write("".join(f"Task {index} with a description\n" for index in range(int(number))))
     context.files[-1].seek(0)
 
 
@@ -60,6 +70,12 @@ def named_todotxt(context, filename):
     context.files[-1].given_filename = filename
 
 
+@given("a todo.txt on standard input with")
+def todotxt_on_stdin(context):
+    """Pass the contents to Next-action on standard input."""
+    context.input = context.text
+
+
 @when("the user asks for the next action")
 def next_action(context):  # pylint: disable=unused-argument
     """Next-action shows the next action by default, so no arguments needed."""
@@ -72,6 +88,12 @@ def next_action_from_file(context, filename):
     context.arguments.extend(["--file", real_filename])
 
 
+@when("the user asks for the next action read from {path}")
+def next_action_read_from(context, path):
+    """Add the file argument, using - for standard input."""
+    context.arguments.extend(["--file", "-" if path == "standard input" else path])
+
+
 @when("the user asks for the next action due {due_date}")
 def next_action_due(context, due_date):
     """Add the due argument."""
@@ -114,12 +136,48 @@ def next_action_groupby(context, groupby):
     context.arguments.extend(["--all", "--groupby", groupby.replace("due date", "duedate")])
 
 
+@when('the user assumes the task "{task_id}" is done')
+def next_action_assume_done(context, task_id):
+    """Add the assume done argument."""
+    context.arguments.extend(["--assume-done", task_id])
+
+
+@when("the user asks for {number} next action per {groupby}")
+def next_action_per_group(context, number, groupby):
+    """Add the number, groupby, and per group arguments."""
+    context.arguments.extend(["--number", number, "--groupby", groupby, "--per-group"])
+
+
+@when("the user asks for the next actions per group")
+def next_action_per_group_without_groupby(context):
+    """Add the per group option."""
+    context.arguments.append("--per-group")
+
+
 @when("the user asks for the blocked tasks")
 def next_action_with_blocked_tasks(context):
     """Add the blocked option."""
     context.arguments.append("--blocked")
 
 
+@when("the user asks for the blocked tasks up to depth {depth}")
+def next_action_with_blocked_tasks_up_to_depth(context, depth):
+    """Add the blocked option and the depth argument."""
+    context.arguments.extend(["--blocked", "--depth", depth])
+
+
+@when("the user asks for a maximum depth of {depth}")
+def next_action_with_depth(context, depth):
+    """Add the depth argument."""
+    context.arguments.extend(["--depth", depth])
+
+
+@when("the user asks for the next action ranked by {rank}")
+def next_action_ranked(context, rank):
+    """Add the rank argument."""
+    context.arguments.extend(["--rank", rank])
+
+
 @when("the user asks for the next action with the style {style}")
 def next_action_with_a_style(context, style):
     """Add the style argument."""
@@ -134,6 +192,18 @@ def next_action_with_invalid_arg(context, argument):
     context.arguments.append(argument)
 
 
+@when("the user asks for the next action as JSON Lines")
+def next_action_as_json_lines(context):
+    """Add the output argument."""
+    context.arguments.extend(["--output", "jsonl"])
+
+
+@when("the user asks for the statistics")
+def next_action_stats(context):
+    """Add the statistics option."""
+    context.arguments.append("--stats")
+
+
 @when("the user asks for the line number to be referenced")
 def next_action_ref_line_number(context):
     """Add the line number argument."""
@@ -212,6 +282,12 @@ def ask_for_list_of_arguments(context, argument_type):
     context.arguments.extend(["--list-arguments", f"{argument_type.replace(' ', '_').replace('-', '_')}"])
 
 
+@when("the user asks for an explanation")
+def next_action_explain(context):
+    """Add the explain option."""
+    context.arguments.append("--explain")
+
+
 @when("the user asks for the next action with the open urls option")
 def next_action_open_url(context):
     """Add the open url option."""
@@ -224,6 +300,37 @@ def nothing_todo(context):
     assert_in("Nothing to do!", context.next_action())
 
 
+@then("Next-action shows")
+def show_output(context):
+    """Check the complete output."""
+    assert_equal(context.text + "\n", context.next_action())
+
+
+@then("Next-action shows nothing")
+def show_nothing(context):
+    """Check that the output is empty."""
+    assert_equal("", context.next_action())
+
+
+@then('Next-action shows the next action "{action}" as JSON')
+def show_next_action_as_json(context, action):
+    """Check that the next action is shown as JSON object."""
+    assert_equal([action], [json.loads(line)["text"] for line in context.next_action().splitlines()])
+
+
+@then('Next-action shows the next action "{action}" as JSON in the group "{group}"')
+def show_grouped_next_action_as_json(context, action, group):
+    """Check that the next action is shown as JSON object, with its group."""
+    records = [json.loads(line) for line in context.next_action().splitlines()]
+    assert_equal([(action, group)], [(record["text"], record["group"]) for record in records])
+
+
+@then("Next-action shows the statistics of {number} tasks as JSON")
+def show_statistics_as_json(context, number):
+    """Check that the statistics are shown as one JSON object."""
+    assert_equal(int(number), json.loads(context.next_action())["total"])
+
+
 @then("Next-action references the line number of the next action")
 def check_line_number(context):
     """Check the line number reference."""
@@ -248,6 +355,12 @@ def show_named_next_action(context, action):
     assert_in(action, context.next_action())
 
 
+@then('Next-action does not show the next action "{action}"')
+def does_not_show_named_next_action(context, action):
+    """Check that the named next action is not shown."""
+    assert_not_in(action, context.next_action())
+
+
 @then("Next-action shows the next action at {contexts}")
 def show_next_action_at_contexts(context, contexts):
     """Check that the next action has the required contexts."""
@@ -282,6 +395,18 @@ def show_blocked_task(context, task):
     assert_in(task, context.next_action())
 
 
+@then('Next-action shows that "{task}" blocks more tasks')
+def show_more_blocked_tasks(context, task):
+    """Check that the tasks blocked by the task beyond the maximum depth are left out."""
+    assert_in(f"{task}\n  blocks: ...", context.next_action())
+
+
+@then('Next-action refers to the blocked tasks of "{task}" shown above')
+def show_blocked_tasks_once(context, task):
+    """Check that the tasks blocked by the task are referred to instead of shown again."""
+    assert_in(f"blocks: see {task} above", context.next_action())
+
+
 @then("Next-action shows the user the next action due tomorrow")
 def show_next_action_due_tomorrow(context):
     """Check that the next action is due tomorrow."""
@@ -315,6 +440,17 @@ def show_next_actions(context, number, actions):  # pylint: disable=unused-argum
     assert_equal(context.next_action().strip().count("\n"), number - 1)
 
 
+@then("Next-action stops when the user stops reading the next actions")
+def stop_reading(context):
+    """Check that Next-action exits with an error status and no error message when the output is closed early."""
+    with subprocess.Popen(context.arguments, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                          encoding="utf-8") as process:
+        assert_in("Task", process.stdout.readline())
+        process.stdout.close()
+        assert_equal(1, process.wait())
+        assert_equal("", process.stderr.read())
+
+
 @then("Next-action tells the user the number argument is invalid")
 def invalid_number_error_message(context):
     """Check the error message."""
@@ -377,6 +513,13 @@ def c_or_p_in_and_ex_error_message(context, context_or_project):
               context.next_action())
 
 
+@then("Next-action tells the user {argument} is not allowed without {other_argument}")
+def not_allowed_without_error_message(context, argument, other_argument):
+    """Check the error message."""
+    assert_in(f"next-action: error: argument {argument}: not allowed without argument {other_argument}",
+              context.next_action())
+
+
 @then("Next-action tells the user the todo.txt can't be read")
 def unreadable_file_error_message(context):
     """Check the error message."""
@@ -387,3 +530,21 @@ def unreadable_file_error_message(context):
 def open_url(context, url, task):
     """Check the url."""
     assert_equal(url + "\n" + task + "\n", context.next_action())
+
+
+@then('Next-action explains that it applied the filters "{first_filter}" and "{second_filter}" to {number} tasks')
+def explain_plan(context, first_filter, second_filter, number):
+    """Check that the explanation shows the filters in the order they were applied."""
+    assert_regex(context.next_action(), f"Plan for {number} tasks:\n 1. {first_filter} .*\n 2. {second_filter} ")
+
+
+@then('Next-action warns the user that "{tasks}" block each other')
+def dependency_cycle_warning(context, tasks):
+    """Check the warning."""
+    assert_in(f"next-action: warning: tasks block each other: {tasks}", context.next_action())
+
+
+@then('Next-action warns the user the task id "{task_id}" is unknown')
+def unknown_task_id_warning(context, task_id):
+    """Check the warning."""
+    assert_in(f"next-action: warning: unknown task id: {task_id}", context.next_action())
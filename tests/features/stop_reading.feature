@@ -0,0 +1,6 @@
+Feature: stop when the output is no longer read
+
+  Scenario: the user stops reading the next actions
+    Given a todo.txt with 20000 tasks
+    When the user asks for all next actions
+    Then Next-action stops when the user stops reading the next actions
@@ -381,6 +381,12 @@ class GroupByTest(ConfigTestCase):
         """Test that a command line argument overrides the configured value."""
         self.assertEqual("duedate", parse_arguments()[1].groupby)
 
+    @patch.object(sys, "argv", ["next-action", "--per-group"])
+    @patch.object(config, "open", mock_open(read_data="groupby: context"))
+    def test_per_group(self):
+        """Test that the next actions can be selected per configured group."""
+        self.assertTrue(parse_arguments()[1].per_group)
+
     @patch.object(sys, "argv", ["next-action"])
     @patch.object(config, "open", mock_open(read_data="groupby: invalid"))
     def test_invalid_group(self):
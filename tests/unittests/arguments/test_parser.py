@@ -10,10 +10,11 @@ from unittest.mock import call, mock_open, patch
 from next_action.arguments import config, parse_arguments
 
 
-USAGE_MESSAGE = textwrap.fill(
-    "Usage: next-action [-h] [-V] [-c [<config.cfg>] | -w] [-f <todo.txt> ...] [-b] [-g [<group>]] [-l] [-r <ref>] "
-    "[-s [<style>]] [-a | -n <number>] [-d [<due date>] | -o] [-p [<priority>]] [-u] [--] "
-    "[<context|project> ...]", 120) + "\n"
+USAGE_MESSAGE = "Usage: " + textwrap.fill(
+    "next-action [-h] [-V] [-c [<config.cfg>] | -w] [-f <todo.txt> ...] [--assume-done <id> ...] [-b] "
+    "[--depth <depth>] [-g [<group>]] [-l] [-r <ref>] [-s [<style>]] [--output <format>] [--stats] "
+    "[-a | -n <number>] [--rank <rank>] [--per-group] [-d [<due date>] | -o] [-p [<priority>]] [-u] [--explain] [--] "
+    "[<context|project> ...]", 120 - len("Usage: ")) + "\n"
 
 
 class ParserTestCase(unittest.TestCase):
@@ -47,6 +48,16 @@ class NoArgumentTest(ParserTestCase):
         """Test that the argument parser returns the default filename if the user doesn't pass one."""
         self.assertEqual(["~/todo.txt"], parse_arguments()[1].file)
 
+    @patch.object(sys, "argv", ["next-action"])
+    def test_assume_done(self):
+        """Test that the argument parser assumes no tasks are done if the user doesn't pass any."""
+        self.assertEqual([], parse_arguments()[1].assume_done)
+
+    @patch.object(sys, "argv", ["next-action", "--assume-done", "1", "--assume-done", "2"])
+    def test_assume_done_ids(self):
+        """Test that the argument parser collects the ids of the tasks assumed to be done."""
+        self.assertEqual(["1", "2"], parse_arguments()[1].assume_done)
+
     @patch.object(sys, "argv", ["next-action"])
     def test_style(self):
         """Test that the argument parser returns the default style if the user doesn't pass one."""
@@ -216,6 +227,45 @@ class NumberTest(ParserTestCase):
         """Test that the argument parser exits if the both --all and --number are used."""
         self.assert_system_exit(mock_stderr_write, "argument -n/--number: not allowed with argument -a/--all")
 
+    @patch.object(sys, "argv", ["next-action"])
+    def test_default_rank(self):
+        """Test that the next actions are ranked by priority by default."""
+        self.assertEqual("priority", parse_arguments()[1].rank)
+
+    @patch.object(sys, "argv", ["next-action", "--rank", "impact"])
+    def test_rank(self):
+        """Test that the ranking can be changed."""
+        self.assertEqual("impact", parse_arguments()[1].rank)
+
+    @patch.object(sys, "argv", ["next-action", "--groupby", "context", "--per-group"])
+    def test_per_group(self):
+        """Test that the number of next actions can apply to each group."""
+        self.assertTrue(parse_arguments()[1].per_group)
+
+    @patch.object(sys, "argv", ["next-action", "--per-group"])
+    @patch.object(sys.stderr, "write")
+    def test_per_group_without_groupby(self, mock_stderr_write):
+        """Test that the argument parser exits if --per-group is used without --groupby."""
+        self.assert_system_exit(mock_stderr_write, "argument --per-group: not allowed without argument -g/--groupby")
+
+    @patch.object(sys, "argv", ["next-action", "--blocked", "--depth", "2"])
+    def test_depth(self):
+        """Test that the maximum depth of the blocked tasks can be set."""
+        self.assertEqual(2, parse_arguments()[1].depth)
+
+    @patch.object(sys, "argv", ["next-action", "--depth", "2"])
+    @patch.object(sys.stderr, "write")
+    def test_depth_without_blocked(self, mock_stderr_write):
+        """Test that the argument parser exits if --depth is used without --blocked."""
+        self.assert_system_exit(mock_stderr_write, "argument --depth: not allowed without argument -b/--blocked")
+
+    @patch.object(sys, "argv", ["next-action", "--rank", "urgency"])
+    @patch.object(sys.stderr, "write")
+    def test_faulty_rank(self, mock_stderr_write):
+        """Test that the argument parser exits if the ranking is unknown."""
+        self.assert_system_exit(
+            mock_stderr_write, "argument --rank: invalid choice: 'urgency' (choose from 'priority', 'impact')")
+
 
 @patch.object(config, "open", mock_open(read_data=""))
 class DueDateTest(ParserTestCase):
@@ -297,3 +347,38 @@ class ReferenceTest(ParserTestCase):
         self.assert_system_exit(
             mock_stderr_write,
             "argument -r/--reference: invalid choice: 'not_an_option' (choose from 'always', 'never', 'multiple')")
+
+
+class OutputTest(ParserTestCase):
+    """Unit tests for the --output option."""
+
+    @patch.object(sys, "argv", ["next-action"])
+    def test_default(self):
+        """Test that the default output format is text."""
+        self.assertEqual("text", parse_arguments()[1].output)
+
+    @patch.object(sys, "argv", ["next-action", "--output", "jsonl"])
+    def test_jsonl(self):
+        """Test that the output format can be set to JSON Lines."""
+        self.assertEqual("jsonl", parse_arguments()[1].output)
+
+    @patch.object(sys, "argv", ["next-action", "--output", "xml"])
+    @patch.object(sys.stderr, "write")
+    def test_faulty_format(self, mock_stderr_write):
+        """Test that the argument parser exits if the output format is unknown."""
+        self.assert_system_exit(
+            mock_stderr_write, "argument --output: invalid choice: 'xml' (choose from 'text', 'jsonl')")
+
+
+class StatsTest(ParserTestCase):
+    """Unit tests for the --stats option."""
+
+    @patch.object(sys, "argv", ["next-action"])
+    def test_default(self):
+        """Test that the next actions are shown by default."""
+        self.assertFalse(parse_arguments()[1].stats)
+
+    @patch.object(sys, "argv", ["next-action", "--stats"])
+    def test_stats(self):
+        """Test that the statistics can be shown instead of the next actions."""
+        self.assertTrue(parse_arguments()[1].stats)
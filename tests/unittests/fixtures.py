@@ -1,8 +1,21 @@
 """Fixtures for unit tests."""
 
 import argparse
+import datetime
+import random
 import unittest
 import sys
+from typing import List
+
+from next_action.todotxt import Task
+
+
+def namespace(**arguments) -> argparse.Namespace:
+    """Return a namespace with default arguments, overridden by the arguments passed."""
+    defaults = {"contexts": set(), "projects": set(), "excluded_contexts": set(), "excluded_projects": set(),
+                "overdue": False, "due": None, "priority": None, "time_travel": None, "number": sys.maxsize,
+                "assume_done": [], "rank": "priority", "groupby": None, "per_group": False}
+    return argparse.Namespace(**{**defaults, **arguments})
 
 
 class TestCaseWithNamespace(unittest.TestCase):
@@ -10,13 +23,25 @@ class TestCaseWithNamespace(unittest.TestCase):
 
     def setUp(self):
         """Set up the namespace with default arguments for all unit tests."""
-        self.namespace = argparse.Namespace()
-        self.namespace.contexts = set()
-        self.namespace.projects = set()
-        self.namespace.excluded_contexts = set()
-        self.namespace.excluded_projects = set()
-        self.namespace.overdue = False
-        self.namespace.due = None
-        self.namespace.priority = None
-        self.namespace.time_travel = None
-        self.namespace.number = sys.maxsize
+        self.namespace = namespace()
+
+
+def random_tasks(rng: random.Random, nr_tasks: int) -> List[Task]:
+    """Return random tasks with many equal priorities, dates, contexts, and projects."""
+    today = datetime.date.today()
+
+    def date() -> str:
+        """Return a random date around today."""
+        return (today + datetime.timedelta(days=rng.randint(-3, 3))).isoformat()
+
+    def maybe(text: str, probability: float = 0.5) -> str:
+        """Return the text with the probability, otherwise an empty string."""
+        return text if rng.random() < probability else ""
+
+    tasks = []
+    for index in range(nr_tasks):
+        parts = [maybe(f"({rng.choice('ABC')})"), maybe(date(), 0.3), f"Todo {index}", maybe(f"due:{date()}"),
+                 maybe(f"t:{date()}", 0.2), maybe("h:1", 0.1), rng.choice(["", "@home", "@work", "@home @phone"]),
+                 rng.choice(["", "+garden", "+paper", "+garden +paper"])]
+        tasks.append(Task(" ".join(part for part in parts if part)))
+    return tasks
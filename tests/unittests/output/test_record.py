@@ -0,0 +1,43 @@
+"""Unit tests for the record module in the output package."""
+
+import json
+import unittest
+
+from next_action import todotxt
+from next_action.output.record import json_line, task_record
+
+
+class TaskRecordTest(unittest.TestCase):
+    """Unit tests for the task record method."""
+
+    def test_record(self):
+        """Test that the record has the properties of the task."""
+        task = todotxt.Task("(B) 2018-01-01 Paint @home +PaintHouse due:2018-10-10 t:2018-02-01 id:paint "
+                            "https://paint.com", "todo.txt", 3)
+        self.assertEqual(
+            {"text": task.text, "priority": "B", "due_date": "2018-10-10", "creation_date": "2018-01-01",
+             "threshold_date": "2018-02-01", "contexts": ["home"], "projects": ["PaintHouse"], "id": "paint",
+             "filename": "todo.txt", "line_number": 3, "urls": ["https://paint.com"], "blocks": []},
+            task_record(task))
+
+    def test_empty_record(self):
+        """Test that missing properties are null."""
+        record = task_record(todotxt.Task("Paint"))
+        for field in ("priority", "due_date", "creation_date", "threshold_date", "id", "line_number"):
+            self.assertIsNone(record[field], field)
+
+    def test_blocked_tasks(self):
+        """Test that the tasks blocked by the task are referenced and that the task inherits their priority."""
+        tasks = [todotxt.Task("Buy paint before:paint", "todo.txt", 1),
+                 todotxt.Task("(A) Paint id:paint", "todo.txt", 2), todotxt.Task("Clean after:buy", "todo.txt", 3)]
+        todotxt.unblocked_tasks(tasks)
+        record = task_record(tasks[0])
+        self.assertEqual("A", record["priority"])
+        self.assertEqual([{"id": "paint", "filename": "todo.txt", "line_number": 2}], record["blocks"])
+
+    def test_json_line(self):
+        """Test that the JSON line has the record and the extra fields."""
+        line = json_line(todotxt.Task("Café @home"), group="home")
+        self.assertNotIn("\n", line)
+        self.assertEqual(dict(task_record(todotxt.Task("Café @home")), group="home"), json.loads(line))
+        self.assertIn("Café", line)
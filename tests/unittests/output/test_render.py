@@ -1,13 +1,21 @@
 """Unit tests for the render functions."""
 
 import argparse
+import datetime
+import io
+import json
 import unittest
+from unittest.mock import patch
 
 from hypothesis import given, strategies
 from pygments.styles import get_all_styles
 
 from next_action import todotxt
-from next_action.output import render_next_action, render_arguments, render_grouped_tasks
+from next_action.output import generate_next_action, render_arguments, render_plan, render_statistics, \
+    write_next_action
+from next_action.planner import Plan
+
+from .. import fixtures
 
 
 class RenderNextActionTestCase(unittest.TestCase):
@@ -18,11 +26,17 @@ class RenderNextActionTestCase(unittest.TestCase):
         self.filename1 = "todo.txt"
         self.namespace = argparse.Namespace()
         self.namespace.blocked = False
+        self.namespace.depth = None
         self.namespace.line_number = False
         self.namespace.reference = "multiple"
         self.namespace.file = [self.filename1]
         self.namespace.style = None
         self.namespace.groupby = None
+        self.namespace.output = "text"
+
+    def render(self, next_actions, tasks=()) -> str:
+        """Render the next actions the way they are written to the output."""
+        return "\n".join(generate_next_action(next_actions, tasks, self.namespace))
 
 
 class RenderNextActionTest(RenderNextActionTestCase):
@@ -42,20 +56,20 @@ class RenderNextActionTest(RenderNextActionTestCase):
         """Test that the line number is added if line_number is true."""
         self.namespace.line_number = True
         self.assertEqual(
-            f"{self.call_mom.text} [{self.line_number1}]", render_next_action([self.call_mom], [], self.namespace))
+            f"{self.call_mom.text} [{self.line_number1}]", self.render([self.call_mom]))
 
     def test_reference_always(self):
         """Test that the source filename is added if reference is always."""
         self.namespace.reference = "always"
         self.assertEqual(
-            f"{self.call_mom.text} [{self.filename1}]", render_next_action([self.call_mom], [], self.namespace))
+            f"{self.call_mom.text} [{self.filename1}]", self.render([self.call_mom]))
 
     def test_reference_multiple(self):
         """Test that the source filename is added if reference is multiple and there are multiple todo.txt files."""
         self.namespace.file.append("work.txt")
         self.assertEqual(
             f"{self.call_mom.text} [{self.filename1}]\nProposal [{self.filename2}]",
-            render_next_action([self.call_mom, todotxt.Task("Proposal", self.filename2)], [], self.namespace))
+            self.render([self.call_mom, todotxt.Task("Proposal", self.filename2)]))
 
     def test_reference_never(self):
         """Test that the source filename is not added if reference is never."""
@@ -63,7 +77,7 @@ class RenderNextActionTest(RenderNextActionTestCase):
         self.namespace.file.append(self.filename2)
         self.assertEqual(
             f"{self.call_mom.text}\nProposal",
-            render_next_action([self.call_mom, todotxt.Task("Proposal", self.filename2)], [], self.namespace))
+            self.render([self.call_mom, todotxt.Task("Proposal", self.filename2)]))
 
     def test_line_number_and_filename(self):
         """Test that the line number and filename are added if line_number is true and reference is always."""
@@ -71,14 +85,14 @@ class RenderNextActionTest(RenderNextActionTestCase):
         self.namespace.line_number = True
         self.assertEqual(
             f"{self.call_mom.text} [{self.filename1}:{self.line_number1}]",
-            render_next_action([self.call_mom], [], self.namespace))
+            self.render([self.call_mom]))
 
     def test_groupby_context(self):
         """Test that next actions can be grouped by context."""
         self.namespace.groupby = "context"
         self.assertEqual(
             f"No context:\n- {self.call_mom.text}\nhome:\n- {self.paint_house.text}\n- {self.fix_lamp.text}",
-            render_grouped_tasks([self.call_mom, self.paint_house, self.fix_lamp], self.namespace))
+            self.render([self.call_mom, self.paint_house, self.fix_lamp]))
 
     def test_groupby_project(self):
         """Test that next actions can be grouped by project."""
@@ -86,14 +100,14 @@ class RenderNextActionTest(RenderNextActionTestCase):
         self.assertEqual(
             f"No project:\n- {self.call_mom.text}\nHomeImprovement:\n- {self.paint_house.text}\n"
             f"- {self.fix_lamp.text}",
-            render_grouped_tasks([self.call_mom, self.paint_house, self.fix_lamp], self.namespace))
+            self.render([self.call_mom, self.paint_house, self.fix_lamp]))
 
     def test_groupby_priority(self):
         """Test that next actions can be grouped by priority."""
         self.namespace.groupby = "priority"
         self.assertEqual(
             f"No priority:\n- {self.call_mom.text}\nA:\n- {self.paint_house.text}\n- {self.fix_lamp.text}",
-            render_grouped_tasks([self.call_mom, self.paint_house, self.fix_lamp], self.namespace))
+            self.render([self.call_mom, self.paint_house, self.fix_lamp]))
 
     def test_groupby_due_date(self):
         """Test that next actions can be grouped by due date."""
@@ -101,7 +115,24 @@ class RenderNextActionTest(RenderNextActionTestCase):
         self.assertEqual(
             f"No due date:\n- {self.call_mom.text}\n2018-10-10:\n- {self.paint_house.text}\n"
             f"- {self.fix_lamp.text}",
-            render_grouped_tasks([self.call_mom, self.paint_house, self.fix_lamp], self.namespace))
+            self.render([self.call_mom, self.paint_house, self.fix_lamp]))
+
+    def test_groupby_order(self):
+        """Test that groups are ordered by their first next action and tasks keep their order within groups."""
+        self.namespace.groupby = "context"
+        tasks = [todotxt.Task("Wash @work @car"), todotxt.Task("Call @phone @work"), todotxt.Task("Drive @car")]
+        self.assertEqual(
+            f"car:\n- {tasks[0].text}\n- {tasks[2].text}\nwork:\n- {tasks[0].text}\n- {tasks[1].text}\n"
+            f"phone:\n- {tasks[1].text}",
+            self.render(tasks))
+
+    def test_groupby_per_group(self):
+        """Test that the groups of next actions selected per group are rendered as is."""
+        self.namespace.groupby = "context"
+        tasks = todotxt.Tasks([self.paint_house, self.call_mom],
+                              groups={"home": [self.paint_house], None: [self.call_mom]})
+        self.assertEqual(f"home:\n- {self.paint_house.text}\nNo context:\n- {self.call_mom.text}",
+                         self.render(tasks))
 
     def test_groupby_source(self):
         """Test that next actions can be grouped by source file."""
@@ -109,7 +140,69 @@ class RenderNextActionTest(RenderNextActionTestCase):
         self.assertEqual(
             f"{self.call_mom.filename}:\n- {self.call_mom.text}\n{self.paint_house.filename}:\n"
             f"- {self.paint_house.text}\n- {self.fix_lamp.text}",
-            render_grouped_tasks([self.call_mom, self.paint_house, self.fix_lamp], self.namespace))
+            self.render([self.call_mom, self.paint_house, self.fix_lamp]))
+
+
+class WriteNextActionTest(RenderNextActionTestCase):
+    """Unit tests for writing the next actions while rendering them."""
+
+    def setUp(self):
+        """Set up the next actions and the stream to write them to."""
+        super().setUp()
+        self.tasks = todotxt.Tasks(todotxt.Task(f"Todo {index} @home") for index in range(5))
+        self.stream = io.StringIO()
+
+    @patch("next_action.output.WRITE_BATCH_SIZE", 2)
+    def test_write(self):
+        """Test that the output is the same as the rendered next actions when written in batches."""
+        write_next_action(self.tasks, self.tasks, self.namespace, self.stream)
+        self.assertEqual(self.render(self.tasks, self.tasks) + "\n", self.stream.getvalue())
+
+    @patch("next_action.output.WRITE_BATCH_SIZE", 2)
+    def test_write_grouped(self):
+        """Test that the group headers are written with the tasks."""
+        self.namespace.groupby = "context"
+        write_next_action(self.tasks, self.tasks, self.namespace, self.stream)
+        self.assertEqual(self.render(self.tasks, self.tasks) + "\n", self.stream.getvalue())
+
+    def test_batches(self):
+        """Test that the output is written in batches, with a flush per batch."""
+        stream = unittest.mock.Mock()
+        with patch("next_action.output.WRITE_BATCH_SIZE", 2):
+            write_next_action(self.tasks, self.tasks, self.namespace, stream)
+        self.assertEqual(3, stream.flush.call_count)
+        self.assertEqual(unittest.mock.call("Todo 0 @home\nTodo 1 @home"), stream.write.call_args_list[0])
+
+
+class RenderJSONLinesTest(RenderNextActionTestCase):
+    """Unit tests for rendering the next actions as JSON Lines."""
+
+    def setUp(self):
+        """Set up the namespace for JSON Lines output."""
+        super().setUp()
+        self.namespace.output = "jsonl"
+        self.tasks = todotxt.Tasks([todotxt.Task("Paint @home @store due:2018-10-10"), todotxt.Task("Call @phone")])
+
+    def test_json_lines(self):
+        """Test that each next action is a line with a JSON object."""
+        records = [json.loads(line) for line in self.render(self.tasks, self.tasks).split("\n")]
+        self.assertEqual([task.text for task in self.tasks], [record["text"] for record in records])
+
+    def test_grouped(self):
+        """Test that each next action has a line per group, with the group."""
+        self.namespace.groupby = "context"
+        records = [json.loads(line) for line in self.render(self.tasks, self.tasks).split("\n")]
+        self.assertEqual(["home", "store", "phone"], [record["group"] for record in records])
+
+    def test_grouped_by_due_date(self):
+        """Test that due dates are in ISO format."""
+        self.namespace.groupby = "duedate"
+        records = [json.loads(line) for line in self.render(self.tasks, self.tasks).split("\n")]
+        self.assertEqual(["2018-10-10", None], [record["group"] for record in records])
+
+    def test_nothing_to_do(self):
+        """Test that there are no lines if there are no next actions."""
+        self.assertEqual("", self.render(todotxt.Tasks(), self.tasks))
 
 
 class RenderBlockedNextActionTest(RenderNextActionTestCase):
@@ -126,7 +219,7 @@ class RenderBlockedNextActionTest(RenderNextActionTestCase):
         rinse = todotxt.Task("Rinse before:repeat")
         rinse.add_blocked_task(self.repeat)
         self.assertEqual(
-            f"Rinse before:repeat\nblocks:\n- {self.repeat.text}", render_next_action([rinse], [], self.namespace))
+            f"Rinse before:repeat\nblocks:\n- {self.repeat.text}", self.render([rinse]))
 
     def test_blocked_multiple(self):
         """Test that multiple blocked tasks are rendered."""
@@ -137,7 +230,7 @@ class RenderBlockedNextActionTest(RenderNextActionTestCase):
         lather.add_blocked_task(rinse)
         self.assertEqual(
             f"Rinse before:repeat before:rinse\nblocks:\n- {self.repeat.text}\n- Rinse id:rinse",
-            render_next_action([lather], [], self.namespace))
+            self.render([lather]))
 
     def test_blocked_recursive(self):
         """Test that the blocked tasks are rendered, recursively."""
@@ -148,7 +241,133 @@ class RenderBlockedNextActionTest(RenderNextActionTestCase):
         rinse.add_blocked_task(self.repeat)
         self.assertEqual(
             f"Lather before:rinse\nblocks:\n- Rinse id:rinse before:repeat\n  blocks:\n  - {self.repeat.text}",
-            render_next_action([lather], [], self.namespace))
+            self.render([lather]))
+
+    def test_blocked_shared(self):
+        """Test that tasks blocked by multiple next actions are rendered for each next action."""
+        self.namespace.blocked = True
+        lather, wash, rinse = todotxt.Task("Lather"), todotxt.Task("Wash"), todotxt.Task("Rinse")
+        for task in (lather, wash):
+            task.add_blocked_task(rinse)
+        rinse.add_blocked_task(self.repeat)
+        self.assertEqual(
+            f"Lather\nblocks:\n- Rinse\n  blocks:\n  - {self.repeat.text}\n"
+            f"Wash\nblocks:\n- Rinse\n  blocks:\n  - {self.repeat.text}",
+            self.render([lather, wash]))
+
+    def test_blocked_shared_by_one_next_action(self):
+        """Test that tasks blocked via multiple paths of one next action are rendered once, with a back-reference."""
+        self.namespace.blocked = True
+        lather, wash, rinse = todotxt.Task("Lather"), todotxt.Task("Wash"), todotxt.Task("Rinse")
+        lather.add_blocked_task(wash)
+        lather.add_blocked_task(rinse)
+        wash.add_blocked_task(rinse)
+        rinse.add_blocked_task(self.repeat)
+        self.assertEqual(
+            f"Lather\nblocks:\n- Wash\n  blocks:\n  - Rinse\n    blocks:\n    - {self.repeat.text}\n"
+            "- Rinse\n  blocks: see Rinse above",
+            self.render([lather]))
+
+    def test_blocked_diamonds(self):
+        """Test that the output grows linearly with chained diamond-shaped dependencies."""
+        self.namespace.blocked = True
+        self.namespace.number = 1
+        top = bottom = todotxt.Task("Top")
+        for layer in range(50):
+            middle = [todotxt.Task(f"Middle {layer} {index}") for index in range(2)]
+            new_bottom = todotxt.Task(f"Bottom {layer}")
+            for task in middle:
+                bottom.add_blocked_task(task)
+                task.add_blocked_task(new_bottom)
+            bottom = new_bottom
+        self.assertEqual(2 + 49 * 8 + 6, len(self.render([top]).split("\n")))
+
+    def test_blocked_cycle(self):
+        """Test that tasks that block each other are rendered once."""
+        self.namespace.blocked = True
+        lather, rinse = todotxt.Task("Lather"), todotxt.Task("Rinse")
+        lather.add_blocked_task(rinse)
+        rinse.add_blocked_task(lather)
+        self.assertEqual("Lather\nblocks:\n- Rinse\n  blocks:\n  - Lather\n    blocks: see Lather above",
+                         self.render([lather]))
+
+    def test_blocked_depth(self):
+        """Test that blocked tasks deeper than the maximum depth are left out."""
+        self.namespace.blocked = True
+        self.namespace.depth = 1
+        lather = todotxt.Task("Lather before:rinse")
+        rinse = todotxt.Task("Rinse id:rinse before:repeat")
+        lather.add_blocked_task(rinse)
+        rinse.add_blocked_task(self.repeat)
+        self.assertEqual("Lather before:rinse\nblocks:\n- Rinse id:rinse before:repeat\n  blocks: ...",
+                         self.render([lather]))
+
+    def test_blocked_grouped(self):
+        """Test that blocked tasks are rendered for each group when next actions are grouped."""
+        self.namespace.blocked = True
+        self.namespace.groupby = "context"
+        lather = todotxt.Task("Lather @home @work before:repeat")
+        lather.add_blocked_task(self.repeat)
+        self.assertEqual(
+            f"home:\n- {lather.text}\n  blocks:\n  - {self.repeat.text}\n"
+            f"work:\n- {lather.text}\n  blocks:\n  - {self.repeat.text}",
+            self.render([lather]))
+
+
+class RenderPlanTest(fixtures.TestCaseWithNamespace):
+    """Unit tests for the render plan method."""
+
+    def test_plan(self):
+        """Test that the plan is rendered with the number of tasks examined per step."""
+        self.namespace.contexts = {"home"}
+        plan = Plan([todotxt.Task("Todo @home"), todotxt.Task("Todo h:1")], self.namespace)
+        plan.execute()
+        self.assertEqual(
+            "Plan for 2 tasks:\n"
+            " 1. @home                      index  estimated: 1, examined: 2, remaining: 1\n"
+            " 2. not hidden and not future  scan   estimated: 1, examined: 1, remaining: 1",
+            render_plan(plan))
+
+
+class RenderStatisticsTest(unittest.TestCase):
+    """Unit tests for rendering the task statistics."""
+
+    def setUp(self):
+        """Set up the statistics of some tasks."""
+        self.namespace = argparse.Namespace(output="text")
+        self.statistics = todotxt.TaskStatistics(
+            [todotxt.Task("(A) Paint @home +PaintHouse due:2018-10-10"), todotxt.Task("Call @phone"),
+             todotxt.Task("(B) Mow @home")], datetime.date(2018, 10, 1))
+
+    def test_text(self):
+        """Test that the statistics are rendered as text, with the most common contexts and projects first."""
+        self.assertEqual(
+            "Tasks: 3\n"
+            "Status: 3 unblocked, 0 blocked\n"
+            "Due: 0 overdue, 0 today, 0 this week, 1 later, 2 no due date\n"
+            "Priorities: 1 A, 1 B, 1 no priority\n"
+            "Contexts: 2 @home, 1 @phone\n"
+            "Projects: 1 +PaintHouse",
+            render_statistics(self.statistics, self.namespace))
+
+    def test_no_tasks(self):
+        """Test that the statistics of no tasks are rendered."""
+        self.assertEqual(
+            "Tasks: 0\n"
+            "Status: 0 unblocked, 0 blocked\n"
+            "Due: 0 overdue, 0 today, 0 this week, 0 later, 0 no due date\n"
+            "Priorities: none\n"
+            "Contexts: none\n"
+            "Projects: none",
+            render_statistics(todotxt.TaskStatistics([]), self.namespace))
+
+    def test_json(self):
+        """Test that the statistics are rendered as one JSON object."""
+        self.namespace.output = "jsonl"
+        record = json.loads(render_statistics(self.statistics, self.namespace))
+        self.assertEqual(3, record["total"])
+        self.assertEqual({"A": 1, "B": 1, "no priority": 1}, record["priorities"])
+        self.assertEqual({"@home": 2, "@phone": 1}, record["contexts"])
 
 
 class RenderArgumentsTest(unittest.TestCase):
@@ -157,8 +376,9 @@ class RenderArgumentsTest(unittest.TestCase):
     def test_arguments(self):
         """Test that the base arguments are rendered correctly."""
         self.assertEqual(
-            "+ -+ --all --blocked --config-file --due --file --groupby --help --number --open-urls "
-            "--overdue --priority --reference --style --version -@ -V -a -b -c -d -f -g -h -n -o -p -r -s -u @",
+            "+ -+ --all --assume-done --blocked --config-file --depth --due --explain --file --groupby --help --number "
+            "--open-urls --output --overdue --per-group --priority --rank --reference --stats --style --version -@ -V "
+            "-a -b -c -d -f -g -h -n -o -p -r -s -u @",
             render_arguments("all", todotxt.Tasks()))
 
     @given(strategies.sampled_from(["__groupby", "_g"]))
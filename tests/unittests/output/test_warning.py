@@ -1,7 +1,9 @@
 """Unit tests for the warning module in the output package."""
 
+import unittest
+
 from next_action import todotxt
-from next_action.output.warning import invalid_arguments
+from next_action.output.warning import dependency_cycles, invalid_arguments, unknown_task_ids
 
 from .. import fixtures
 
@@ -61,3 +63,37 @@ class InvalidArgumentsTest(fixtures.TestCaseWithNamespace):
         self.namespace.contexts = {"home"}
         self.tasks.append(todotxt.Task("A task @home"))  # pylint: disable=no-member
         self.assertEqual("", invalid_arguments(self.namespace, self.tasks))
+
+
+class DependencyCyclesTest(unittest.TestCase):
+    """Unit tests for the dependency cycle warnings."""
+
+    def test_no_cycles(self):
+        """Test that there are no warnings if there are no cycles."""
+        self.assertEqual([], dependency_cycles(todotxt.Tasks([todotxt.Task("Todo")])))
+
+    def test_cycles(self):
+        """Test that there is a warning per cycle."""
+        cycles = [[todotxt.Task("A id:a before:b"), todotxt.Task("B id:b before:a")], [todotxt.Task("C id:c before:c")]]
+        self.assertEqual(["tasks block each other: A id:a before:b; B id:b before:a",
+                          "tasks block each other: C id:c before:c"],
+                         dependency_cycles(todotxt.Tasks(dependency_cycles=cycles)))
+
+
+class UnknownTaskIdsTest(fixtures.TestCaseWithNamespace):
+    """Unit tests for the unknown task id warnings."""
+
+    def test_no_ids(self):
+        """Test that there are no warnings if no tasks are assumed to be done."""
+        self.assertEqual([], unknown_task_ids(self.namespace, todotxt.Tasks()))
+
+    def test_unknown_ids(self):
+        """Test that the unknown ids are listed."""
+        self.namespace.assume_done = ["1", "2", "3"]
+        tasks = todotxt.unblocked_tasks([todotxt.Task("Todo id:2")])
+        self.assertEqual(["unknown task ids: 1, 3"], unknown_task_ids(self.namespace, tasks))
+
+    def test_unknown_id_without_graph(self):
+        """Test that ids are unknown if the tasks have no dependency graph."""
+        self.namespace.assume_done = ["1"]
+        self.assertEqual(["unknown task id: 1"], unknown_task_ids(self.namespace, todotxt.Tasks()))
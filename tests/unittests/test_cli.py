@@ -1,5 +1,7 @@
 """Unit tests for the command-line interface entry point."""
 
+import io
+import json
 import os
 import sys
 import unittest
@@ -13,11 +15,12 @@ from .arguments.test_parser import USAGE_MESSAGE
 
 
 @patch.object(config, "open", mock_open(read_data=""))
+@patch.dict(os.environ, {"NEXT_ACTION_NO_CACHE": "1"})  # The tests mock the todo.txt files, but not the cache
 class CLITest(unittest.TestCase):  # pylint: disable=too-many-public-methods
     """Unit tests for the command-line interface."""
 
     @patch.object(sys, "argv", ["next-action"])
-    @patch("fileinput.open", mock_open(read_data=""))
+    @patch("next_action.todotxt.open", mock_open(read_data=b""))
     @patch.object(sys.stdout, "write")
     def test_empty_task_file(self, mock_stdout_write):
         """Test the response when the task file is empty."""
@@ -25,7 +28,7 @@ class CLITest(unittest.TestCase):  # pylint: disable=too-many-public-methods
         self.assertEqual([call("Nothing to do! 😴"), call("\n")], mock_stdout_write.call_args_list)
 
     @patch.object(sys, "argv", ["next-action"])
-    @patch("fileinput.open", mock_open(read_data="Todo\n"))
+    @patch("next_action.todotxt.open", mock_open(read_data=b"Todo\n"))
     @patch.object(sys.stdout, "write")
     def test_one_task(self, mock_stdout_write):
         """Test the response when the task file has one task."""
@@ -33,7 +36,7 @@ class CLITest(unittest.TestCase):  # pylint: disable=too-many-public-methods
         self.assertEqual([call("Todo"), call("\n")], mock_stdout_write.call_args_list)
 
     @patch.object(sys, "argv", ["next-action", "@work"])
-    @patch("fileinput.open", mock_open(read_data="Todo @home\nTodo @work\n"))
+    @patch("next_action.todotxt.open", mock_open(read_data=b"Todo @home\nTodo @work\n"))
     @patch.object(sys.stdout, "write")
     def test_context(self, mock_stdout_write):
         """Test the response when the user passes a context."""
@@ -41,7 +44,7 @@ class CLITest(unittest.TestCase):  # pylint: disable=too-many-public-methods
         self.assertEqual([call("Todo @work"), call("\n")], mock_stdout_write.call_args_list)
 
     @patch.object(sys, "argv", ["next-action", "+DogHouse"])
-    @patch("fileinput.open", mock_open(read_data="Walk the dog @home\nBuy wood +DogHouse\n"))
+    @patch("next_action.todotxt.open", mock_open(read_data=b"Walk the dog @home\nBuy wood +DogHouse\n"))
     @patch.object(sys.stdout, "write")
     def test_project(self, mock_stdout_write):
         """Test the response when the user passes a project."""
@@ -49,7 +52,7 @@ class CLITest(unittest.TestCase):  # pylint: disable=too-many-public-methods
         self.assertEqual([call("Buy wood +DogHouse"), call("\n")], mock_stdout_write.call_args_list)
 
     @patch.object(sys, "argv", ["next-action"])
-    @patch("fileinput.open")
+    @patch("next_action.todotxt.open")
     @patch.object(sys.stderr, "write")
     def test_missing_file(self, mock_stderr_write, mock_file_open):
         """Test the response when the task file can't be found."""
@@ -66,9 +69,10 @@ class CLITest(unittest.TestCase):  # pylint: disable=too-many-public-methods
         os.environ['COLUMNS'] = "110"  # Fake that the terminal is wide enough.
         self.assertRaises(SystemExit, next_action)
         self.assertEqual(call("""\
-Usage: next-action [-h] [-V] [-c [<config.cfg>] | -w] [-f <todo.txt> ...] [-b] [-g [<group>]] [-l] [-r <ref>]
-[-s [<style>]] [-a | -n <number>] [-d [<due date>] | -o] [-p [<priority>]] [-u] [--] [<context|project>
-...]
+Usage: next-action [-h] [-V] [-c [<config.cfg>] | -w] [-f <todo.txt> ...] [--assume-done <id> ...] [-b]
+[--depth <depth>] [-g [<group>]] [-l] [-r <ref>] [-s [<style>]] [--output <format>] [--stats] [-a | -n
+<number>] [--rank <rank>] [--per-group] [-d [<due date>] | -o] [-p [<priority>]] [-u] [--explain] [--]
+[<context|project> ...]
 
 Show the next action in your todo.txt. The next action is selected from the tasks in the todo.txt file based
 on task properties such as priority, due date, and creation date. Limit the tasks from which the next action
@@ -89,9 +93,13 @@ Input options:
   -f <todo.txt>, --file <todo.txt>
                         filename of todo.txt file to read; can be '-' to read from standard input; argument
                         can be repeated to read tasks from multiple todo.txt files (default: ~/todo.txt)
+  --assume-done <id>    assume the task with the id is done, i.e. show the next actions as they would be
+                        after completing the task; argument can be repeated to assume multiple tasks are
+                        done
 
 Output options:
   -b, --blocked         show the tasks blocked by the next action, if any (default: False)
+  --depth <depth>       maximum depth of the blocked tasks to show with --blocked (default: no maximum)
   -g [<group>], --groupby [<group>]
                         group the next actions; available groups: context, duedate, priority, project,
                         source (default: None)
@@ -107,12 +115,22 @@ Output options:
                         paraiso-light, pastie, perldoc, rainbow_dash, rrt, sas, solarized-dark, solarized-
                         light, staroffice, stata, stata-dark, stata-light, tango, trac, vim, vs, xcode,
                         zenburn (default: None)
+  --output <format>     output format; available formats: text, jsonl; jsonl shows a JSON object with the
+                        properties of the next action per line (default: text)
+  --stats               show the number of tasks per status, due date, priority, context, and project
+                        instead of the next actions (default: False)
   -u, --open-urls       open the urls in the next actions, if any (default: False)
+  --explain             show on standard error how the next actions were selected: the filters in the order
+                        they were applied and the number of tasks each filter examined (default: False)
 
 Show multiple next actions:
   -a, --all             show all next actions
   -n <number>, --number <number>
                         number of next actions to show (default: 1)
+  --rank <rank>         rank the next actions; available rankings: priority, impact; impact ranks next
+                        actions that block more tasks, directly or indirectly, first (default: priority)
+  --per-group           show the number of next actions for each group when grouping next actions (default:
+                        False)
 
 Limit the tasks from which the next actions are selected:
   -d [<due date>], --due [<due date>]
@@ -132,6 +150,86 @@ where a context or project is mistaken for an argument to an option.
 """),
                          mock_stdout_write.call_args_list[0])
 
+    @patch.object(sys, "argv", ["next-action", "--explain"])
+    @patch("next_action.todotxt.open", mock_open(read_data=b"Walk the dog @home\n(A) Buy wood +DogHouse\n"))
+    @patch.object(sys.stderr, "write")
+    @patch.object(sys.stdout, "write")
+    def test_explain(self, mock_stdout_write, mock_stderr_write):
+        """Test that the plan is written to stderr and the next action to stdout."""
+        next_action()
+        self.assertEqual([call("(A) Buy wood +DogHouse"), call("\n")], mock_stdout_write.call_args_list)
+        self.assertTrue(mock_stderr_write.call_args_list[0][0][0].startswith("Plan for 2 tasks:\n"))
+
+    @patch.object(sys, "argv", ["next-action"])
+    @patch("next_action.todotxt.open", mock_open(read_data=b"Task 1 id:1 before:2\nTask 2 id:2 before:1\nTodo\n"))
+    @patch.object(sys.stderr, "write")
+    @patch.object(sys.stdout, "write")
+    def test_dependency_cycle(self, mock_stdout_write, mock_stderr_write):
+        """Test that tasks that block each other are reported on stderr."""
+        next_action()
+        self.assertEqual([call("Todo"), call("\n")], mock_stdout_write.call_args_list)
+        self.assertEqual(
+            call("next-action: warning: tasks block each other: Task 1 id:1 before:2; Task 2 id:2 before:1"),
+            mock_stderr_write.call_args_list[0])
+
+    @patch.object(sys, "argv", ["next-action", "--assume-done", "groceries", "--assume-done", "cake"])
+    @patch("next_action.todotxt.open", mock_open(read_data=b"Buy groceries id:groceries\nCook meal after:groceries\n"))
+    @patch.object(sys.stderr, "write")
+    @patch.object(sys.stdout, "write")
+    def test_assume_done(self, mock_stdout_write, mock_stderr_write):
+        """Test that the next action is selected as if the task were done and that unknown ids are reported."""
+        next_action()
+        self.assertEqual([call("Cook meal after:groceries"), call("\n")], mock_stdout_write.call_args_list)
+        self.assertEqual(call("next-action: warning: unknown task id: cake"), mock_stderr_write.call_args_list[0])
+
+    @patch.object(sys, "argv", ["next-action"])
+    @patch("next_action.todotxt.open", mock_open(read_data=b"Todo\n"))
+    @patch.object(os, "dup2")
+    @patch.object(os, "open", return_value=42)
+    @patch.object(sys.stdout, "write", side_effect=BrokenPipeError)
+    def test_broken_pipe(self, mock_stdout_write, mock_os_open, mock_dup2):
+        """Test that Next-action stops writing and redirects standard output if the reader has stopped reading."""
+        with self.assertRaises(SystemExit) as exit_context:
+            next_action()
+        self.assertEqual(1, exit_context.exception.code)
+        mock_stdout_write.assert_called_once_with("Todo")
+        mock_dup2.assert_called_once_with(42, sys.stdout.fileno())
+        mock_os_open.assert_called_once_with(os.devnull, os.O_WRONLY)
+
+    @patch.object(sys, "argv", ["next-action", "--all"])
+    @patch("next_action.todotxt.open", mock_open(read_data=b"Todo 1\nTodo 2\nTodo 3\n"))
+    @patch.object(os, "dup2")
+    @patch.object(os, "open", return_value=42)
+    @patch.object(sys.stdout, "write", side_effect=[None, None, BrokenPipeError])
+    def test_broken_pipe_all(self, mock_stdout_write, mock_os_open, mock_dup2):
+        """Test that Next-action exits with status 1 if the reader stops reading after the first batch."""
+        with patch("next_action.output.WRITE_BATCH_SIZE", 1), self.assertRaises(SystemExit) as exit_context:
+            next_action()
+        self.assertEqual(1, exit_context.exception.code)
+        self.assertEqual([call("Todo 1"), call("\n"), call("Todo 2")], mock_stdout_write.call_args_list)
+        mock_dup2.assert_called_once_with(42, sys.stdout.fileno())
+        mock_os_open.assert_called_once_with(os.devnull, os.O_WRONLY)
+
+    @patch.object(sys, "argv", ["next-action", "--output", "jsonl", "--all"])
+    @patch("next_action.todotxt.open", mock_open(read_data=b"(A) Buy wood +DogHouse\nWalk the dog @home\n"))
+    @patch.object(sys.stdout, "write")
+    def test_json_lines(self, mock_stdout_write):
+        """Test that the next actions can be written as JSON Lines."""
+        next_action()
+        lines = mock_stdout_write.call_args_list[0][0][0].split("\n")
+        self.assertEqual(["(A) Buy wood +DogHouse", "Walk the dog @home"], [json.loads(line)["text"] for line in lines])
+        self.assertEqual(2, json.loads(lines[1])["line_number"])
+
+    @patch.object(sys, "argv", ["next-action", "--stats"])
+    @patch("next_action.todotxt.open",
+           mock_open(read_data=b"(A) Buy wood +DogHouse before:paint\nPaint @home id:paint\n"))
+    @patch.object(sys.stdout, "write")
+    def test_stats(self, mock_stdout_write):
+        """Test that the statistics include the blocked tasks."""
+        next_action()
+        self.assertTrue(mock_stdout_write.call_args_list[0][0][0].startswith(
+            "Tasks: 2\nStatus: 1 unblocked, 1 blocked\n"))
+
     @patch.object(sys, "argv", ["next-action", "--version"])
     @patch.object(sys.stdout, "write")
     def test_version(self, mock_stdout_write):
@@ -140,7 +238,8 @@ where a context or project is mistaken for an argument to an option.
         self.assertEqual([call(f"next-action {__version__}\n")], mock_stdout_write.call_args_list)
 
     @patch.object(sys, "argv", ["next-action", "--number", "2"])
-    @patch("fileinput.open", mock_open(read_data="Walk the dog @home\n(A) Buy wood +DogHouse\n(B) Call mom\n"))
+    @patch("next_action.todotxt.open",
+           mock_open(read_data=b"Walk the dog @home\n(A) Buy wood +DogHouse\n(B) Call mom\n"))
     @patch.object(sys.stdout, "write")
     def test_number(self, mock_stdout_write):
         """Test that the number of next actions can be specified."""
@@ -148,7 +247,7 @@ where a context or project is mistaken for an argument to an option.
         self.assertEqual([call("(A) Buy wood +DogHouse\n(B) Call mom"), call("\n")], mock_stdout_write.call_args_list)
 
     @patch.object(sys, "argv", ["next-action", "--number", "3"])
-    @patch("fileinput.open", mock_open(read_data="\nWalk the dog @home\n   \n(B) Call mom\n"))
+    @patch("next_action.todotxt.open", mock_open(read_data=b"\nWalk the dog @home\n   \n(B) Call mom\n"))
     @patch.object(sys.stdout, "write")
     def test_ignore_empty_lines(self, mock_stdout_write):
         """Test that empty lines in the todo.txt file are ignored."""
@@ -156,7 +255,7 @@ where a context or project is mistaken for an argument to an option.
         self.assertEqual([call("(B) Call mom\nWalk the dog @home"), call("\n")], mock_stdout_write.call_args_list)
 
     @patch.object(sys, "argv", ["next-action", "--all"])
-    @patch("fileinput.open", mock_open(read_data="\nWalk the dog @home\nBuy beer\n(B) Call mom\n"))
+    @patch("next_action.todotxt.open", mock_open(read_data=b"\nWalk the dog @home\nBuy beer\n(B) Call mom\n"))
     @patch.object(sys.stdout, "write")
     def test_show_all_actions(self, mock_stdout_write):
         """Test that all actions in the todo.txt file are shown."""
@@ -165,16 +264,15 @@ where a context or project is mistaken for an argument to an option.
                          mock_stdout_write.call_args_list)
 
     @patch.object(sys, "argv", ["next-action", "--file", "-"])
-    @patch.object(sys.stdin, "readline")
+    @patch.object(sys, "stdin", io.TextIOWrapper(io.BytesIO(b"(B) Call mom\nWalk the dog\n")))
     @patch.object(sys.stdout, "write")
-    def test_reading_stdin(self, mock_stdout_write, mock_stdin_readline):
+    def test_reading_stdin(self, mock_stdout_write):
         """Test that tasks can be read from stdin works."""
-        mock_stdin_readline.side_effect = ["(B) Call mom\n", "Walk the dog\n", StopIteration]
         next_action()
         self.assertEqual([call("(B) Call mom"), call("\n")], mock_stdout_write.call_args_list)
 
     @patch.object(sys, "argv", ["next-action", "--all", "--file", "todo.txt", "--file", "other.txt"])
-    @patch("fileinput.open", mock_open(read_data="Call mom\n"))
+    @patch("next_action.todotxt.open", mock_open(read_data=b"Call mom\n"))
     @patch.object(sys.stdout, "write")
     def test_reading_two_files(self, mock_stdout_write):
         """Test that tasks can be read from stdin works."""
@@ -183,7 +281,7 @@ where a context or project is mistaken for an argument to an option.
                          mock_stdout_write.call_args_list)
 
     @patch.object(sys, "argv", ["next-action", "--reference", "always"])
-    @patch("fileinput.open", mock_open(read_data="\nWalk the dog @home\nBuy beer\n(B) Call mom\n"))
+    @patch("next_action.todotxt.open", mock_open(read_data=b"\nWalk the dog @home\nBuy beer\n(B) Call mom\n"))
     @patch.object(sys.stdout, "write")
     def test_reference_filename(self, mock_stdout_write):
         """Test that the printed next actions reference their filename."""
@@ -193,7 +291,7 @@ where a context or project is mistaken for an argument to an option.
                           call("\n")], mock_stdout_write.call_args_list)
 
     @patch.object(sys, "argv", ["next-action", "@home"])
-    @patch("fileinput.open", mock_open(read_data="\nWalk the dog @park\n(B) Call mom\n"))
+    @patch("next_action.todotxt.open", mock_open(read_data=b"\nWalk the dog @park\n(B) Call mom\n"))
     @patch.object(sys.stdout, "write")
     def test_unknown_context(self, mock_stdout_write):
         """Test the response when the context is unknown."""
@@ -202,7 +300,7 @@ where a context or project is mistaken for an argument to an option.
                          mock_stdout_write.call_args_list)
 
     @patch.object(sys, "argv", ["next-action", "+SpringCleaning", "+AutumnCleaning"])
-    @patch("fileinput.open", mock_open(read_data="\nWalk the dog @park\n(B) Call mom\n"))
+    @patch("next_action.todotxt.open", mock_open(read_data=b"\nWalk the dog @park\n(B) Call mom\n"))
     @patch.object(sys.stdout, "write")
     def test_unknown_project(self, mock_stdout_write):
         """Test the response when the project is unknown."""
@@ -211,8 +309,16 @@ where a context or project is mistaken for an argument to an option.
             [call("Nothing to do! (warning: unknown projects: AutumnCleaning, SpringCleaning)"), call("\n")],
             mock_stdout_write.call_args_list)
 
+    @patch.object(sys, "argv", ["next-action", "@home", "--priority", "A"])
+    @patch("next_action.todotxt.open", mock_open(read_data=b"(B) Paint @home\n(A) Call mom\n"))
+    @patch.object(sys.stdout, "write")
+    def test_known_context(self, mock_stdout_write):
+        """Test that a context isn't unknown because the prefilter skipped the tasks that have it."""
+        next_action()
+        self.assertEqual([call("Nothing to do! 😴"), call("\n")], mock_stdout_write.call_args_list)
+
     @patch.object(sys, "argv", ["next-action", "--list-arguments", "@"])
-    @patch("fileinput.open", mock_open(read_data="\nWalk the dog @park\nWrite proposal +NewProject\n"))
+    @patch("next_action.todotxt.open", mock_open(read_data=b"\nWalk the dog @park\nWrite proposal +NewProject\n"))
     @patch.object(sys.stdout, "write")
     def test_list_contexts(self, mock_stdout_write):
         """Test that the contexts are listed."""
@@ -221,7 +327,7 @@ where a context or project is mistaken for an argument to an option.
             [call("@park"), call("\n")], mock_stdout_write.call_args_list)
 
     @patch.object(sys, "argv", ["next-action", "--list-arguments", "+"])
-    @patch("fileinput.open", mock_open(read_data="\nWalk the dog @park\nWrite proposal +NewProject\n"))
+    @patch("next_action.todotxt.open", mock_open(read_data=b"\nWalk the dog @park\nWrite proposal +NewProject\n"))
     @patch.object(sys.stdout, "write")
     def test_list_projects(self, mock_stdout_write):
         """Test that the projects are listed."""
@@ -230,7 +336,7 @@ where a context or project is mistaken for an argument to an option.
             [call("+NewProject"), call("\n")], mock_stdout_write.call_args_list)
 
     @patch.object(sys, "argv", ["next-action", "--list-arguments", "_@"])
-    @patch("fileinput.open", mock_open(read_data="\nWalk the dog @park\nWrite proposal +NewProject\n"))
+    @patch("next_action.todotxt.open", mock_open(read_data=b"\nWalk the dog @park\nWrite proposal +NewProject\n"))
     @patch.object(sys.stdout, "write")
     def test_list_excluded_contexts(self, mock_stdout_write):
         """Test that the excluded contexts are listed."""
@@ -239,7 +345,7 @@ where a context or project is mistaken for an argument to an option.
             [call("-@park"), call("\n")], mock_stdout_write.call_args_list)
 
     @patch.object(sys, "argv", ["next-action", "--list-arguments", "_+"])
-    @patch("fileinput.open", mock_open(read_data="\nWalk the dog @park\nWrite proposal +NewProject\n"))
+    @patch("next_action.todotxt.open", mock_open(read_data=b"\nWalk the dog @park\nWrite proposal +NewProject\n"))
     @patch.object(sys.stdout, "write")
     def test_list_excluded_projects(self, mock_stdout_write):
         """Test that the excluded projects are listed."""
@@ -248,7 +354,7 @@ where a context or project is mistaken for an argument to an option.
             [call("-+NewProject"), call("\n")], mock_stdout_write.call_args_list)
 
     @patch.object(sys, "argv", ["next-action", "--list-arguments", "__priority"])
-    @patch("fileinput.open", mock_open(read_data="\nWalk the dog @park\n(A) Write proposal\n(C) Get permit"))
+    @patch("next_action.todotxt.open", mock_open(read_data=b"\nWalk the dog @park\n(A) Write proposal\n(C) Get permit"))
     @patch.object(sys.stdout, "write")
     def test_list_priorities(self, mock_stdout_write):
         """Test that the priorities are listed."""
@@ -257,7 +363,7 @@ where a context or project is mistaken for an argument to an option.
             [call("A C"), call("\n")], mock_stdout_write.call_args_list)
 
     @patch.object(sys, "argv", ["next-action", "--open-urls"])
-    @patch("fileinput.open", mock_open(read_data="Search https://google.com\n"))
+    @patch("next_action.todotxt.open", mock_open(read_data=b"Search https://google.com\n"))
     @patch.object(webbrowser, "open")
     @patch.object(sys.stdout, "write")
     def test_one_task_with_url(self, mock_stdout_write, mock_webbrowser_open):
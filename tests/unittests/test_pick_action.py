@@ -1,8 +1,12 @@
 """Unit test for the next action algorithm."""
 
 import datetime
+import random
+import sys
+from unittest.mock import patch
 
 from next_action import todotxt, pick_action
+from next_action.planner import Plan
 
 from . import fixtures
 
@@ -32,6 +36,13 @@ class PickActionTest(fixtures.TestCaseWithNamespace):
         task3 = todotxt.Task("(A) Todo 3")
         self.assertEqual([task3, task2, task1], pick_action.next_actions([task1, task2, task3], self.namespace))
 
+    def test_without_ranking_and_grouping(self):
+        """Test that the ranking and grouping arguments are optional."""
+        del self.namespace.rank, self.namespace.groupby, self.namespace.per_group
+        task1 = todotxt.Task("Todo 1")
+        task2 = todotxt.Task("(A) Todo 2")
+        self.assertEqual([task2, task1], pick_action.next_actions([task1, task2], self.namespace))
+
     def test_creation_dates(self):
         """Test that a task with an older creation date takes precedence."""
         no_creation_date = todotxt.Task("Task 1")
@@ -75,6 +86,76 @@ class PickActionTest(fixtures.TestCaseWithNamespace):
         self.assertEqual([task2, task1], pick_action.next_actions([task1, task2], self.namespace))
 
 
+class NumberOfNextActionsTest(fixtures.TestCaseWithNamespace):
+    """Test that the number of next actions can be limited without changing their order."""
+
+    def setUp(self):
+        """Set up tasks, including tasks with equal sort keys."""
+        super().setUp()
+        self.tasks = [todotxt.Task("Task 1"), todotxt.Task("(B) Task 2"), todotxt.Task("Task 3"),
+                      todotxt.Task("(A) Task 4"), todotxt.Task("(B) Task 5")]
+
+    def test_one(self):
+        """Test that the first task with the highest priority is the next action."""
+        self.namespace.number = 1
+        self.assertEqual([self.tasks[3]], pick_action.next_actions(self.tasks, self.namespace))
+
+    def test_one_without_tasks(self):
+        """Test that no tasks means no next action."""
+        self.namespace.number = 1
+        self.assertEqual([], pick_action.next_actions([], self.namespace))
+
+    def test_some(self):
+        """Test that a limited number of next actions are in the same order as all next actions."""
+        all_next_actions = pick_action.next_actions(self.tasks, self.namespace)
+        for number in range(2, len(self.tasks) + 2):
+            self.namespace.number = number
+            self.assertEqual(all_next_actions[:number], pick_action.next_actions(self.tasks, self.namespace))
+
+
+class PerGroupTest(fixtures.TestCaseWithNamespace):
+    """Unit tests for selecting the next actions per group."""
+
+    def setUp(self):
+        """Set up tasks in multiple groups and select two next actions per context."""
+        super().setUp()
+        self.namespace.number = 2
+        self.namespace.groupby = "context"
+        self.namespace.per_group = True
+        self.tasks = [todotxt.Task("Task 1 @work"), todotxt.Task("(C) Task 2 @home"), todotxt.Task("(A) Task 3 @work"),
+                      todotxt.Task("(B) Task 4 @home @work"), todotxt.Task("Task 5"), todotxt.Task("(D) Task 6 @home")]
+
+    def test_per_group(self):
+        """Test that the number of next actions applies to each group and groups are ordered by their first task."""
+        next_actions = pick_action.next_actions(self.tasks, self.namespace)
+        self.assertEqual({"work": [self.tasks[2], self.tasks[3]], "home": [self.tasks[3], self.tasks[1]],
+                          None: [self.tasks[4]]}, next_actions.groups)
+        self.assertEqual(["work", "home", None], list(next_actions.groups))
+        self.assertEqual([self.tasks[2], self.tasks[3], self.tasks[1], self.tasks[4]], next_actions)
+
+    def test_same_first_task(self):
+        """Test that groups with the same first task are ordered like the groups of that task."""
+        self.namespace.number = 1
+        self.tasks[2] = todotxt.Task("Task 3 @work")
+        self.assertEqual(["home", "work", None], list(pick_action.next_actions(self.tasks, self.namespace).groups))
+
+    def test_rank_by_impact(self):
+        """Test that the next actions per group can be ranked by impact."""
+        self.namespace.rank = "impact"
+        self.namespace.number = 1
+        tasks = todotxt.unblocked_tasks([todotxt.Task("(A) Call @phone"), todotxt.Task("Paint @home before:1"),
+                                         todotxt.Task("(A) Sand @home"), todotxt.Task("Paint door @home id:1")])
+        self.assertEqual(
+            {"phone": [tasks[0]], "home": [tasks[1]]}, pick_action.next_actions(tasks, self.namespace).groups)
+
+    def test_not_grouped(self):
+        """Test that selecting per group has no effect if the next actions are not grouped."""
+        self.namespace.groupby = None
+        next_actions = pick_action.next_actions(self.tasks, self.namespace)
+        self.assertEqual([self.tasks[2], self.tasks[3]], next_actions)
+        self.assertIsNone(next_actions.groups)
+
+
 class FilterTasksTest(fixtures.TestCaseWithNamespace):
     """Test that the tasks from which the next action is picked, can be filtered."""
 
@@ -231,3 +312,50 @@ class BlockedTasksTest(fixtures.TestCaseWithNamespace):
         blocking_task.add_blocked_task(high_prio_but_blocked)
         tasks = todotxt.Tasks([second_prio, blocking_task])
         self.assertEqual([blocking_task, second_prio], pick_action.next_actions(tasks, self.namespace))
+
+    def test_rank_by_impact(self):
+        """Test that tasks that block more tasks go first when ranking by impact, regardless of priority."""
+        self.namespace.rank = "impact"
+        tasks = [todotxt.Task("(A) Call mom"), todotxt.Task("(C) Paint before:1 before:2"),
+                 todotxt.Task("(B) Sand before:1"), todotxt.Task("Paint door id:1"), todotxt.Task("Paint wall id:2"),
+                 todotxt.Task("(B) Buy paint")]
+        self.assertEqual([tasks[1], tasks[2], tasks[0], tasks[5]],
+                         pick_action.next_actions(todotxt.unblocked_tasks(tasks), self.namespace))
+
+
+class VectorizedTest(fixtures.TestCaseWithNamespace):
+    """Unit tests for selecting the next actions with NumPy."""
+
+    def setUp(self):
+        """Set up the tasks."""
+        super().setUp()
+        self.tasks = todotxt.Tasks(fixtures.random_tasks(random.Random(0), 300))
+        self.today = datetime.date.today()
+
+    def assert_same_next_actions(self, **arguments):
+        """Assert that the next actions selected with NumPy are the next actions selected without NumPy."""
+        namespace = fixtures.namespace(**arguments)
+        with patch("next_action.todotxt.vectorized.MIN_ROWS", 1):
+            plan = Plan(self.tasks, namespace)
+            self.assertIsNotNone(plan.vectorized)
+            vectorized_next_actions = pick_action.next_actions(self.tasks, namespace, plan)
+        plan = Plan(self.tasks, namespace)
+        self.assertIsNone(plan.vectorized)
+        self.assertEqual(pick_action.next_actions(self.tasks, namespace, plan), vectorized_next_actions)
+
+    def test_default(self):
+        """Test the next actions without filters."""
+        for number in (1, 5, sys.maxsize):
+            self.assert_same_next_actions(number=number)
+
+    def test_filters(self):
+        """Test the next actions with filters."""
+        self.assert_same_next_actions(number=10, overdue=True)
+        self.assert_same_next_actions(number=10, due=self.today)
+        self.assert_same_next_actions(number=10, priority="B", contexts={"home"})
+        self.assert_same_next_actions(number=10, excluded_projects={"paper"}, due=datetime.date.max)
+
+    def test_ranking_and_grouping(self):
+        """Test the next actions when ranking by impact and per group, which NumPy leaves to the pure Python path."""
+        self.assert_same_next_actions(number=3, rank="impact")
+        self.assert_same_next_actions(number=3, groupby="context", per_group=True)
@@ -0,0 +1,167 @@
+"""Unit tests for the planner."""
+
+import datetime
+import unittest
+from unittest.mock import Mock, patch
+
+from next_action import todotxt
+from next_action.planner import all_of, Plan, popcount
+
+from . import fixtures
+
+
+class PlanTest(fixtures.TestCaseWithNamespace):
+    """Unit tests for the plan."""
+
+    def setUp(self):
+        """Set up the tasks."""
+        super().setUp()
+        self.tasks = todotxt.Tasks(
+            [todotxt.Task("(A) Todo @home +garden"), todotxt.Task("(C) Todo @work +paper due:2018-01-01"),
+             todotxt.Task("Todo @home @phone h:1"), todotxt.Task("(B) Todo +garden +paper due:2018-06-01"),
+             todotxt.Task("9999-01-01 Todo @home")])
+
+    def descriptions(self, plan):
+        """Return the descriptions of the steps of the plan."""
+        return [step.description for step in plan.steps]
+
+    def test_default_plan(self):
+        """Test that without filters, only hidden and future tasks are filtered out."""
+        plan = Plan(self.tasks, self.namespace)
+        self.assertEqual(["not hidden and not future"], self.descriptions(plan))
+        self.assertEqual(self.tasks[:2] + self.tasks[3:4], plan.execute())
+
+    def test_most_selective_step_first(self):
+        """Test that the steps are ordered by estimated number of matching tasks, with the scanned steps fused."""
+        self.namespace.contexts = {"home", "phone"}
+        self.namespace.excluded_projects = {"paper"}
+        self.namespace.priority = "B"
+        plan = Plan(self.tasks, self.namespace)
+        self.assertEqual(["@phone", "not +paper", "@home", "priority B or higher and not hidden and not future"],
+                         self.descriptions(plan))
+        self.assertEqual([], plan.execute())
+
+    def test_rows_examined(self):
+        """Test that the steps record how they were executed and how many tasks they examined."""
+        self.namespace.contexts = {"home"}
+        plan = Plan(self.tasks, self.namespace)
+        plan.execute()
+        self.assertEqual([("index", 5, 3), ("scan", 3, 1)],
+                         [(step.method, step.examined, step.remaining) for step in plan.steps])
+
+    def test_skip_steps_without_candidates(self):
+        """Test that steps are skipped when there are no candidates left."""
+        self.namespace.contexts = {"unknown"}
+        plan = Plan(self.tasks, self.namespace)
+        self.assertEqual([], plan.execute())
+        self.assertEqual(["index", "skip"], [step.method for step in plan.steps])
+
+    def test_use_cached_bitsets(self):
+        """Test that steps use the bitsets cached by the index, instead of scanning the candidates."""
+        Plan(self.tasks, self.namespace).execute()
+        self.namespace.contexts = {"home"}
+        plan = Plan(self.tasks, self.namespace)
+        self.assertEqual(["@home", "not hidden and not future"], self.descriptions(plan))
+        self.assertEqual([self.tasks[0]], plan.execute())
+        self.assertEqual(["index", "index"], [step.method for step in plan.steps])
+
+    @patch("next_action.todotxt.vectorized.MIN_ROWS", 1)
+    def test_vectorized(self):
+        """Test that the filters that would otherwise be scanned are evaluated with NumPy for all tasks at once."""
+        self.namespace.contexts = {"home"}
+        plan = Plan(self.tasks, self.namespace)
+        self.assertEqual([self.tasks[0]], plan.execute())
+        self.assertEqual(["index", "index"], [step.method for step in plan.steps])
+
+    def test_projects(self):
+        """Test that the tasks must belong to one of the projects and none of the excluded projects."""
+        self.namespace.projects = {"garden", "paper"}
+        self.namespace.excluded_contexts = {"work"}
+        plan = Plan(self.tasks, self.namespace)
+        self.assertEqual(["not @work", "+garden or +paper", "not hidden and not future"], self.descriptions(plan))
+        self.assertEqual([self.tasks[0], self.tasks[3]], plan.execute())
+
+    def test_scan_projects(self):
+        """Test that the project predicates give the same result as the project bitsets."""
+        self.namespace.projects = {"garden"}
+        self.namespace.excluded_projects = {"paper"}
+        plan = Plan(self.tasks, self.namespace)
+        for step in plan.steps[:2]:
+            self.assertEqual(step.create_bitset() & 0b11111,
+                             sum(1 << row for row in range(len(self.tasks)) if step.predicate(row)))
+
+    def test_fused_predicate(self):
+        """Test that the fused predicate of the expensive steps holds if the predicates of all steps hold."""
+        self.namespace.due = datetime.date(2018, 3, 1)
+        self.namespace.priority = "C"
+        step = Plan(self.tasks, self.namespace).steps[-1]
+        self.assertEqual(0b00010, sum(1 << row for row in range(len(self.tasks)) if step.predicate(row)))
+
+    def test_fused_bitset_in_one_pass(self):
+        """Test that the bitset of the fused step is created with one pass over the tasks."""
+        self.namespace.due = datetime.date(2018, 3, 1)
+        self.namespace.priority = "C"
+        with patch("next_action.planner.all_of", side_effect=lambda predicates: Mock(side_effect=all_of(predicates))):
+            plan = Plan(self.tasks, self.namespace)
+        self.assertEqual([self.tasks[1]], plan.execute())
+        self.assertEqual(len(self.tasks), plan.steps[-1].predicate.call_count)
+
+    def test_fused_bitset_is_cached(self):
+        """Test that the bitset of the fused step is cached, so the next plan for the same filters uses the index."""
+        self.namespace.overdue = True
+        self.namespace.priority = "C"
+        Plan(self.tasks, self.namespace).execute()
+        plan = Plan(self.tasks, self.namespace)
+        self.assertEqual([self.tasks[1], self.tasks[3]], plan.execute())
+        self.assertEqual("index", plan.steps[-1].method)
+
+    def test_due(self):
+        """Test the due date filter."""
+        self.namespace.due = datetime.date(2018, 3, 1)
+        plan = Plan(self.tasks, self.namespace)
+        self.assertEqual(["due on or before 2018-03-01 and not hidden and not future"], self.descriptions(plan))
+        self.assertEqual([self.tasks[1]], plan.execute())
+
+    def test_has_due_date(self):
+        """Test the filter on tasks with a due date."""
+        self.namespace.due = datetime.date.max
+        self.namespace.contexts = {"work"}
+        plan = Plan(self.tasks, self.namespace)
+        self.assertEqual(["@work", "has due date and not hidden and not future"], self.descriptions(plan))
+        self.assertEqual([self.tasks[1]], plan.execute())
+
+    def test_overdue(self):
+        """Test the overdue filter."""
+        self.namespace.overdue = True
+        self.namespace.contexts = {"work"}
+        self.assertEqual([self.tasks[1]], Plan(self.tasks, self.namespace).execute())
+
+    def test_plain_list(self):
+        """Test that the plan accepts a plain list of tasks."""
+        self.assertEqual(self.tasks[:1], Plan(self.tasks[:1], self.namespace).execute())
+
+
+class AllOfTest(unittest.TestCase):
+    """Unit tests for combining predicates."""
+
+    def test_all_of(self):
+        """Test that the combined predicate holds if all predicates hold."""
+        predicate = all_of([lambda task: "home" in task.contexts(), lambda task: task.priority() == "A"])
+        self.assertTrue(predicate(todotxt.Task("(A) Todo @home")))
+        self.assertFalse(predicate(todotxt.Task("(B) Todo @home")))
+        self.assertFalse(predicate(todotxt.Task("(A) Todo @work")))
+
+    def test_order(self):
+        """Test that the predicates are evaluated in order, until one doesn't hold."""
+        second = Mock(return_value=True)
+        self.assertFalse(all_of([lambda task: False, second])(todotxt.Task("Todo")))
+        second.assert_not_called()
+
+
+class PopcountTest(unittest.TestCase):
+    """Unit tests for the popcount function."""
+
+    def test_popcount(self):
+        """Test that the bits are counted."""
+        self.assertEqual(0, popcount(0))
+        self.assertEqual(3, popcount(0b10101))
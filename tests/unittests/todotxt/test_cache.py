@@ -0,0 +1,274 @@
+"""Unit tests for the parse cache."""
+
+import os
+import random
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from next_action.todotxt import read_todotxt_files, ParseCache
+from next_action.todotxt import tokenizer
+from next_action.todotxt.cache import count_lines, default_cache, default_cache_directory, parse, CACHE_VERSION, \
+    ENTRY_SUFFIX
+
+
+class ParseCacheTest(unittest.TestCase):  # pylint: disable=too-many-public-methods
+    """Unit tests for the parse cache."""
+
+    def setUp(self):
+        """Create a todo.txt file and a cache directory."""
+        self.directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.cache_directory = os.path.join(self.directory.name, "cache")
+        self.cache = ParseCache(self.cache_directory)
+        self.filename = self.write("todo.txt", "(A) Paint @home\nx Done\n\nCall mom id:call\n")
+
+    def tearDown(self):
+        """Remove the todo.txt file and the cache directory."""
+        self.directory.cleanup()
+
+    def write(self, filename: str, content: str) -> str:
+        """Write the content to the file and return its path."""
+        path = os.path.join(self.directory.name, filename)
+        with open(path, "w", encoding="utf-8") as todotxt_file:
+            todotxt_file.write(content)
+        return path
+
+    def entries(self):
+        """Return the cache entries."""
+        return [filename for filename in os.listdir(self.cache_directory) if filename.endswith(ENTRY_SUFFIX)]
+
+    def test_parse(self):
+        """Test that the uncompleted tasks are parsed, with their line number."""
+        parsed = self.cache.read(self.filename)
+        self.assertEqual(4, parsed.line_count)
+        self.assertEqual([1, 4], parsed.line_numbers)
+        self.assertEqual(["(A) Paint @home", "Call mom id:call"], parsed.texts)
+        self.assertEqual(["A", None], [tokens.priority for tokens in parsed.tokens])
+        self.assertEqual(1, len(self.entries()))
+
+    def test_undecodable_filename(self):
+        """Test that files with names that aren't valid UTF-8 are cached too."""
+        filename = self.write(os.fsdecode(b"todo\xff.txt"), "Paint @home\n")
+        self.assertEqual(["Paint @home"], self.cache.read(filename).texts)
+        self.assertEqual(1, len(self.entries()))
+
+    def test_hit(self):
+        """Test that an unchanged file isn't parsed again."""
+        expected = self.cache.read(self.filename)
+        with patch("next_action.todotxt.cache.tokenize") as tokenize:
+            self.assertEqual(expected, ParseCache(self.cache_directory).read(self.filename))
+        tokenize.assert_not_called()
+
+    def test_changed_file(self):
+        """Test that a changed file is parsed again."""
+        self.cache.read(self.filename)
+        self.write("todo.txt", "Walk the dog\n")
+        self.assertEqual(["Walk the dog"], self.cache.read(self.filename).texts)
+
+    def test_touched_file(self):
+        """Test that a file with a different modification time, but the same content, isn't parsed again."""
+        expected = self.cache.read(self.filename)
+        os.utime(self.filename, ns=(0, 0))
+        with patch("next_action.todotxt.cache.tokenize") as tokenize:
+            self.assertEqual(expected, self.cache.read(self.filename))
+        tokenize.assert_not_called()
+
+    def test_appended_file(self):
+        """Test that only the appended lines of a file are parsed."""
+        self.cache.read(self.filename)
+        with open(self.filename, "a", encoding="utf-8") as todotxt_file:
+            todotxt_file.write("Walk the dog\n")
+        with patch("next_action.todotxt.cache.tokenize", wraps=tokenizer.tokenize) as tokenize_spy:
+            parsed = self.cache.read(self.filename)
+        tokenize_spy.assert_called_once_with("Walk the dog")
+        self.assertEqual([1, 4, 5], parsed.line_numbers)
+
+    @patch("next_action.todotxt.cache.BLOCK_SIZE", 8)
+    def test_edited_file(self):
+        """Test that only the changed lines of a file are parsed and that the lines after them are renumbered."""
+        lines = [f"Task {index} @home" for index in range(20)]
+        filename = self.write("edited.txt", "\n".join(lines))
+        self.cache.read(filename)
+        lines[10:11] = ["(A) Inserted", "x Completed", "Changed"]
+        self.write("edited.txt", "\n".join(lines))
+        with patch("next_action.todotxt.cache.tokenize", wraps=tokenizer.tokenize) as tokenize_spy:
+            parsed = self.cache.read(filename)
+        self.assertLess(tokenize_spy.call_count, 5)
+        self.assertEqual(parse("\n".join(lines).encode()), parsed)
+
+    @patch("next_action.todotxt.cache.BLOCK_SIZE", 4)
+    def test_random_edits(self):
+        """Test that reading a file after random edits gives the same tasks as parsing the file."""
+        texts = ["(A) Paint", "x Done", "", "Buy wood id:1", "Call mom\r", "Walk the dog\r\n", "Mow @home"]
+        random_generator = random.Random(0)
+        lines = []
+        for nanoseconds in range(200):
+            index = random_generator.randrange(len(lines) + 1)
+            lines[index:index + random_generator.randrange(2)] = [random_generator.choice(texts)]
+            content = "\n".join(lines) + random_generator.choice(["", "\n"])
+            os.utime(self.write("todo.txt", content), ns=(nanoseconds, nanoseconds))
+            self.assertEqual(parse(content.encode()), self.cache.read(self.filename))
+
+    def test_malformed_characters(self):
+        """Test that malformed characters are replaced like they are without cache."""
+        with open(self.filename, "wb") as todotxt_file:
+            todotxt_file.write(b"Paint \xff @home\n")
+        self.assertEqual(["Paint \ufffd @home"], self.cache.read(self.filename).texts)
+
+    def test_empty_file(self):
+        """Test that an empty file can be cached."""
+        filename = self.write("empty.txt", "")
+        self.cache.read(filename)
+        self.assertEqual((0, [], [], [], []), self.cache.read(filename))
+
+    def test_corrupt_entry(self):
+        """Test that a corrupt entry is a cache miss."""
+        self.cache.read(self.filename)
+        with open(os.path.join(self.cache_directory, self.entries()[0]), "wb") as entry_file:
+            entry_file.write(b"corrupt")
+        self.assertEqual(["(A) Paint @home", "Call mom id:call"], self.cache.read(self.filename).texts)
+
+    def test_incompatible_entry(self):
+        """Test that an entry written by another version of the cache is a cache miss."""
+        self.cache.read(self.filename)
+        with patch("next_action.todotxt.cache.CACHE_VERSION", CACHE_VERSION + 1), \
+                patch("next_action.todotxt.cache.tokenize") as tokenize:
+            self.cache.read(self.filename)
+        tokenize.assert_called()
+
+    def test_uncacheable_files(self):
+        """Test that missing files and files that aren't regular files, such as directories, aren't cached."""
+        self.assertIsNone(self.cache.read(os.path.join(self.directory.name, "missing.txt")))
+        self.assertIsNone(self.cache.read(self.directory.name))
+
+    def test_unwritable_cache_directory(self):
+        """Test that the file is parsed if the cache directory can't be created."""
+        cache = ParseCache(os.path.join(self.filename, "cache"))
+        self.assertEqual(["(A) Paint @home", "Call mom id:call"], cache.read(self.filename).texts)
+
+    def test_cache_directory_writable_by_others(self):
+        """Test that a cache directory that others can write to isn't used."""
+        os.makedirs(self.cache_directory, mode=0o700)
+        os.chmod(self.cache_directory, 0o777)  # nosec: the directory is a temporary directory
+        self.assertIsNone(self.cache.read(self.filename))
+        self.assertEqual([], self.entries())
+
+    def test_cache_directory_owned_by_other_user(self):
+        """Test that a cache directory owned by another user isn't used."""
+        self.cache.read(self.filename)
+        with patch("os.getuid", return_value=os.getuid() + 1):
+            self.assertIsNone(self.cache.read(self.filename))
+
+    def test_inaccessible_cache_directory(self):
+        """Test that the cache isn't used if the cache directory can't be inspected."""
+        with patch("os.lstat", side_effect=PermissionError):
+            self.assertIsNone(self.cache.read(self.filename))
+
+    def test_entry_writable_by_others(self):
+        """Test that an entry that others can write to is a cache miss."""
+        self.cache.read(self.filename)
+        os.chmod(os.path.join(self.cache_directory, self.entries()[0]), 0o666)  # nosec: the entry is temporary
+        with patch("next_action.todotxt.cache.pickle.load") as load, \
+                patch("next_action.todotxt.cache.tokenize", wraps=tokenizer.tokenize) as tokenize_spy:
+            self.cache.read(self.filename)
+        load.assert_not_called()
+        tokenize_spy.assert_called()
+
+    def test_symbolic_link_entry(self):
+        """Test that an entry that is a symbolic link is a cache miss."""
+        self.cache.read(self.filename)
+        entry_path = os.path.join(self.cache_directory, self.entries()[0])
+        os.replace(entry_path, entry_path + ".target")
+        os.symlink(entry_path + ".target", entry_path)
+        with patch("next_action.todotxt.cache.tokenize", wraps=tokenizer.tokenize) as tokenize_spy:
+            self.cache.read(self.filename)
+        tokenize_spy.assert_called()
+
+    def test_failing_rename(self):
+        """Test that the temporary file is removed if it can't be renamed."""
+        with patch("os.replace", side_effect=OSError):
+            self.cache.read(self.filename)
+        self.assertEqual([], os.listdir(self.cache_directory))
+
+    def test_evicted_entry(self):
+        """Test that an entry evicted by another process while being read is still used."""
+        self.cache.read(self.filename)
+        with patch("os.utime", side_effect=OSError):
+            self.assertEqual([1, 4], self.cache.read(self.filename).line_numbers)
+
+    def test_eviction(self):
+        """Test that the least recently used entries are evicted if the cache is too large."""
+        self.cache.read(self.filename)
+        entry = self.entries()[0]
+        size = os.path.getsize(os.path.join(self.cache_directory, entry))
+        os.utime(os.path.join(self.cache_directory, entry), (0, 0))
+        ParseCache(self.cache_directory, max_size=size).read(self.write("other.txt", "Walk the dog\n"))
+        self.assertNotIn(entry, self.entries())
+        self.assertEqual(1, len(self.entries()))
+
+    def test_concurrent_eviction(self):
+        """Test that entries evicted by another process while evicting, and temporary files, are skipped."""
+        os.makedirs(self.cache_directory, mode=0o700)
+        os.symlink(os.path.join(self.directory.name, "missing"), os.path.join(self.cache_directory, "x.pickle"))
+        with open(os.path.join(self.cache_directory, "y.tmp"), "w", encoding="utf-8"):
+            pass
+        with patch("os.remove", side_effect=OSError):
+            ParseCache(self.cache_directory, max_size=0).read(self.filename)
+        self.assertEqual(3, len(os.listdir(self.cache_directory)))
+
+    def test_read_todotxt_files(self):
+        """Test that line numbers continue counting over cached and uncached files."""
+        other = self.write("other.txt", "Walk the dog\n")
+        self.cache.read(self.filename)
+        tasks = read_todotxt_files([self.filename, other, self.filename], self.cache)
+        self.assertEqual([(self.filename, 1), (self.filename, 4), (other, 5), (self.filename, 6), (self.filename, 9)],
+                         sorted(((task.filename, task.line_number) for task in tasks), key=lambda task: task[1]))
+
+    def test_read_todotxt_files_without_cache(self):
+        """Test that line numbers are the same without cache."""
+        other = self.write("other.txt", "Walk the dog\n")
+        self.assertEqual(
+            [task.line_number for task in read_todotxt_files([self.filename, other], self.cache)],
+            [task.line_number for task in read_todotxt_files([self.filename, other])])
+
+
+class CountLinesTest(unittest.TestCase):
+    """Unit tests for counting lines."""
+
+    def test_line_endings(self):
+        """Test that lines can end with a carriage return, a line feed, or both."""
+        content = b"Paint\rCall mom\r\nWalk the dog\nMow"
+        self.assertEqual(len(content.splitlines()), count_lines(content, 0, len(content)))
+
+    def test_part(self):
+        """Test that the lines in a part of the content can be counted."""
+        self.assertEqual(1, count_lines(b"Paint\nCall mom\n", 6, 15))
+        self.assertEqual(0, count_lines(b"Paint\n", 6, 6))
+
+
+class DefaultCacheDirectoryTest(unittest.TestCase):
+    """Unit tests for the default cache directory."""
+
+    @patch.dict(os.environ, {"XDG_CACHE_HOME": "/cache"})
+    def test_xdg_cache_home(self):
+        """Test that the cache directory is in the XDG cache home, if set."""
+        self.assertEqual("/cache/next-action", default_cache_directory())
+
+    @patch.dict(os.environ, {"XDG_CACHE_HOME": ""})
+    def test_default(self):
+        """Test that the cache directory is in ~/.cache by default."""
+        self.assertEqual(os.path.expanduser("~/.cache/next-action"), default_cache_directory())
+
+
+class DefaultCacheTest(unittest.TestCase):
+    """Unit tests for the default cache."""
+
+    @patch.dict(os.environ, {"NEXT_ACTION_NO_CACHE": ""})
+    def test_default(self):
+        """Test that the cache is used by default."""
+        self.assertIsInstance(default_cache(), ParseCache)
+
+    @patch.dict(os.environ, {"NEXT_ACTION_NO_CACHE": "1"})
+    def test_disabled(self):
+        """Test that the cache can be disabled with an environment variable."""
+        self.assertIsNone(default_cache())
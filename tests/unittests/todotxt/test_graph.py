@@ -0,0 +1,247 @@
+"""Unit tests for the dependency graph."""
+
+import datetime
+import random
+import sys
+import unittest
+
+from next_action.todotxt import unblock_counts, DependencyGraph, Task, TaskGraph, unblocked_tasks
+
+
+class DependencyGraphTest(unittest.TestCase):
+    """Unit tests for the dependency graph."""
+
+    def test_edges(self):
+        """Test that the edges go from each task to the tasks it blocks."""
+        graph = TaskGraph(
+            [Task("Blocked id:1"), Task("Blocking before:1 before:2"), Task("Blocked too id:2 after:3"),
+             Task("Blocking too id:3")])
+        self.assertEqual({1: [0, 2], 3: [2]}, {node: sorted(nodes) for node, nodes in graph.edges.items()})
+
+    def test_unknown_ids(self):
+        """Test that references to unknown task ids are ignored."""
+        self.assertEqual({}, TaskGraph([Task("Todo before:1 after:2")]).edges)
+
+    def test_components_in_reverse_topological_order(self):
+        """Test that each component comes after the components of the nodes it blocks."""
+        graph = DependencyGraph({0: [1], 1: [2, 3], 3: [2]})
+        self.assertEqual([[2], [3], [1], [0]], graph.components)
+
+    def test_no_cycles(self):
+        """Test that a graph without cycles has no cycles."""
+        self.assertEqual([], DependencyGraph({0: [1], 2: [1]}).cycles())
+
+    def test_cycles(self):
+        """Test that cycles, including nodes that block themselves, are found."""
+        graph = DependencyGraph({0: [1], 1: [2], 2: [0, 3], 3: [4], 4: [3], 5: [5], 6: [0]})
+        self.assertEqual([[0, 1, 2], [3, 4], [5]], graph.cycles())
+
+    def test_inherit(self):
+        """Test that nodes inherit the lowest value of the nodes they block, directly or indirectly."""
+        values = {0: 5, 1: None, 2: 3, 3: 1, 4: None}
+        graph = DependencyGraph({0: [1], 1: [2], 3: [4]})
+        self.assertEqual({0: 3, 1: 3, 2: 3, 3: 1, 4: None}, graph.inherit(values.get))
+
+    def test_inherit_in_cycle(self):
+        """Test that nodes in a cycle get the same value."""
+        values = {0: 5, 1: 4, 2: 9, 3: 2}
+        graph = DependencyGraph({0: [1], 1: [2], 2: [0, 3]})
+        self.assertEqual({0: 2, 1: 2, 2: 2, 3: 2}, graph.inherit(values.get))
+
+    def test_blockers(self):
+        """Test the nodes that block each node, directly and indirectly."""
+        graph = DependencyGraph({0: [1], 1: [2], 3: [2], 4: [5]})
+        self.assertEqual({1: [0], 2: [1, 3], 5: [4]}, graph.blockers())
+        self.assertEqual({0, 1, 3}, graph.blocking([2]))
+        self.assertEqual(set(), graph.blocking([0]))
+
+    def test_reachable_counts(self):
+        """Test that nodes reachable via multiple paths are counted once."""
+        graph = DependencyGraph({0: [1, 2], 1: [3], 2: [3], 3: [4], 5: [6]})
+        self.assertEqual({0: 4, 1: 2, 2: 2, 3: 1, 4: 0, 5: 1, 6: 0}, graph.reachable_counts())
+
+    def test_reachable_counts_of_random_graphs(self):
+        """Test that the reachable counts are the numbers of nodes found by searching the graph from each node."""
+        rng = random.Random(0)
+        for _ in range(50):
+            edges = {node: rng.sample(range(30), rng.randrange(4)) for node in range(30)}
+            graph = DependencyGraph(edges)
+            for node, count in graph.reachable_counts().items():
+                reached, stack = set(), [node]
+                while stack:
+                    for blocked_node in edges.get(stack.pop(), []):
+                        if blocked_node not in reached:
+                            reached.add(blocked_node)
+                            stack.append(blocked_node)
+                self.assertEqual(len(reached - {node}), count)
+
+    def test_reachable_counts_in_cycle(self):
+        """Test that nodes in a cycle count the other nodes in the cycle, but not themselves."""
+        graph = DependencyGraph({0: [1], 1: [2], 2: [0, 3], 4: [4]})
+        self.assertEqual({0: 3, 1: 3, 2: 3, 3: 0, 4: 0}, graph.reachable_counts())
+
+    def test_long_chain(self):
+        """Test that a chain of tasks that is longer than the recursion limit can be handled."""
+        length = sys.getrecursionlimit() * 2
+        graph = DependencyGraph({node: [node + 1] for node in range(length)})
+        self.assertEqual(length + 1, len(graph.components))
+        self.assertEqual(length, graph.inherit(lambda node: node if node == length else None)[0])
+        self.assertEqual(length, graph.reachable_counts()[0])
+
+
+class UnblockCountsTest(unittest.TestCase):
+    """Unit tests for counting the tasks that tasks block."""
+
+    def test_counts(self):
+        """Test that the tasks blocked directly and indirectly are counted, including tasks that are not passed."""
+        tasks = [Task("Lather before:rinse"), Task("Wash before:rinse"), Task("Rinse id:rinse before:repeat"),
+                 Task("Repeat id:repeat"), Task("Dry")]
+        unblocked = unblocked_tasks(tasks)
+        self.assertEqual({tasks[0]: 2, tasks[1]: 2, tasks[4]: 0, tasks[2]: 1, tasks[3]: 0}, unblock_counts(unblocked))
+
+    def test_duplicates(self):
+        """Test that tasks passed more than once are counted once."""
+        tasks = [Task("Lather before:rinse"), Task("Rinse id:rinse")]
+        unblocked_tasks(tasks)
+        self.assertEqual({tasks[0]: 1, tasks[1]: 0}, unblock_counts([tasks[0], tasks[0]]))
+
+
+class UnblockedTasksTest(unittest.TestCase):
+    """Unit tests for the unblocked tasks function."""
+
+    def test_inherited_priority_and_due_date(self):
+        """Test that tasks inherit the priority and due date of the tasks they block."""
+        tasks = [Task("(C) Blocking before:1"), Task("(A) Blocked due:2018-01-01 id:1 before:2"),
+                 Task("Also blocked id:2 due:2017-01-01")]
+        self.assertEqual([tasks[0]], unblocked_tasks(tasks))
+        self.assertEqual("A", tasks[0].priority())
+        self.assertEqual(datetime.date(2017, 1, 1), tasks[0].due_date())
+        self.assertEqual([tasks[1]], tasks[0].blocked_tasks())
+
+    def test_cycle(self):
+        """Test that tasks that block each other are blocked and returned as dependency cycle."""
+        tasks = [Task("(B) Task 1 id:1 before:2"), Task("Task 2 id:2 before:1 due:2018-01-01"), Task("Task 3 before:1")]
+        unblocked = unblocked_tasks(tasks)
+        self.assertEqual([tasks[2]], unblocked)
+        self.assertEqual([tasks[:2]], unblocked.dependency_cycles)
+        self.assertEqual(("B", datetime.date(2018, 1, 1)), (tasks[2].priority(), tasks[2].due_date()))
+
+    def test_long_chain(self):
+        """Test that the first task of a chain longer than the recursion limit inherits from the last task."""
+        length = sys.getrecursionlimit() * 2
+        tasks = [Task(f"Task {index} id:{index} before:{index + 1}") for index in range(length)]
+        tasks.append(Task(f"(A) Last id:{length}"))
+        self.assertEqual([tasks[0]], unblocked_tasks(tasks))
+        self.assertEqual("A", tasks[0].priority())
+
+
+class AssumeDoneTest(unittest.TestCase):
+    """Unit tests for what-if queries that assume tasks are done."""
+
+    def setUp(self):
+        """Set up the tasks: buying groceries blocks cooking, which blocks doing the dishes, due before a party."""
+        self.tasks = [Task("Buy groceries before:cook"), Task("(B) Cook meal id:cook before:dishes"),
+                      Task("(A) Do the dishes id:dishes due:2018-07-01"), Task("(C) Invite friends")]
+        self.graph = TaskGraph(self.tasks)
+        self.unblocked = self.graph.link()
+
+    def texts(self, tasks):
+        """Return the texts of the tasks."""
+        return [task.text for task in tasks]
+
+    def test_nothing_done(self):
+        """Test that the unblocked tasks don't change if no tasks are done."""
+        self.assertEqual(self.unblocked, self.graph.assume_done([]))
+        self.assertIs(self.graph, self.graph.assume_done([]).dependency_graph)
+
+    def test_unknown_id(self):
+        """Test that unknown ids are ignored."""
+        self.assertEqual(self.unblocked, self.graph.assume_done(["unknown"]))
+
+    def test_unblock(self):
+        """Test that tasks blocked by the done tasks only become unblocked."""
+        tasks = self.graph.assume_done(["cook"])
+        self.assertEqual(["Buy groceries before:cook", "(A) Do the dishes id:dishes due:2018-07-01",
+                          "(C) Invite friends"], self.texts(tasks))
+        self.assertFalse(tasks[0].blocked_tasks())
+        self.assertEqual((None, None), (tasks[0].priority(), tasks[0].due_date()))
+        self.assertFalse(tasks[1].is_blocked())
+
+    def test_inherited_values(self):
+        """Test that the tasks that block the done tasks no longer inherit their priority and due date."""
+        tasks = self.graph.assume_done(["dishes"])
+        self.assertEqual(["Buy groceries before:cook", "(C) Invite friends"], self.texts(tasks))
+        self.assertEqual(("B", None), (tasks[0].priority(), tasks[0].due_date()))
+        self.assertEqual(["(B) Cook meal id:cook before:dishes"], self.texts(tasks[0].blocked_tasks()))
+        self.assertFalse(tasks[0].blocked_tasks()[0].blocked_tasks())
+
+    def test_linked_tasks_unchanged(self):
+        """Test that the linked tasks are not changed by what-if queries."""
+        self.graph.assume_done(["cook", "dishes"])
+        self.assertEqual(("A", datetime.date(2018, 7, 1)), (self.tasks[0].priority(), self.tasks[0].due_date()))
+        self.assertEqual([self.tasks[1]], self.tasks[0].blocked_tasks())
+        self.assertTrue(self.tasks[2].is_blocked())
+
+    def test_unaffected_tasks_are_shared(self):
+        """Test that tasks that are not affected by the done tasks are not copied."""
+        self.assertIs(self.tasks[3], self.graph.assume_done(["dishes"])[-1])
+
+    def test_other_blocker(self):
+        """Test that a task blocked by a done task and a task that is not done stays blocked."""
+        tasks = [Task("Task 1 before:3"), Task("Task 2 id:2 before:3"), Task("Task 3 id:3")]
+        graph = TaskGraph(tasks)
+        graph.link()
+        self.assertEqual(["Task 1 before:3"], self.texts(graph.assume_done(["2"])))
+
+    def test_break_cycle(self):
+        """Test that tasks in a cycle with a done task are no longer a dependency cycle."""
+        tasks = [Task("Task 1 id:1 before:2"), Task("Task 2 id:2 before:1"), Task("Task 3 id:3 before:3")]
+        graph = TaskGraph(tasks)
+        self.assertEqual(2, len(graph.link().dependency_cycles))
+        unblocked = graph.assume_done(["1"])
+        self.assertEqual(["Task 2 id:2 before:1"], self.texts(unblocked))
+        self.assertEqual([["Task 3 id:3 before:3"]], [self.texts(cycle) for cycle in unblocked.dependency_cycles])
+
+    def test_remaining_cycle(self):
+        """Test that a cycle that doesn't include the done task remains a cycle."""
+        tasks = [Task("Task 1 id:1 before:2"), Task("Task 2 id:2 before:1 before:3"), Task("Task 3 id:3")]
+        graph = TaskGraph(tasks)
+        graph.link()
+        unblocked = graph.assume_done(["3"])
+        self.assertEqual([], unblocked)
+        self.assertEqual([["Task 1 id:1 before:2", "Task 2 id:2 before:1 before:3"]],
+                         [self.texts(cycle) for cycle in unblocked.dependency_cycles])
+
+    def test_cycle_blocked_by_done_task(self):
+        """Test that a cycle blocked by the done task, but not including it, remains a cycle."""
+        tasks = [Task("A id:a before:b"), Task("B id:b before:a"), Task("D id:d before:a")]
+        graph = TaskGraph(tasks)
+        graph.link()
+        unblocked = graph.assume_done(["d"])
+        self.assertEqual([], unblocked)
+        self.assertEqual([["A id:a before:b", "B id:b before:a"]],
+                         [self.texts(cycle) for cycle in unblocked.dependency_cycles])
+
+    def test_smaller_cycle_remains(self):
+        """Test that the tasks of a cycle with a done task that still block each other remain a cycle."""
+        tasks = [Task("A id:a before:b"), Task("B id:b before:a before:c"), Task("C id:c before:a")]
+        graph = TaskGraph(tasks)
+        self.assertEqual([tasks], graph.link().dependency_cycles)
+        self.assertEqual([["A id:a before:b", "B id:b before:a before:c"]],
+                         [self.texts(cycle) for cycle in graph.assume_done(["c"]).dependency_cycles])
+
+    def test_same_as_relinking(self):
+        """Test that assuming tasks are done gives the same tasks as linking the tasks that are not done."""
+        rng = random.Random(0)
+        texts = [f"({rng.choice('ABC')}) Task {index} id:{index} due:2018-01-{rng.randint(10, 28)} " +
+                 " ".join(f"before:{rng.randrange(50)}" for _ in range(rng.randrange(3))) for index in range(50)]
+        graph = TaskGraph([Task(text) for text in texts])
+        graph.link()
+        for done in ([0], [1, 2], rng.sample(range(50), 5), rng.sample(range(50), 10)):
+            expected = unblocked_tasks([Task(text) for index, text in enumerate(texts) if index not in done])
+            actual = graph.assume_done([str(index) for index in done])
+            self.assertEqual(self.texts(expected), self.texts(actual))
+            self.assertEqual([(task.priority(), task.due_date()) for task in expected],
+                             [(task.priority(), task.due_date()) for task in actual])
+            self.assertEqual([self.texts(cycle) for cycle in expected.dependency_cycles],
+                             [self.texts(cycle) for cycle in actual.dependency_cycles])
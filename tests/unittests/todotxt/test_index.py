@@ -0,0 +1,102 @@
+"""Unit tests for the task index."""
+
+import datetime
+import unittest
+
+from next_action.todotxt import Task, TaskTable
+from next_action.todotxt.index import bitset, positions, TaskIndex
+
+
+class BitsetTest(unittest.TestCase):
+    """Unit tests for the bitset functions."""
+
+    def test_empty_bitset(self):
+        """Test the empty bitset."""
+        self.assertEqual(0, bitset([], 10))
+        self.assertEqual([], positions(0))
+
+    def test_bitset(self):
+        """Test that the positions are set."""
+        self.assertEqual(0b1000000101, bitset([0, 2, 9], 10))
+
+    def test_positions(self):
+        """Test that the positions of a bitset are the positions it was created with."""
+        self.assertEqual([0, 2, 9, 17, 63, 64, 1000], positions(bitset([0, 2, 9, 17, 63, 64, 1000], 1001)))
+
+
+class TaskIndexTest(unittest.TestCase):
+    """Unit tests for the task index."""
+
+    def setUp(self):
+        """Set up the index."""
+        self.today = datetime.date.today()
+        self.table = TaskTable([Task("(A) Todo @home +garden"), Task("(C) Todo @work +paper due:2018-01-01"),
+                                Task("Todo @home @phone h:1"), Task("(B) Todo +garden +paper"),
+                                Task("9999-01-01 Todo")])
+        self.index = TaskIndex(self.table)
+        self.is_hidden = self.table.hidden.__getitem__
+
+    def test_all_tasks(self):
+        """Test the bitset of all tasks."""
+        self.assertEqual(0b11111, self.index.all_tasks())
+
+    def test_context(self):
+        """Test the bitset of a context."""
+        self.assertEqual(0b00101, self.index.context("home"))
+        self.assertEqual(0, self.index.context("unknown"))
+
+    def test_project(self):
+        """Test the bitset of a project."""
+        self.assertEqual(0b01001, self.index.project("garden"))
+
+    def test_where(self):
+        """Test the bitset of the rows for which a predicate holds."""
+        self.assertEqual(0b00100, self.index.where(("hidden",), self.is_hidden))
+        self.assertEqual(0b10000, self.index.where(("future",), lambda row: self.table.creation_dates[row] > 0))
+
+    def test_cached(self):
+        """Test that bitsets are cached."""
+        self.assertIs(self.index.context("home"), self.index.context("home"))
+        self.assertEqual(0b00100, self.index.where(("hidden",), self.is_hidden))
+        self.assertEqual(0b00100, self.index.where(("hidden",), lambda row: False))
+
+    def test_has_bitset(self):
+        """Test that the index tells whether a bitset has been created."""
+        self.assertFalse(self.index.has_bitset(("hidden",)))
+        self.index.where(("hidden",), self.is_hidden)
+        self.assertTrue(self.index.has_bitset(("hidden",)))
+
+
+class TaskIndexStatisticsTest(unittest.TestCase):
+    """Unit tests for the statistics of the task index."""
+
+    def setUp(self):
+        """Set up the index."""
+        self.index = TaskIndex(TaskTable([
+            Task("(A) Todo @home +garden h:1"), Task("(C) 2018-01-01 Todo @home due:2018-01-01"),
+            Task("(B) Todo t:2018-06-01 due:2018-06-01"), Task("9999-01-01 Todo t:2000-01-01")]))
+
+    def test_context_and_project_counts(self):
+        """Test the number of tasks with a context or project."""
+        self.assertEqual(2, self.index.context_count("home"))
+        self.assertEqual(1, self.index.project_count("garden"))
+        self.assertEqual(0, self.index.project_count("unknown"))
+
+    def test_hidden_count(self):
+        """Test the number of hidden tasks."""
+        self.assertEqual(1, self.index.hidden_count())
+
+    def test_future_count(self):
+        """Test that the creation date takes precedence over the threshold date."""
+        self.assertEqual(2, self.index.future_count(datetime.date(2018, 3, 1)))
+        self.assertEqual(1, self.index.future_count(datetime.date(2018, 6, 1)))
+
+    def test_due_counts(self):
+        """Test the number of tasks due on or before a date and the number of overdue tasks."""
+        self.assertEqual(1, self.index.due_count(datetime.date(2018, 1, 1)))
+        self.assertEqual(0, self.index.overdue_count(datetime.date(2018, 1, 1)))
+        self.assertEqual(2, self.index.overdue_count(datetime.date(2018, 6, 2)))
+
+    def test_priority_count(self):
+        """Test the number of tasks with at least a priority."""
+        self.assertEqual(2, self.index.priority_count("B"))
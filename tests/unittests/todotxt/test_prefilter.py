@@ -0,0 +1,102 @@
+"""Unit tests for the prefilter."""
+
+import datetime
+import os
+import tempfile
+
+from next_action.todotxt import read_todotxt_files, ParseCache, Prefilter
+from next_action.todotxt.tokenizer import tokenize
+
+from .. import fixtures
+
+
+class PrefilterTest(fixtures.TestCaseWithNamespace):
+    """Unit tests for the prefilter."""
+
+    def select(self, *texts: str):
+        """Return the texts selected by the prefilter for the namespace."""
+        return [texts[index] for index in Prefilter(self.namespace).select(texts, [None] * len(texts))]
+
+    def test_no_filters(self):
+        """Test that the prefilter doesn't reject lines without filters."""
+        self.assertFalse(Prefilter(self.namespace))
+
+    def test_contexts(self):
+        """Test that lines without all contexts are rejected."""
+        self.namespace.contexts = {"home", "phone"}
+        self.assertEqual(["Call mom @phone @home"], self.select("Call mom @phone @home", "Paint @home", "Mow"))
+
+    def test_projects(self):
+        """Test that lines without any of the projects are rejected."""
+        self.namespace.projects = {"garden", "house"}
+        self.assertEqual(["Mow +garden", "Paint +house"], self.select("Mow +garden", "Paint +house", "Call mom"))
+
+    def test_due_date(self):
+        """Test that lines without due date are rejected if the next actions must have a due date."""
+        self.namespace.due = datetime.date.max
+        self.assertEqual(["Pay taxes due:2018-05-01"], self.select("Pay taxes due:2018-05-01", "Mow"))
+
+    def test_overdue(self):
+        """Test that lines without due date are rejected if the next actions must be overdue."""
+        self.namespace.overdue = True
+        self.assertEqual(["Pay taxes due:2018-05-01"], self.select("Pay taxes due:2018-05-01", "Mow"))
+
+    def test_priority(self):
+        """Test that lines without at least the minimum priority are rejected."""
+        self.namespace.priority = "B"
+        self.assertEqual(["(A) Paint", "(B) Mow"], self.select("(A) Paint", "(B) Mow", "(C) Call mom", "Walk (A)"))
+
+    def test_linked_tasks(self):
+        """Test that lines with tasks that block or are blocked by other tasks are kept, in order."""
+        self.namespace.contexts = {"home"}
+        self.assertEqual(
+            ["Buy paint before:paint", "Paint @home id:paint", "Buy wood id:wood", "Build shed @home after:wood"],
+            self.select("Buy paint before:paint", "Paint @home id:paint", "Buy wood id:wood", "Mow id:mow",
+                        "Build shed @home after:wood"))
+
+    def test_tasks_assumed_done(self):
+        """Test that lines with tasks that are assumed to be done are kept."""
+        self.namespace.contexts = {"home"}
+        self.namespace.assume_done = ["wood"]
+        self.assertEqual(["Buy wood id:wood"], self.select("Buy wood id:wood", "Mow id:mow"))
+
+    def test_tokens(self):
+        """Test that lines with link tags are tokenized once and that known tokens are used."""
+        self.namespace.contexts = {"home"}
+        texts = ["Buy paint before:paint", "Paint id:paint", "Mow"]
+        tokens = [None, tokenize("Paint id:paint"), None]
+        self.assertEqual([0, 1], Prefilter(self.namespace).select(texts, tokens))
+        self.assertEqual(tokenize("Buy paint before:paint"), tokens[0])
+        self.assertEqual(None, tokens[2])
+
+
+class ReadPrefilteredTodoTxtFilesTest(fixtures.TestCaseWithNamespace):
+    """Unit tests for reading prefiltered todo.txt files."""
+
+    def setUp(self):
+        """Create the todo.txt file and the cache."""
+        super().setUp()
+        self.directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.filename = os.path.join(self.directory.name, "todo.txt")
+        with open(self.filename, "w", encoding="utf-8") as todotxt_file:
+            todotxt_file.write("Mow\nBuy paint before:paint\nx Done\nPaint @home id:paint\nCall mom @home\n")
+        self.cache = ParseCache(os.path.join(self.directory.name, "cache"))
+        self.namespace.contexts = {"home"}
+
+    def tearDown(self):
+        """Remove the todo.txt file and the cache."""
+        self.directory.cleanup()
+
+    def test_read(self):
+        """Test that tasks are only created for the selected lines, with their line numbers."""
+        tasks = read_todotxt_files([self.filename], prefilter=Prefilter(self.namespace))
+        self.assertEqual([(2, "Buy paint before:paint"), (5, "Call mom @home")],
+                         [(task.line_number, task.text) for task in tasks])
+        self.assertEqual(["Paint @home id:paint"], [task.text for task in tasks[0].blocked_tasks()])
+
+    def test_read_from_cache(self):
+        """Test that the prefilter selects the same tasks from the cache."""
+        self.cache.read(self.filename)
+        self.assertEqual(
+            [task.text for task in read_todotxt_files([self.filename], prefilter=Prefilter(self.namespace))],
+            [task.text for task in read_todotxt_files([self.filename], self.cache, Prefilter(self.namespace))])
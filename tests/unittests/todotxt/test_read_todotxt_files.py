@@ -1,5 +1,7 @@
 """Unit tests for the read todo.txt files method."""
 
+import os
+import tempfile
 import unittest
 from unittest.mock import patch, mock_open
 
@@ -16,7 +18,7 @@ class ReadTodoTxtFilesTest(unittest.TestCase):
 
     # pylint: disable=unsubscriptable-object
 
-    @patch("fileinput.open", mock_open(read_data="\nWalk the dog\nx (B) Call mom\n"))
+    @patch("next_action.todotxt.open", mock_open(read_data=b"\nWalk the dog\nx (B) Call mom\n"))
     def test_skip_completed_tasks(self):
         """Test that completed tasks are skipped."""
         tasks = read_todotxt_files(self.files)
@@ -25,7 +27,7 @@ class ReadTodoTxtFilesTest(unittest.TestCase):
         self.assertEqual(self.filename, tasks[0].filename)
         self.assertEqual(2, tasks[0].line_number)
 
-    @patch("fileinput.open", mock_open(read_data="\nWalk the dog\n   \n\n"))
+    @patch("next_action.todotxt.open", mock_open(read_data=b"\nWalk the dog\n   \n\n"))
     def test_skip_empty_lines(self):
         """Test that empty lines are skipped."""
         tasks = read_todotxt_files(self.files)
@@ -33,7 +35,7 @@ class ReadTodoTxtFilesTest(unittest.TestCase):
         self.assertEqual("Walk the dog", tasks[0].text)
         self.assertEqual(2, tasks[0].line_number)
 
-    @patch("fileinput.open", mock_open(read_data="\nBlocked id:1\nBlocking before:1\n"))
+    @patch("next_action.todotxt.open", mock_open(read_data=b"\nBlocked id:1\nBlocking before:1\n"))
     def test_skip_blocked_before(self):
         """Test that tasks blocked with before are skipped."""
         tasks = read_todotxt_files(self.files)
@@ -41,23 +43,58 @@ class ReadTodoTxtFilesTest(unittest.TestCase):
         self.assertEqual("Blocking before:1", tasks[0].text)
         self.assertEqual(3, tasks[0].line_number)
 
-    @patch("fileinput.open", mock_open(read_data="\nBlocking id:1\nBlocked after:1\n"))
+    @patch("next_action.todotxt.open", mock_open(read_data=b"\nBlocking id:1\nBlocked after:1\n"))
     def test_skip_blocked_after(self):
         """Test that tasks blocked with after are skipped."""
         tasks = read_todotxt_files(self.files)
         self.assertEqual(1, len(tasks))
         self.assertEqual("Blocking id:1", tasks[0].text)
 
-    @patch("fileinput.open", mock_open(read_data="Blocking before:1\n"))
+    @patch("next_action.todotxt.open", mock_open(read_data=b"Blocking before:1\n"))
     def test_missing_before_task(self):
         """Test a missing blocked task."""
         tasks = read_todotxt_files(self.files)
         self.assertEqual(1, len(tasks))
         self.assertEqual("Blocking before:1", tasks[0].text)
 
-    @patch("fileinput.open", mock_open(read_data="Blocked after:1\n"))
+    @patch("next_action.todotxt.open", mock_open(read_data=b"Blocked after:1\n"))
     def test_missing_after_task(self):
         """Test a missing blocked task."""
         tasks = read_todotxt_files(self.files)
         self.assertEqual(1, len(tasks))
         self.assertEqual("Blocked after:1", tasks[0].text)
+
+
+class ReadRegularTodoTxtFilesTest(unittest.TestCase):
+    """Unit tests for reading regular todo.txt files in bulk."""
+
+    def setUp(self):
+        """Create the todo.txt files."""
+        self.directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.filename = os.path.join(self.directory.name, "todo.txt")
+        self.other_filename = os.path.join(self.directory.name, "other.txt")
+        with open(self.filename, "wb") as todotxt_file:
+            todotxt_file.write(b"(A) Paint\r\nx Done\rCall mom\n\n  Walk the dog  ")
+        with open(self.other_filename, "wb") as todotxt_file:
+            todotxt_file.write(b"Mow\n")
+
+    def tearDown(self):
+        """Remove the todo.txt files."""
+        self.directory.cleanup()
+
+    def test_line_endings(self):
+        """Test that lines can end with a line feed, a carriage return, or both."""
+        tasks = read_todotxt_files([self.filename])
+        self.assertEqual(["(A) Paint", "Call mom", "Walk the dog"], [task.text for task in tasks])
+        self.assertEqual([1, 3, 5], [task.line_number for task in tasks])
+
+    def test_line_numbers(self):
+        """Test that line numbers continue counting over the files."""
+        tasks = read_todotxt_files([self.filename, self.other_filename])
+        self.assertEqual((self.other_filename, 6), (tasks[-1].filename, tasks[-1].line_number))
+
+    def test_malformed_characters(self):
+        """Test that malformed characters are replaced instead of failing the whole file."""
+        with open(self.filename, "wb") as todotxt_file:
+            todotxt_file.write(b"Paint \xff @home\n")
+        self.assertEqual(["Paint � @home"], [task.text for task in read_todotxt_files([self.filename])])
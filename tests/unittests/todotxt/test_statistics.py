@@ -0,0 +1,57 @@
+"""Unit tests for the task statistics."""
+
+import datetime
+import unittest
+
+from next_action.todotxt import unblocked_tasks, Task, TaskStatistics
+
+
+class TaskStatisticsTest(unittest.TestCase):
+    """Unit tests for the task statistics."""
+
+    today = datetime.date(2018, 10, 10)  # A Wednesday
+
+    def statistics(self, *texts: str) -> TaskStatistics:
+        """Return the statistics of the tasks."""
+        tasks = [Task(text) for text in texts]
+        unblocked_tasks(tasks)
+        return TaskStatistics(tasks, self.today)
+
+    def test_no_tasks(self):
+        """Test that there are no counts without tasks."""
+        statistics = self.statistics()
+        self.assertEqual(0, statistics.total)
+        self.assertEqual({}, statistics.due)
+
+    def test_status(self):
+        """Test that blocked and unblocked tasks are counted."""
+        statistics = self.statistics("Buy wood before:paint", "Paint id:paint", "Call mom")
+        self.assertEqual(3, statistics.total)
+        self.assertEqual({"unblocked": 2, "blocked": 1}, statistics.status)
+
+    def test_hidden(self):
+        """Test that hidden tasks are not counted."""
+        self.assertEqual(0, self.statistics("Call mom h:1").total)
+
+    def test_due(self):
+        """Test that tasks are counted per due date bucket."""
+        statistics = self.statistics(
+            "Overdue due:2018-10-09", "Today due:2018-10-10", "Sunday due:2018-10-14", "Monday due:2018-10-15",
+            "No due date")
+        self.assertEqual({"overdue": 1, "today": 1, "this week": 1, "later": 1, "no due date": 1}, statistics.due)
+
+    def test_inherited_due_date(self):
+        """Test that tasks are counted using the due date they inherit from the tasks they block."""
+        statistics = self.statistics("Buy wood before:paint", "Paint id:paint due:2018-10-01")
+        self.assertEqual({"overdue": 2}, statistics.due)
+
+    def test_priorities(self):
+        """Test that tasks are counted per priority, using the priority they inherit from the tasks they block."""
+        statistics = self.statistics("Buy wood before:paint", "(A) Paint id:paint", "(B) Call mom", "Walk the dog")
+        self.assertEqual({"A": 2, "B": 1, None: 1}, statistics.priorities)
+
+    def test_contexts_and_projects(self):
+        """Test that tasks are counted per context and per project."""
+        statistics = self.statistics("Buy wood @store +DogHouse", "Paint @home +DogHouse +PaintHouse", "Call mom")
+        self.assertEqual({"store": 1, "home": 1}, statistics.contexts)
+        self.assertEqual({"DogHouse": 2, "PaintHouse": 1}, statistics.projects)
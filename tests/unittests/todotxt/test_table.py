@@ -0,0 +1,157 @@
+"""Unit tests for the task table."""
+
+import datetime
+import unittest
+
+from next_action.todotxt import Task, TaskTable
+from next_action.todotxt.table import decode_date, decode_priority, encode_date, encode_priority, Names, NO_ORDINAL
+
+
+class EncodeTest(unittest.TestCase):
+    """Unit tests for encoding priorities and dates."""
+
+    def test_priority(self):
+        """Test that priorities are encoded and decoded."""
+        for priority in ("A", "M", "Z", None):
+            self.assertEqual(priority, decode_priority(encode_priority(priority)))
+
+    def test_date(self):
+        """Test that dates are encoded and decoded."""
+        for date in (datetime.date(2018, 1, 1), None):
+            self.assertEqual(date, decode_date(encode_date(date)))
+        self.assertEqual(NO_ORDINAL, encode_date(None))
+
+
+class NamesTest(unittest.TestCase):
+    """Unit tests for the names column."""
+
+    def setUp(self):
+        """Set up the column."""
+        self.names = Names()
+        for names in ({"home"}, set(), {"home", "phone"}, {"home"}):
+            self.names.append(frozenset(names))
+
+    def test_sets_are_stored_once(self):
+        """Test that each distinct set of names is stored once."""
+        self.assertEqual(3, len(self.names.sets))
+        self.assertEqual([1, 0, 2, 1], list(self.names.ids))
+
+    def test_names(self):
+        """Test the names of a row."""
+        self.assertEqual({"home", "phone"}, self.names.names(2))
+        self.assertEqual(set(), self.names.names(1))
+
+    def test_used_names(self):
+        """Test the names of all rows."""
+        self.assertEqual({"home", "phone"}, self.names.used_names())
+
+    def test_count(self):
+        """Test the number of rows with a name."""
+        self.assertEqual(3, self.names.count("home"))
+        self.assertEqual(1, self.names.count("phone"))
+        self.assertEqual(0, self.names.count("work"))
+
+    def test_count_after_append(self):
+        """Test that the number of rows with a name is updated when a row is appended."""
+        self.assertEqual(1, self.names.count("phone"))
+        self.names.append(frozenset({"phone"}))
+        self.assertEqual(2, self.names.count("phone"))
+
+    def test_rows_with(self):
+        """Test the rows with a name."""
+        self.assertEqual([0, 2, 3], self.names.rows_with("home"))
+        self.assertEqual([], self.names.rows_with("work"))
+
+    def test_subset(self):
+        """Test that the subset has only the rows and keeps the ids of the sets of names."""
+        subset = self.names.subset([3, 1])
+        self.assertEqual([{"home"}, set()], [subset.names(0), subset.names(1)])
+        self.assertEqual({"home"}, subset.used_names())
+        self.assertEqual(self.names.sets, subset.sets)
+        self.assertEqual(3, self.names.count("home"))
+
+
+class TaskTableTest(unittest.TestCase):
+    """Unit tests for the task table."""
+
+    def setUp(self):
+        """Set up the table."""
+        self.tasks = [Task("(A) 2018-01-01 Todo @home +garden", "todo.txt", 1),
+                      Task("(C) Todo @work +paper due:2018-01-01 id:1", "work.txt", 2),
+                      Task("Todo @home @phone h:1 t:2018-02-01", "todo.txt", 3),
+                      Task("(B) Todo +garden +paper after:1", "todo.txt"), Task("9999-01-01 Todo")]
+        self.table = TaskTable(self.tasks)
+
+    def test_length(self):
+        """Test the number of rows."""
+        self.assertEqual(5, len(self.table))
+        self.assertEqual(0, len(TaskTable()))
+
+    def test_columns(self):
+        """Test the columns of the table."""
+        self.assertEqual([0, 0, 1, 0, 0], list(self.table.hidden))
+        self.assertEqual([1, 2, 3, 0, 0], list(self.table.line_numbers))
+        self.assertEqual(encode_date(datetime.date(2018, 2, 1)), self.table.threshold_dates[2])
+        self.assertEqual(encode_date(datetime.date(2018, 1, 1)), self.table.creation_dates[0])
+        self.assertEqual({1: "1"}, self.table.task_ids)
+        self.assertEqual({3: (("1",), ())}, self.table.links)
+
+    def test_priority_and_due_date(self):
+        """Test the priority and due date of the rows."""
+        self.assertEqual(["A", "C", None, "B", None], [self.table.priority(row) for row in range(5)])
+        self.assertEqual(datetime.date(2018, 1, 1), self.table.due_date(1))
+        self.assertEqual(None, self.table.due_date(0))
+
+    def test_codes(self):
+        """Test the codes of the inherited and own priorities and due dates."""
+        self.table.set_inherited(3, encode_priority("A"), encode_date(datetime.date(2017, 1, 1)))
+        self.assertEqual(0, self.table.priority_code(3))
+        self.assertEqual(1, self.table.priority_code(3, own=True))
+        self.assertEqual(None, self.table.priority_code(2))
+        self.assertEqual(encode_date(datetime.date(2017, 1, 1)), self.table.due_ordinal(3))
+        self.assertEqual(None, self.table.due_ordinal(3, own=True))
+
+    def test_used_priorities(self):
+        """Test the priorities of the rows."""
+        self.assertEqual({"A", "B", "C"}, self.table.used_priorities())
+
+    def test_sort_keys(self):
+        """Test that the sort keys of the rows are in the same order as the sort keys of the tasks."""
+        sort_keys = self.table.sort_keys()
+        self.assertEqual(sorted(range(5), key=lambda row: self.tasks[row].sort_key()),
+                         sorted(range(5), key=sort_keys.__getitem__))
+
+    def test_sort_keys_are_updated(self):
+        """Test that the sort keys change when a row inherits a priority."""
+        self.assertLess(self.table.sort_keys()[0], self.table.sort_keys()[3])
+        self.table.set_inherited(3, encode_priority("A"), encode_date(datetime.date(2017, 1, 1)))
+        self.assertGreater(self.table.sort_keys()[0], self.table.sort_keys()[3])
+
+    def test_groups(self):
+        """Test that the groups of the rows are the groups of the tasks."""
+        for groupby in ("context", "project", "priority", "duedate", "source"):
+            for row, task in enumerate(self.tasks):
+                self.assertEqual(task.groups(groupby), self.table.groups(row, groupby), (groupby, row))
+
+    def test_subset(self):
+        """Test that the subset has only the rows, in the given order."""
+        subset = self.table.subset([3, 1])
+        self.assertEqual(["B", "C"], [subset.priority(0), subset.priority(1)])
+        self.assertEqual([{"garden", "paper"}, {"paper"}],
+                         [subset.projects.names(0), subset.projects.names(1)])
+        self.assertEqual({1: "1"}, subset.task_ids)
+        self.assertEqual({0: (("1",), ())}, subset.links)
+
+    def test_subset_without_links(self):
+        """Test the subset of a table without ids and links."""
+        subset = TaskTable([Task("Todo"), Task("(A) Todo")]).subset([1])
+        self.assertEqual(["A"], [subset.priority(0)])
+        self.assertEqual({}, subset.task_ids)
+
+    def test_copy(self):
+        """Test that the copy has its own inherited values."""
+        table_copy = self.table.copy()
+        table_copy.set_inherited(2, encode_priority("A"), NO_ORDINAL)
+        self.assertEqual("A", table_copy.priority(2))
+        self.assertEqual(None, self.table.priority(2))
+        self.assertIs(self.table.hidden, table_copy.hidden)
@@ -1,12 +1,17 @@
 """Unit tests for the todo.txt Task class."""
 
 import datetime
+import gc
 import string
+import sys
+import tracemalloc
 import unittest
+from typing import List
 
 from hypothesis import given, strategies
 
 from next_action import todotxt
+from next_action.todotxt.task import uncompleted_task_texts
 
 # pylint: disable=no-member
 
@@ -22,6 +27,80 @@ class TodoTest(unittest.TestCase):
         """Test the task repr()."""
         self.assertEqual("Task<Todo>", repr(todotxt.Task("Todo")))
 
+    def test_task_filename(self):
+        """Test that the filename of the task can be retrieved."""
+        self.assertEqual("todo.txt", todotxt.Task("Todo", "todo.txt").filename)
+
+    def test_tasks_share_filename(self):
+        """Test that tasks from the same file refer to the same filename."""
+        task1, task2 = todotxt.Task("Todo", "todo.txt"), todotxt.Task("Todo", "todo.txt")
+        self.assertEqual(task1.file_index, task2.file_index)
+
+    def test_copy(self):
+        """Test that a copy of a task shares the tokens, but not the blocked tasks."""
+        task = todotxt.Task("(B) Todo before:1", "todo.txt", 3)
+        task.add_blocked_task(todotxt.Task("(A) Blocked id:1"))
+        copy = task.copy()
+        self.assertEqual((task.text, task.filename, task.line_number), (copy.text, copy.filename, copy.line_number))
+        self.assertIs(task.tokens(), copy.tokens())
+        self.assertEqual(("A", "B"), (task.priority(), copy.priority()))
+
+
+class TaskMemoryTest(unittest.TestCase):
+    """Unit tests for the memory footprint of tasks."""
+
+    def test_no_instance_dict(self):
+        """Test that tasks have no instance dictionary."""
+        self.assertFalse(hasattr(todotxt.Task("Todo"), "__dict__"))
+
+    def test_memory_budget(self):
+        """Test that the task and its tokens stay within the memory budget."""
+        task = todotxt.Task("(A) 2018-01-01 Todo @home +project id:1 due:2018-01-02")
+        self.assertLessEqual(sys.getsizeof(task), 96)
+        self.assertLessEqual(sys.getsizeof(task.tokens()), 128)
+
+    def measure(self, text_format: str) -> float:
+        """Return the average memory allocated per task, including its tokens but excluding its text."""
+        texts = [text_format.format(index=index, next_index=index + 1) for index in range(1000)]
+        todotxt.Task(texts[0]).tokens()  # Create the shared sets and dates before measuring
+        # The interpreter itself allocates memory now and then, so take the lowest of a few measurements
+        return min(self.measure_once(texts) for _ in range(3))
+
+    @staticmethod
+    def measure_once(texts: List[str]) -> float:
+        """Return the average memory allocated per task, measured once."""
+        gc.collect()
+        tracemalloc.start()
+        try:
+            tasks = [todotxt.Task(text) for text in texts]
+            for task in tasks:
+                task.tokens()
+            gc.collect()
+            return tracemalloc.get_traced_memory()[0] / len(texts)
+        finally:
+            tracemalloc.stop()
+
+    def test_measured_memory_budget(self):
+        """Test that tasks with recurring contexts, projects, and dates stay within the memory budget."""
+        list_item = 8  # The reference to the task in the list of tasks
+        self.assertLessEqual(self.measure("(A) 2018-01-01 Todo {index} @home +project due:2018-01-02"),
+                             96 + 128 + list_item + 16)
+
+    def test_measured_memory_budget_with_ids(self):
+        """Test that tasks that block other tasks only need a tuple and the interned id in addition."""
+        list_item, interned_id = 8, 64
+        self.assertLessEqual(self.measure("Todo {index} @home id:t{index} before:t{next_index}"),
+                             96 + 128 + list_item + 48 + interned_id + 16)
+
+    def test_shared_tokens(self):
+        """Test that tasks share empty sets, recurring sets of contexts and projects, and recurring dates."""
+        task1 = todotxt.Task("Todo @home +project due:2018-01-02")
+        task2 = todotxt.Task("Other todo +project @home due:2018-01-02")
+        self.assertIs(task1.contexts(), task2.contexts())
+        self.assertIs(task1.projects(), task2.projects())
+        self.assertIs(task1.due_date(), task2.due_date())
+        self.assertIs(task1.child_ids(), task2.parent_ids())
+
 
 BRACKETS = ["()", "<>", "{}", "[]", "''", '""']
 
@@ -138,6 +217,13 @@ class TaskPriorityTest(unittest.TestCase):
         after2.set_is_blocked()
         self.assertEqual("A", before.priority())
 
+    def test_reset_cached_priority(self):
+        """Test that the cached priority of a task is reset when the task blocks another task."""
+        before = todotxt.Task("Before before:1")
+        self.assertEqual(None, before.priority())
+        before.add_blocked_task(todotxt.Task("(A) After id:1"))
+        self.assertEqual("A", before.priority())
+
 
 class CreationDateTest(unittest.TestCase):
     """Unit tests for task creation dates.
@@ -202,6 +288,12 @@ class ThresholdDateTest(unittest.TestCase):
         self.assertEqual(datetime.date(9999, 1, 1), task.threshold_date())
         self.assertTrue(task.is_future())
 
+    def test_future_threshold_on_date(self):
+        """Test a threshold date that is in the future relative to a given date."""
+        task = todotxt.Task("Todo t:2018-01-02")
+        self.assertTrue(task.is_future(datetime.date(2018, 1, 1)))
+        self.assertFalse(task.is_future(datetime.date(2018, 1, 2)))
+
     def test_threshold_today(self):
         """Test a task with threshold today."""
         task = todotxt.Task(f"Todo t:{datetime.date.today().isoformat()}")
@@ -230,6 +322,12 @@ class DueDateTest(unittest.TestCase):
         self.assertEqual(datetime.date(9999, 1, 1), task.due_date())
         self.assertFalse(task.is_overdue())
 
+    def test_overdue_on_date(self):
+        """Test a due date that is in the past relative to a given date."""
+        task = todotxt.Task("Todo due:2018-01-02")
+        self.assertTrue(task.is_overdue(datetime.date(2018, 1, 3)))
+        self.assertFalse(task.is_overdue(datetime.date(2018, 1, 2)))
+
     def test_due_today(self):
         """Test a task due today."""
         task = todotxt.Task(f"Todo due:{datetime.date.today().isoformat()}")
@@ -287,6 +385,52 @@ class DueDateTest(unittest.TestCase):
         before.add_blocked_task(after2)
         self.assertEqual(datetime.date(2018, 1, 1), before.due_date())
 
+    def test_reset_cached_due_date(self):
+        """Test that the cached due date of a task is reset when the task blocks another task."""
+        before = todotxt.Task("Before before:after")
+        self.assertEqual(None, before.due_date())
+        before.add_blocked_task(todotxt.Task("After id:after due:2018-01-01"))
+        self.assertEqual(datetime.date(2018, 1, 1), before.due_date())
+
+
+class SortKeyTest(unittest.TestCase):
+    """Unit tests for the sort key of tasks."""
+
+    optional_priorities = strategies.one_of(strategies.none(), strategies.sampled_from(string.ascii_uppercase))
+    optional_dates = strategies.one_of(strategies.none(), strategies.dates())
+    nr_projects = strategies.integers(min_value=0, max_value=todotxt.task.MAX_PROJECTS)
+
+    @staticmethod
+    def tuple_sort_key(priority, due_date, creation_date, nr_projects):
+        """Return the sort key as tuple."""
+        return (priority or "ZZZ", due_date or datetime.date.max, creation_date or datetime.date.max, -nr_projects)
+
+    @given(strategies.tuples(optional_priorities, optional_dates, optional_dates, nr_projects),
+           strategies.tuples(optional_priorities, optional_dates, optional_dates, nr_projects))
+    def test_packed_sort_key_order(self, properties1, properties2):
+        """Test that the packed sort keys are ordered like tuples of the task properties."""
+        packed1, packed2 = todotxt.task.pack_sort_key(*properties1), todotxt.task.pack_sort_key(*properties2)
+        tuple1, tuple2 = self.tuple_sort_key(*properties1), self.tuple_sort_key(*properties2)
+        self.assertEqual(tuple1 < tuple2, packed1 < packed2)
+        self.assertEqual(tuple1 == tuple2, packed1 == packed2)
+
+    def test_packed_sort_key_fits_64_bits(self):
+        """Test that the packed sort key fits in 64 bits."""
+        self.assertLess(todotxt.Task("Todo").sort_key(), 2 ** 63)
+
+    def test_many_projects(self):
+        """Test that the number of projects is capped."""
+        many_projects = " ".join(f"+p{index}" for index in range(todotxt.task.MAX_PROJECTS + 2))
+        self.assertEqual(todotxt.Task(f"Todo {many_projects}").sort_key(),
+                         todotxt.Task(f"Todo {many_projects} +extra").sort_key())
+
+    def test_sort_key_of_blocking_task(self):
+        """Test that the sort key of a task changes when the task blocks another task."""
+        before = todotxt.Task("Before before:1")
+        sort_key = before.sort_key()
+        before.add_blocked_task(todotxt.Task("(A) After id:1"))
+        self.assertLess(before.sort_key(), sort_key)
+
 
 class DependenciesTest(unittest.TestCase):
     """Unit tests for dependency relations."""
@@ -365,3 +509,50 @@ class TaskURLsTest(unittest.TestCase):
         """Test that a task with weird URLs returns the URLs."""
         task = todotxt.Task("Check out https://www.google.com/check#/foo")
         self.assertEqual(["https://www.google.com/check#/foo"], task.urls())
+
+
+class TaskGroupsTest(unittest.TestCase):
+    """Unit tests for the groups of tasks."""
+
+    def test_groups(self):
+        """Test the groups of a task."""
+        task = todotxt.Task("(B) Paint @home @store +PaintHouse due:2018-10-10", "todo.txt")
+        self.assertEqual(["home", "store"], task.groups("context"))
+        self.assertEqual(["PaintHouse"], task.groups("project"))
+        self.assertEqual(["B"], task.groups("priority"))
+        self.assertEqual([datetime.date(2018, 10, 10)], task.groups("duedate"))
+        self.assertEqual(["todo.txt"], task.groups("source"))
+
+    def test_no_groups(self):
+        """Test that a task without context, project, priority, or due date is in the None group."""
+        task = todotxt.Task("Paint")
+        for groupby in ("context", "project", "priority", "duedate"):
+            self.assertEqual([None], task.groups(groupby))
+
+
+class UncompletedTaskTextsTest(unittest.TestCase):
+    """Unit tests for getting the texts of the uncompleted tasks from the lines of a todo.txt file."""
+
+    def test_texts(self):
+        """Test that the texts of uncompleted tasks are stripped and other lines have an empty text."""
+        self.assertEqual(["Paint", "", "", "", "x", "Call mom"],
+                         uncompleted_task_texts([b" Paint\r\n", b"x Walk", b"", b" \t", b"x", b"Call mom"]))
+
+    def test_malformed_characters(self):
+        """Test that malformed characters are replaced."""
+        self.assertEqual(["Paint \N{REPLACEMENT CHARACTER}"], uncompleted_task_texts([b"Paint \xff"]))
+
+    def test_skipped_lines_are_not_decoded(self):
+        """Test that completed tasks and blank lines are not decoded."""
+        class Line(bytes):
+            """Line that counts how often it is decoded."""
+
+            decoded = 0
+
+            def decode(self, *args, **kwargs):
+                """Count the decoding."""
+                Line.decoded += 1
+                return super().decode(*args, **kwargs)
+
+        uncompleted_task_texts([Line(b"x (A) Paint"), Line(b""), Line(b"  "), Line(b"Walk")])
+        self.assertEqual(1, Line.decoded)
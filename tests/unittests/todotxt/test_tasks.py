@@ -2,7 +2,7 @@
 
 import unittest
 
-from next_action.todotxt import Tasks, Task
+from next_action.todotxt import Tasks, Task, TaskTable
 
 
 class ContextsTest(unittest.TestCase):
@@ -72,3 +72,30 @@ class PrioritiesTest(unittest.TestCase):
     def test_tasks_with_priorities(self):
         """Test that a task collection with tasks with priorities has those priorities."""
         self.assertEqual(set(["X", "Y"]), Tasks([Task("(X) Todo"), Task("(Y) Todo")]).priorities())
+
+
+class TaskTableTest(unittest.TestCase):
+    """Unit tests for the task table of the tasks."""
+
+    def test_table_is_created_once(self):
+        """Test that the table is created from the tasks once."""
+        tasks = Tasks([Task("Todo @home"), Task("(A) Todo")])
+        self.assertIs(tasks.task_table(), tasks.task_table())
+        self.assertEqual(2, len(tasks.task_table()))
+
+    def test_table(self):
+        """Test that the tasks use the table they were created with."""
+        table = TaskTable([Task("Todo @work")])
+        tasks = Tasks([Task("Todo @home")], table=table)
+        self.assertIs(table, tasks.task_table())
+        self.assertEqual({"work"}, tasks.contexts())
+
+    def test_index(self):
+        """Test that the index uses the table."""
+        tasks = Tasks([Task("Todo 1 @home"), Task("Todo 2 @work"), Task("Todo 3 @home +garden")])
+        self.assertEqual(0b101, tasks.task_index().context("home"))
+
+    def test_index_is_reused(self):
+        """Test that the index is built once."""
+        tasks = Tasks([Task("Todo @home")])
+        self.assertIs(tasks.task_index(), tasks.task_index())
@@ -0,0 +1,90 @@
+"""Unit tests for the todo.txt tokenizer."""
+
+import datetime
+import unittest
+
+from next_action.todotxt.tokenizer import find_task_id, recurring_set, tokenize
+
+
+class TokenizeTest(unittest.TestCase):
+    """Unit tests for the tokenize method."""
+
+    def test_empty_text(self):
+        """Test that an empty text has no tokens."""
+        tokens = tokenize("")
+        self.assertEqual((None, None, None, None), tokens[:4])
+        self.assertEqual((frozenset(), frozenset(), False, "", (), (), ()), tokens[4:])
+
+    def test_all_tokens(self):
+        """Test that all tokens are parsed in one go."""
+        tokens = tokenize("(A) 2018-01-01 Todo @home +project t:2018-02-01 due:2018-03-01 id:1 after:2 before:3 p:4 "
+                          "h:0 https://example.org")
+        self.assertEqual("A", tokens.priority)
+        self.assertEqual(datetime.date(2018, 1, 1), tokens.creation_date)
+        self.assertEqual(datetime.date(2018, 2, 1), tokens.threshold_date)
+        self.assertEqual(datetime.date(2018, 3, 1), tokens.due_date)
+        self.assertEqual({"home"}, tokens.contexts)
+        self.assertEqual({"project"}, tokens.projects)
+        self.assertFalse(tokens.is_hidden)
+        self.assertEqual("1", tokens.task_id)
+        self.assertEqual(("2",), tokens.child_ids)
+        self.assertEqual(("3", "4"), tokens.parent_ids)
+        self.assertEqual(("https://example.org",), tokens.urls)
+
+    def test_tokens_do_not_hide_each_other(self):
+        """Test that a token of one kind inside a token of another kind is found."""
+        tokens = tokenize("Todo @due:2018-01-01 +id:1 https://example.org/@home")
+        self.assertEqual({"due", "home"}, tokens.contexts)
+        self.assertEqual({"id"}, tokens.projects)
+        self.assertEqual(datetime.date(2018, 1, 1), tokens.due_date)
+        self.assertEqual("1", tokens.task_id)
+
+    def test_first_keyed_date_counts(self):
+        """Test that only the first due date and threshold date count, even if they're invalid."""
+        tokens = tokenize("Todo due:2018-13-01 due:2018-01-01 t:2018-01-32 t:2018-01-01")
+        self.assertEqual(None, tokens.due_date)
+        self.assertEqual(None, tokens.threshold_date)
+
+    def test_first_task_id_counts(self):
+        """Test that only the first task id counts."""
+        self.assertEqual("1", tokenize("Todo id:1 id:2").task_id)
+
+    def test_overlapping_ids(self):
+        """Test that ids that are part of another id are skipped."""
+        tokens = tokenize("Todo after:1,after:2 before:3,p:4")
+        self.assertEqual(("1,after:2",), tokens.child_ids)
+        self.assertEqual(("3,p:4",), tokens.parent_ids)
+
+    def test_overlapping_urls(self):
+        """Test that URLs that are part of another URL are skipped."""
+        self.assertEqual(("https://example.org/http://example.com",),
+                         tokenize("Todo https://example.org/http://example.com").urls)
+
+    def test_overlapping_hidden_flags(self):
+        """Test that a hidden flag directly following another hidden flag is skipped."""
+        self.assertFalse(tokenize("h:h:1").is_hidden)
+        self.assertTrue(tokenize("h:0 h:1").is_hidden)
+
+
+class RecurringSetTest(unittest.TestCase):
+    """Unit tests for the sets of contexts and projects that recur."""
+
+    def test_recurring_sets_are_shared(self):
+        """Test that recurring sets of contexts and projects are stored only once."""
+        self.assertIs(tokenize("Todo @home +project").contexts, tokenize("Call @home +project").contexts)
+        self.assertIs(tokenize("Todo @home +project").projects, tokenize("Call @home +project").projects)
+
+    def test_number_of_sets_is_bounded(self):
+        """Test that the number of sets kept for sharing is bounded, however many different sets the tasks have."""
+        for index in range(5000):
+            tokenize(f"Todo @context{index}")
+        self.assertEqual(recurring_set.cache_info().maxsize, recurring_set.cache_info().currsize)
+
+
+class FindTaskIdTest(unittest.TestCase):
+    """Unit tests for the find task id method."""
+
+    def test_same_task_id(self):
+        """Test that the task id is the same as the task id of the tokens."""
+        for text in ("Todo id:1 id:2", "Todo paid:1", "Todo id:1,", "Todo @id:1", "Todo"):
+            self.assertEqual(tokenize(text).task_id, find_task_id(text), text)
@@ -0,0 +1,100 @@
+"""Unit tests for the vectorized task table."""
+
+import datetime
+import random
+import sys
+import unittest
+from unittest.mock import patch
+
+from next_action.pick_action import select
+from next_action.todotxt import Task, TaskTable
+from next_action.todotxt.index import bitset, positions
+from next_action.todotxt.vectorized import numpy_module, vectorized_table, VectorizedTable
+
+from .. import fixtures
+
+
+class VectorizedTableTest(unittest.TestCase):
+    """Unit tests for the vectorized task table."""
+
+    def setUp(self):
+        """Set up the tasks, the table, and the vectorized table."""
+        self.today = datetime.date.today()
+        self.tasks = fixtures.random_tasks(random.Random(0), 200)
+        self.table = TaskTable(self.tasks)
+        self.vectorized = VectorizedTable(self.table)
+
+    def assert_mask(self, predicate, mask):
+        """Assert that the rows in the mask are the rows of the tasks for which the predicate holds."""
+        self.assertEqual([row for row, task in enumerate(self.tasks) if predicate(task)], mask.nonzero()[0].tolist())
+
+    def test_not_hidden(self):
+        """Test the mask of the tasks that are not hidden."""
+        self.assert_mask(lambda task: not task.is_hidden(), self.vectorized.not_hidden())
+
+    def test_not_future(self):
+        """Test the mask of the tasks that are not future tasks."""
+        self.assert_mask(lambda task: not task.is_future(self.today), self.vectorized.not_future(self.today))
+
+    def test_overdue(self):
+        """Test the mask of the overdue tasks."""
+        self.assert_mask(lambda task: task.is_overdue(self.today), self.vectorized.overdue(self.today))
+
+    def test_due(self):
+        """Test the mask of the tasks due on or before a date."""
+        for due_date in (self.today, datetime.date.max):
+            self.assert_mask(lambda task, due_date=due_date: task.is_due(due_date), self.vectorized.due(due_date))
+
+    def test_priority_at_least(self):
+        """Test the mask of the tasks with at least a priority."""
+        self.assert_mask(lambda task: task.priority_at_least("B"), self.vectorized.priority_at_least("B"))
+
+    def test_sort_keys(self):
+        """Test that the sort keys are the sort keys of the table."""
+        self.assertEqual(self.table.sort_keys().tolist(), self.vectorized.sort_keys.tolist())
+
+    def test_bitset(self):
+        """Test that the bitset of the mask is the bitset of the rows in the mask."""
+        mask = self.vectorized.not_future(self.today)
+        self.assertEqual(bitset(mask.nonzero()[0].tolist(), len(self.table)), self.vectorized.bitset(mask))
+
+    def test_select(self):
+        """Test that the rows are selected in the same order as the pure Python path selects them."""
+        sort_keys = self.table.sort_keys()
+        bits = self.vectorized.bitset(self.vectorized.not_hidden())
+        for number in (1, 2, 10, 150, 200, sys.maxsize):
+            self.assertEqual(select(positions(bits), number, key=sort_keys.__getitem__),
+                             self.vectorized.select(bits, number))
+
+    def test_select_from_no_rows(self):
+        """Test that no rows are selected from an empty bitset."""
+        self.assertEqual([], self.vectorized.select(0, 1))
+        self.assertEqual([], VectorizedTable(TaskTable()).select(0, 1))
+
+
+class VectorizedTableFactoryTest(unittest.TestCase):
+    """Unit tests for creating the vectorized table."""
+
+    def setUp(self):
+        """Set up the table."""
+        self.table = TaskTable([Task("Todo")])
+
+    def tearDown(self):
+        """Forget the NumPy module, so each test imports it again."""
+        numpy_module.cache_clear()
+
+    def test_small_table(self):
+        """Test that small tables aren't vectorized."""
+        self.assertIsNone(vectorized_table(self.table))
+
+    @patch("next_action.todotxt.vectorized.MIN_ROWS", 1)
+    def test_large_table(self):
+        """Test that large tables are vectorized."""
+        self.assertIsInstance(vectorized_table(self.table), VectorizedTable)
+
+    @patch("next_action.todotxt.vectorized.MIN_ROWS", 1)
+    @patch.dict(sys.modules, {"numpy": None})
+    def test_without_numpy(self):
+        """Test that tables aren't vectorized if NumPy is not installed."""
+        numpy_module.cache_clear()
+        self.assertIsNone(vectorized_table(self.table))